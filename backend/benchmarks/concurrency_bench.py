@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Concurrent-request throughput with injected Supabase latency.
+
+Compares the old pattern (blocking supabase-py .execute() called directly
+inside an async endpoint) with the real /api/v1/items route, which goes
+through database.run_query. Every query sleeps for --latency seconds to
+simulate a slow PostgREST round trip.
+
+Usage:
+    python benchmarks/concurrency_bench.py --requests 200 --concurrency 50 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Clients are created at import time; the benchmark never talks to them
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark-key")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-key")
+os.environ.setdefault("AUTH_JWT_VERIFY_MODE", "remote")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from src.app.main import app
+from src.app.core.database import get_supabase
+
+
+class SlowResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class SlowQuery:
+    """Stands in for a PostgREST query builder with a slow execute()."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def __getattr__(self, name):
+        # select / eq / order / ... all return the same builder
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(self.latency)
+        return SlowResponse([{"item_id": 1, "name": "Sword", "cost": 100}])
+
+
+class SlowClient:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def table(self, name):
+        return SlowQuery(self.latency)
+
+
+def blocking_app(client: SlowClient) -> FastAPI:
+    """The pre-run_query pattern: sync .execute() inside async def."""
+    before = FastAPI()
+
+    @before.get("/api/v1/items")
+    async def get_all_items(db=Depends(lambda: client)):
+        return db.table("items").select("*").execute().data
+
+    return before
+
+
+async def drive(target: FastAPI, total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=target)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        async def one():
+            async with semaphore:
+                response = await http.get("/api/v1/items")
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per upstream call")
+    args = parser.parse_args()
+
+    client = SlowClient(args.latency)
+    app.dependency_overrides[get_supabase] = lambda: client
+
+    results = {
+        "before (blocking execute)": asyncio.run(drive(blocking_app(client), args.requests, args.concurrency)),
+        "after (run_query)": asyncio.run(drive(app, args.requests, args.concurrency)),
+    }
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, "
+          f"{args.latency * 1000:.0f} ms injected latency")
+    for label, elapsed in results.items():
+        print(f"  {label:<28} {elapsed:7.2f} s  {args.requests / elapsed:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
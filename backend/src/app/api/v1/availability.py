@@ -0,0 +1,246 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime, timedelta, timezone
+from supabase import Client
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from src.app.core.auth import get_current_user, require_role
+from src.app.core.database import get_supabase, run_query
+from src.app.domain.availability import (
+    Slot, availability_index, compact_availabilities, db_timestamp, local_day_start,
+    merge_intervals, rule_horizon, weekly_intervals
+)
+from src.app.domain.recurrence import RecurrenceRule, last_occurrence
+from src.app.domain.schemas import (
+    AvailabilityCompactionReport, AvailabilityRule, AvailabilityRuleRequest, AvailabilitySlot,
+    AvailabilityUploadRequest, AvailabilityUploadResponse, CancelOccurrenceRequest
+)
+
+router = APIRouter()
+
+# Longest date range a single upload may replace
+MAX_UPLOAD_DAYS = 366
+
+
+def _check_owner(current_user: dict, user_id: str) -> None:
+    if str(current_user["user_id"]) != str(user_id) and current_user.get("user_type") != "admin":
+        raise HTTPException(status_code=403, detail="You can only set your own availability")
+
+
+def _zone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {name}")
+
+
+@router.put("/users/{user_id}", response_model=AvailabilityUploadResponse)
+async def upload_availability(
+    user_id: str,
+    request: AvailabilityUploadRequest,
+    current_user: dict = Depends(get_current_user),
+    db: Client = Depends(get_supabase)
+):
+    """
+    Replace a user's availability in a date range with a weekly schedule
+    and/or explicit intervals (e.g. a whole term in one request).
+
+    Times are normalised to UTC and merged; the result is diffed against the
+    existing rows in the range, so unchanged slots are kept and the rest is
+    applied as one bulk insert and one bulk delete. Parts of existing slots
+    outside the range are preserved.
+    """
+    _check_owner(current_user, user_id)
+    zone = _zone(request.timezone)
+
+    def to_utc(value: datetime) -> datetime:
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=zone)
+        return value.astimezone(timezone.utc)
+
+    uploaded = []
+    for interval in request.intervals:
+        start, end = to_utc(interval.time_start), to_utc(interval.time_end)
+        if end <= start:
+            raise HTTPException(status_code=400, detail="Each interval must end after it starts")
+        uploaded.append((start, end))
+
+    if request.range_start and request.range_end:
+        if request.range_end < request.range_start:
+            raise HTTPException(status_code=400, detail="range_end must not be before range_start")
+        window_start = local_day_start(request.range_start, zone)
+        window_end = local_day_start(request.range_end + timedelta(days=1), zone)
+    elif request.weekly or request.range_start or request.range_end:
+        raise HTTPException(status_code=400, detail="range_start and range_end are required together (and with weekly)")
+    elif uploaded:
+        window_start = min(start for start, _ in uploaded)
+        window_end = max(end for _, end in uploaded)
+    else:
+        raise HTTPException(status_code=400, detail="Provide weekly rules or intervals")
+
+    if window_end - window_start > timedelta(days=MAX_UPLOAD_DAYS):
+        raise HTTPException(status_code=400, detail=f"Uploads may cover at most {MAX_UPLOAD_DAYS} days")
+
+    if request.weekly:
+        uploaded += weekly_intervals(request.weekly, zone, request.range_start, request.range_end)
+    uploaded = [
+        (max(start, window_start), min(end, window_end))
+        for start, end in uploaded
+        if end > window_start and start < window_end
+    ]
+
+    # Existing rows overlapping the range
+    response = await run_query(
+        db.table("availabilities")
+        .select("availability_id, user_id, time_start, time_end")
+        .eq("user_id", user_id)
+        .lt("time_start", db_timestamp(window_end))
+        .gt("time_end", db_timestamp(window_start))
+    )
+    existing = [Slot.from_row(row) for row in response.data or []]
+
+    outside = []
+    for slot in existing:
+        if slot.time_start < window_start:
+            outside.append((slot.time_start, window_start))
+        if slot.time_end > window_end:
+            outside.append((window_end, slot.time_end))
+    desired = set(merge_intervals(uploaded + outside))
+
+    kept, to_delete = {}, []
+    for slot in existing:
+        times = (slot.time_start, slot.time_end)
+        if times in desired and times not in kept:
+            kept[times] = slot
+        else:
+            to_delete.append(slot)
+    to_insert = sorted(desired - kept.keys())
+
+    # Insert first: if the delete fails, the overlap is merged by compaction
+    inserted = []
+    if to_insert:
+        insert_response = await run_query(db.table("availabilities").insert([
+            {"user_id": user_id, "time_start": db_timestamp(start), "time_end": db_timestamp(end)}
+            for start, end in to_insert
+        ]))
+        inserted = [Slot.from_row(row) for row in insert_response.data or []]
+    if to_delete:
+        await run_query(
+            db.table("availabilities").delete().in_(
+                "availability_id", [slot.availability_id for slot in to_delete]
+            )
+        )
+
+    for slot in to_delete:
+        availability_index.remove(slot.availability_id)
+    for slot in inserted:
+        availability_index.add(slot)
+
+    slots = sorted(list(kept.values()) + inserted, key=lambda slot: slot.key)
+    return AvailabilityUploadResponse(
+        inserted=len(inserted),
+        deleted=len(to_delete),
+        unchanged=len(kept),
+        slots=[
+            AvailabilitySlot(
+                availability_id=slot.availability_id,
+                user_id=slot.user_id,
+                time_start=slot.time_start,
+                time_end=slot.time_end
+            )
+            for slot in slots
+        ]
+    )
+
+
+@router.post("/users/{user_id}/rules", response_model=AvailabilityRule, status_code=201)
+async def create_availability_rule(
+    user_id: str,
+    request: AvailabilityRuleRequest,
+    current_user: dict = Depends(get_current_user),
+    db: Client = Depends(get_supabase)
+):
+    """
+    Store recurring availability once as an RRULE. Occurrences are expanded
+    on the fly for matching and only written as availabilities rows when
+    one is booked.
+    """
+    _check_owner(current_user, user_id)
+    zone = _zone(request.timezone)
+    try:
+        rule = RecurrenceRule.parse(request.rrule)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid recurrence rule: {e}")
+
+    def to_local(value: datetime) -> datetime:
+        if value.tzinfo is not None:
+            value = value.astimezone(zone)
+        return value.replace(tzinfo=None)
+
+    dtstart = to_local(request.dtstart)
+    duration = timedelta(minutes=request.duration_minutes)
+    last = last_occurrence(dtstart, rule)
+    until_utc = (last + duration).replace(tzinfo=zone).astimezone(timezone.utc) if last else None
+
+    response = await run_query(db.table("availability_rules").insert({
+        "user_id": user_id,
+        "dtstart": dtstart.isoformat(),
+        "timezone": request.timezone,
+        "duration_minutes": request.duration_minutes,
+        "rrule": str(rule),
+        "exdates": [to_local(value).isoformat() for value in request.exdates],
+        "until_utc": db_timestamp(until_utc) if until_utc else None,
+    }))
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Failed to create availability rule")
+
+    row = response.data[0]
+    if availability_index.loaded_at is not None:
+        availability_index.add_rule(row, *rule_horizon())
+    return AvailabilityRule(**row)
+
+
+@router.post("/rules/{rule_id}/cancel", status_code=204)
+async def cancel_availability_occurrence(
+    rule_id: int,
+    request: CancelOccurrenceRequest,
+    current_user: dict = Depends(get_current_user),
+    db: Client = Depends(get_supabase)
+):
+    """Skip one occurrence (local start time) of a recurring availability rule."""
+    rule_response = await run_query(
+        db.table("availability_rules").select("rule_id, user_id, timezone").eq("rule_id", rule_id)
+    )
+    if not rule_response.data:
+        raise HTTPException(status_code=404, detail="Availability rule not found")
+    rule_row = rule_response.data[0]
+    _check_owner(current_user, rule_row["user_id"])
+
+    occurrence = request.occurrence_start
+    if occurrence.tzinfo is not None:
+        occurrence = occurrence.astimezone(_zone(rule_row["timezone"]))
+    occurrence = occurrence.replace(tzinfo=None)
+
+    await run_query(db.rpc("add_availability_rule_exdate", {
+        "p_rule_id": rule_id,
+        "p_occurrence": occurrence.isoformat(),
+    }))
+
+    for virtual_id, (virtual_rule, virtual_occurrence) in list(availability_index.virtual.items()):
+        if virtual_rule == rule_id and virtual_occurrence == occurrence:
+            availability_index.remove(virtual_id)
+    return None
+
+
+@router.post("/compact", response_model=AvailabilityCompactionReport)
+async def compact_availability(
+    min_minutes: Optional[int] = Query(None, gt=0),
+    current_user: dict = Depends(get_current_user),
+    _: None = Depends(require_role(["admin"])),
+    db: Client = Depends(get_supabase)
+):
+    """
+    Run availability compaction now (admin only). The same job runs every
+    AVAILABILITY_COMPACTION_INTERVAL_SECONDS in the background.
+    """
+    return await compact_availabilities(db, min_minutes)
@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from supabase import Client
+
+from src.app.core.auth import get_current_user
+from src.app.core.cache import TTLCache
+from src.app.core.config import DEFAULT_SECRET_KEY, settings
+from src.app.core.database import get_supabase, run_query
+from src.app.core.pubsub import Notification, broker
+from src.app.domain.ical import write_calendar
+from src.app.domain.schemas import CalendarFeedUrl
+
+router = APIRouter()
+
+ICS_MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+# user_id -> (generations, etag, body). Calendar apps poll feeds; a poll of
+# an unchanged feed is answered from here (usually with a 304) without
+# touching the database.
+feed_cache = TTLCache(maxsize=10000, ttl=settings.CALENDAR_FEED_CACHE_TTL_SECONDS)
+
+# Bumped by changes that can touch any user's feed; cached feeds built
+# under an older generation are rebuilt
+_generations = {"events": 0, "meetings": 0}
+
+
+def _invalidate(notification: Notification) -> None:
+    if notification.topic == "registrations" or notification.type == "participants":
+        for user_id in notification.data.get("user_ids") or [notification.data["user_id"]]:
+            feed_cache.invalidate(str(user_id))
+    elif notification.type == "status" and notification.data.get("status") != "cancelled":
+        # Feeds only show whether a meeting is cancelled, not live/ended
+        return
+    elif notification.type == "attendance":
+        # Check-in counts aren't part of any feed
+        return
+    elif notification.topic in _generations:
+        _generations[notification.topic] += 1
+
+
+broker.add_listener(_invalidate)
+
+
+def _require_feed_secret() -> None:
+    # Feed tokens are HMACs of SECRET_KEY; with the public default anyone
+    # could mint a token for any user
+    if settings.SECRET_KEY == DEFAULT_SECRET_KEY:
+        raise HTTPException(status_code=503, detail="Calendar feeds are disabled until SECRET_KEY is set")
+
+
+def feed_token(user_id: str) -> str:
+    """Secret part of a user's feed URL; calendar apps can't send auth headers."""
+    return hmac.new(settings.SECRET_KEY.encode(), f"calendar:{user_id}".encode(), hashlib.sha256).hexdigest()[:32]
+
+
+async def _build_feed(db: Client, user_id: str) -> tuple[str, bytes]:
+    registrations, hosted, joined = await asyncio.gather(
+        run_query(db.table("event_registration").select("events(*)").eq("user_id", user_id)),
+        run_query(db.table("meetings").select("*").eq("created_by", user_id)),
+        run_query(db.table("meeting_participants").select("meetings(*)").eq("user_id", user_id)),
+    )
+    events = sorted(
+        (row["events"] for row in registrations.data or [] if row.get("events")),
+        key=lambda event: event["event_id"],
+    )
+    meetings = {meeting["meeting_id"]: meeting for meeting in hosted.data or []}
+    for row in joined.data or []:
+        if row.get("meetings"):
+            meetings.setdefault(row["meetings"]["meeting_id"], row["meetings"])
+
+    digest = hashlib.sha256()
+    chunks = []
+    for line in write_calendar("My schedule", events, (meetings[key] for key in sorted(meetings))):
+        chunk = line.encode()
+        digest.update(chunk)
+        chunks.append(chunk)
+    return f'"{digest.hexdigest()[:32]}"', b"".join(chunks)
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [value.strip() for value in header.split(",")]
+
+
+@router.get("/users/{user_id}/feed-url", response_model=CalendarFeedUrl)
+async def get_feed_url(
+    user_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+):
+    """Subscription URL for a user's calendar feed (the user or an admin only)"""
+    if str(current_user["user_id"]) != user_id and current_user.get("user_type") != "admin":
+        raise HTTPException(status_code=403, detail="Not allowed to read this user's calendar")
+    _require_feed_secret()
+    url = request.url_for("get_calendar_feed", user_id=user_id).include_query_params(token=feed_token(user_id))
+    return CalendarFeedUrl(url=str(url))
+
+
+@router.get("/users/{user_id}.ics")
+async def get_calendar_feed(
+    user_id: str,
+    token: str,
+    request: Request,
+    db: Client = Depends(get_supabase)
+):
+    """
+    iCalendar feed of the events a user registered for and the meetings
+    they host or joined. Supports If-None-Match; unchanged feeds get 304.
+    """
+    _require_feed_secret()
+    if not hmac.compare_digest(token, feed_token(user_id)):
+        raise HTTPException(status_code=404, detail="Calendar not found")
+
+    generations = tuple(_generations.values())
+    cached = feed_cache.get(user_id)
+    if cached is not None and cached[0] == generations:
+        _, etag, body = cached
+    else:
+        etag, body = await _build_feed(db, user_id)
+        feed_cache.set(user_id, (generations, etag, body))
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=ICS_MEDIA_TYPE, headers=headers)
@@ -4,6 +4,7 @@ from pathlib import Path
 from openai import OpenAI
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter()
 
@@ -47,7 +48,7 @@ async def chat_endpoint(req: ChatRequest):
         raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured")
     
     try:
-        ai_response = call_openai(req.message, req.history)
+        ai_response = await run_in_threadpool(call_openai, req.message, req.history)
         return {"response": ai_response}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OpenAI API error: {str(e)}")
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+
+from src.app.core.auth import get_current_user, require_role
+from src.app.core.diagnostics import loop_monitor
+from src.app.domain.schemas import EventLoopLagReport
+
+router = APIRouter()
+
+
+@router.get("/event-loop", response_model=EventLoopLagReport)
+async def get_event_loop_report(
+    current_user: dict = Depends(get_current_user),
+    _: None = Depends(require_role(["admin"]))
+):
+    """Event-loop lag percentiles and recent blocking callbacks (admin only)"""
+    return loop_monitor.report()
@@ -1,17 +1,38 @@
+import uuid
+
 from fastapi import APIRouter, HTTPException, Depends
+from postgrest.exceptions import APIError
 from supabase import Client
 
-from src.app.core.database import get_supabase
-from src.app.core.auth import get_current_user
+from src.app.core.database import get_supabase, run_query
+from src.app.core.auth import get_current_user, require_role
+from src.app.core.pubsub import broker
+from src.app.domain.checkin import checkin_buffer
 from src.app.domain.schemas import (
     EventRegistration,
     RegisterForEventRequest,
     UserEventsResponse,
     Event,
+    BulkRegistrationRequest,
+    BulkRegistrationResponse,
+    BulkRegistrationResult,
+    CheckInRequest,
+    CheckInResponse,
+    CheckInResult,
 )
 
 router = APIRouter()
 
+# Postgres error code for a p_user_id that isn't a UUID
+INVALID_TEXT_REPRESENTATION = "22P02"
+
+# register_for_event() outcomes that aren't a registration
+REGISTRATION_ERRORS = {
+    "already_registered": (400, "User is already registered for this event"),
+    "event_not_found": (404, "Event not found"),
+    "user_not_found": (404, "User not found"),
+}
+
 
 @router.get("/{user_id}/events", response_model=UserEventsResponse)
 async def get_user_events(
@@ -20,9 +41,9 @@ async def get_user_events(
     db: Client = Depends(get_supabase)
 ):
     """Get all events a user is registered for"""
-    response = db.table("event_registration").select(
+    response = await run_query(db.table("event_registration").select(
         "*, events(*)"
-    ).eq("user_id", user_id).execute()
+    ).eq("user_id", user_id))
 
     registrations = []
     for reg in response.data:
@@ -31,6 +52,7 @@ async def get_user_events(
             registration_id=reg["registration_id"],
             user_id=reg["user_id"],
             event_id=reg["event_id"],
+            status=reg.get("status") or "registered",
             event=Event(**event_data) if event_data else None
         )
         registrations.append(registration)
@@ -45,40 +67,145 @@ async def register_for_event(
     current_user: dict = Depends(get_current_user),
     db: Client = Depends(get_supabase)
 ):
-    """Register a user for an event"""
-    # Check if event exists
-    event_response = db.table("events").select("*").eq("event_id", event_id).execute()
+    """
+    Register a user for an event. Takes a seat if the event has one left,
+    otherwise joins the end of its waitlist (status "waitlisted" with a
+    waitlist_position). One RPC that locks only this event's row, so
+    concurrent registrations can't oversell it or register twice.
+    """
+    try:
+        response = await run_query(db.rpc("register_for_event", {
+            "p_event_id": event_id,
+            "p_user_id": request.user_id,
+        }))
+    except APIError as e:
+        if e.code == INVALID_TEXT_REPRESENTATION:
+            raise HTTPException(status_code=404, detail="User not found")
+        raise HTTPException(status_code=400, detail="Failed to register for event")
 
-    if not event_response.data:
+    outcome = response.data
+    if outcome["status"] in REGISTRATION_ERRORS:
+        status_code, detail = REGISTRATION_ERRORS[outcome["status"]]
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    broker.publish("registrations", "created", event_id=event_id, user_id=request.user_id)
+    return EventRegistration(**outcome["registration"], waitlist_position=outcome.get("waitlist_position"))
+
+
+def _canonical_uuid(value: str):
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        return None
+
+
+def _unique_user_ids(user_ids: list[str]) -> list[str]:
+    """The caller's ids in order, once per user however the UUID is spelled."""
+    first = {}
+    for user_id in user_ids:
+        first.setdefault(_canonical_uuid(user_id) or user_id, user_id)
+    return list(first.values())
+
+
+@router.post("/events/{event_id}/register/bulk", response_model=BulkRegistrationResponse)
+async def register_users_for_event(
+    event_id: int,
+    request: BulkRegistrationRequest,
+    current_user: dict = Depends(get_current_user),
+    _: None = Depends(require_role(["admin", "organizer"])),
+    db: Client = Depends(get_supabase)
+):
+    """
+    Register many users (e.g. a whole class) for an event in one call
+    (admins and organizers only). Seats go to users in the order given;
+    once the event is full the rest are waitlisted in that order. Users
+    that are already registered or don't exist are reported per user
+    instead of failing the request.
+    """
+    user_ids = _unique_user_ids(request.user_ids)
+    valid = {user_id: _canonical_uuid(user_id) for user_id in user_ids}
+
+    response = await run_query(db.rpc("register_users_for_event", {
+        "p_event_id": event_id,
+        "p_user_ids": [value for value in valid.values() if value],
+    }))
+    outcome = response.data
+    if not outcome["event_found"]:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    # Check if user exists
-    user_response = db.table("users").select("user_id").eq("user_id", request.user_id).execute()
+    registered = {str(row["user_id"]): row for row in outcome["registered"]}
+    missing = {str(user_id) for user_id in outcome["missing"]}
 
-    if not user_response.data:
-        raise HTTPException(status_code=404, detail="User not found")
+    results = []
+    created = []
+    for user_id in user_ids:
+        canonical = valid[user_id]
+        if canonical is None or canonical in missing:
+            results.append(BulkRegistrationResult(user_id=user_id, status="user_not_found"))
+        elif canonical in registered:
+            row = registered[canonical]
+            results.append(BulkRegistrationResult(
+                user_id=user_id, status=row.get("status") or "registered",
+                registration_id=row["registration_id"]
+            ))
+            created.append(user_id)
+        else:
+            results.append(BulkRegistrationResult(user_id=user_id, status="already_registered"))
 
-    # Check if user is already registered
-    existing_reg = db.table("event_registration").select("*").eq(
-        "user_id", request.user_id
-    ).eq("event_id", event_id).execute()
+    # One notification for the whole class, so it can't overflow subscriber queues
+    if created:
+        broker.publish("registrations", "bulk_created", event_id=event_id, user_ids=created)
 
-    if existing_reg.data:
-        raise HTTPException(
-            status_code=400,
-            detail="User is already registered for this event"
-        )
+    counts = {status: sum(result.status == status for result in results)
+              for status in ("registered", "waitlisted", "already_registered", "user_not_found")}
+    return BulkRegistrationResponse(
+        event_id=event_id,
+        registered=counts["registered"],
+        waitlisted=counts["waitlisted"],
+        already_registered=counts["already_registered"],
+        not_found=counts["user_not_found"],
+        results=results,
+    )
 
-    # Create registration
-    response = db.table("event_registration").insert({
-        "user_id": request.user_id,
-        "event_id": event_id
-    }).execute()
 
-    if not response.data:
-        raise HTTPException(status_code=400, detail="Failed to register for event")
+@router.post("/events/{event_id}/check-in", response_model=CheckInResponse, status_code=202)
+async def check_in_to_event(
+    event_id: int,
+    request: CheckInRequest,
+    current_user: dict = Depends(get_current_user),
+    _: None = Depends(require_role(["admin", "organizer", "volunteer"])),
+    db: Client = Depends(get_supabase)
+):
+    """
+    Check users in at the door (one scan or a batch). Check-ins are
+    buffered and written in batches a few seconds later; the only read is
+    the event's attendance count, cached between scans, which confirms the
+    event exists. Rescans report "already_checked_in". Users without a seat
+    for the event (unregistered, waitlisted) are skipped when the batch is
+    written.
+    """
+    if await checkin_buffer.load_attended(db, event_id) is None:
+        raise HTTPException(status_code=404, detail="Event not found")
 
-    return EventRegistration(**response.data[0])
+    user_ids = _unique_user_ids(request.user_ids)
+    valid = {user_id: _canonical_uuid(user_id) for user_id in user_ids}
+
+    canonical = [value for value in valid.values() if value]
+    statuses = dict(zip(canonical, checkin_buffer.add(event_id, canonical)))
+
+    results = [
+        CheckInResult(user_id=user_id, status=statuses[valid[user_id]] if valid[user_id] else "user_not_found")
+        for user_id in user_ids
+    ]
+    counts = {status: sum(result.status == status for result in results)
+              for status in ("queued", "already_checked_in", "user_not_found")}
+    return CheckInResponse(
+        event_id=event_id,
+        queued=counts["queued"],
+        already_checked_in=counts["already_checked_in"],
+        not_found=counts["user_not_found"],
+        results=results,
+    )
 
 
 @router.delete("/events/{event_id}/register/{user_id}", status_code=204)
@@ -88,22 +215,30 @@ async def unregister_from_event(
     current_user: dict = Depends(get_current_user),
     db: Client = Depends(get_supabase)
 ):
-    """Unregister a user from an event"""
-    # Check if registration exists
-    reg_response = db.table("event_registration").select("*").eq(
-        "user_id", user_id
-    ).eq("event_id", event_id).execute()
+    """
+    Unregister a user from an event. A freed seat goes to the head of the
+    waitlist in the same transaction as the delete.
+    """
+    try:
+        response = await run_query(db.rpc("unregister_from_event", {
+            "p_event_id": event_id,
+            "p_user_id": user_id,
+        }))
+    except APIError as e:
+        if e.code != INVALID_TEXT_REPRESENTATION:
+            raise
+        raise HTTPException(status_code=404, detail="Registration not found")
 
-    if not reg_response.data:
+    outcome = response.data
+    if outcome["status"] == "not_found":
         raise HTTPException(
             status_code=404,
             detail="Registration not found"
         )
 
-    # Delete registration
-    db.table("event_registration").delete().eq(
-        "user_id", user_id
-    ).eq("event_id", event_id).execute()
+    broker.publish("registrations", "deleted", event_id=event_id, user_id=user_id)
+    for row in outcome["promoted"]:
+        broker.publish("registrations", "promoted", event_id=event_id, user_id=str(row["user_id"]))
 
     return None
 
@@ -112,22 +247,23 @@ async def unregister_from_event(
 async def get_event_registrations(event_id: int, db: Client = Depends(get_supabase)):
     """Get all registrations for a specific event"""
     # Check if event exists
-    event_response = db.table("events").select("*").eq("event_id", event_id).execute()
+    event_response = await run_query(db.table("events").select("*").eq("event_id", event_id))
 
     if not event_response.data:
         raise HTTPException(status_code=404, detail="Event not found")
 
     # Get registrations
-    response = db.table("event_registration").select(
+    response = await run_query(db.table("event_registration").select(
         "*, users(*)"
-    ).eq("event_id", event_id).execute()
+    ).eq("event_id", event_id))
 
     registrations = []
     for reg in response.data:
         registration = EventRegistration(
             registration_id=reg["registration_id"],
             user_id=reg["user_id"],
-            event_id=reg["event_id"]
+            event_id=reg["event_id"],
+            status=reg.get("status") or "registered",
         )
         registrations.append(registration)
 
@@ -1,48 +1,171 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Optional
 from supabase import Client
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from src.app.core.database import get_supabase
+from src.app.core.database import get_supabase, run_query
+from src.app.core.pubsub import broker
 from src.app.core.auth import get_current_user, require_role
+from src.app.domain.availability import db_timestamp, parse_timestamp
+from src.app.domain.checkin import checkin_buffer
+from src.app.domain.recurrence import RecurrenceRule, last_occurrence, occurrences
 from src.app.domain.schemas import (
     Event,
     CreateEventRequest,
     UpdateEventRequest,
     EventWithRegistrations,
     EventRegistration,
+    CancelOccurrenceRequest,
+    UserMatch,
+    RegistrationRecountReport,
+    EventAttendance,
 )
 
 router = APIRouter()
 
+# Longest window a recurring-event read may expand
+MAX_EVENT_WINDOW_DAYS = 366
+
+# Columns of users embedded with include=users (what UserMatch needs)
+REGISTRATION_USER_FIELDS = "user_id, first_name, last_name, user_type, experience_points, gender"
+
+
+def expand_event(event: dict, window_start: datetime, window_end: datetime) -> List[Event]:
+    """Occurrences of a recurring event row that overlap the window."""
+    start = parse_timestamp(event["start_time"])
+    duration = parse_timestamp(event["end_time"]) - start
+    exdates = [parse_timestamp(value) for value in event.get("recurrence_exdates") or []]
+    return [
+        Event(
+            event_id=event["event_id"],
+            name=event.get("name"),
+            start_time=occurrence,
+            end_time=occurrence + duration,
+            recurrence_rule=event["recurrence_rule"],
+            registration_count=event.get("registration_count") or 0,
+        )
+        for occurrence in occurrences(
+            start, RecurrenceRule.parse(event["recurrence_rule"]),
+            window_start, window_end, duration, exdates
+        )
+    ]
+
 
 @router.get("", response_model=List[Event])
-async def get_all_events(db: Client = Depends(get_supabase)):
-    """Get all events"""
-    response = db.table("events").select("*").execute()
+async def get_all_events(
+    from_time: Optional[datetime] = Query(None, alias="from"),
+    to_time: Optional[datetime] = Query(None, alias="to"),
+    db: Client = Depends(get_supabase)
+):
+    """
+    Get all events. With ?from=&to= only events overlapping that window are
+    returned, and recurring events are expanded into their occurrences in
+    the window (nothing outside it is generated). Each event carries its
+    registration_count, so listings need no per-event lookups.
+    """
+    if from_time is None and to_time is None:
+        response = await run_query(db.table("events").select("*"))
+
+        if not response.data:
+            return []
+
+        return response.data
+
+    if from_time is None or to_time is None:
+        raise HTTPException(status_code=400, detail="Both from and to are required")
+    window_start, window_end = parse_timestamp(from_time), parse_timestamp(to_time)
+    if window_end <= window_start:
+        raise HTTPException(status_code=400, detail="to must be after from")
+    if window_end - window_start > timedelta(days=MAX_EVENT_WINDOW_DAYS):
+        raise HTTPException(status_code=400, detail=f"Windows may cover at most {MAX_EVENT_WINDOW_DAYS} days")
+
+    one_off, recurring = await asyncio.gather(
+        run_query(
+            db.table("events").select("*")
+            .is_("recurrence_rule", "null")
+            .lt("start_time", db_timestamp(window_end))
+            .gt("end_time", db_timestamp(window_start))
+        ),
+        run_query(
+            db.table("events").select("*")
+            .not_.is_("recurrence_rule", "null")
+            .lt("start_time", db_timestamp(window_end))
+            .or_(f"recurrence_until.is.null,recurrence_until.gt.{db_timestamp(window_start)}")
+        ),
+    )
 
-    if not response.data:
-        return []
+    events = [Event(**event) for event in one_off.data or []]
+    for event in recurring.data or []:
+        events.extend(expand_event(event, window_start, window_end))
+    events.sort(key=lambda event: (parse_timestamp(event.start_time), event.event_id))
+    return events
 
-    return response.data
+
+@router.post("/registration-counts/recount", response_model=RegistrationRecountReport)
+async def recount_registrations(
+    current_user: dict = Depends(get_current_user),
+    _: None = Depends(require_role(["admin"])),
+    db: Client = Depends(get_supabase)
+):
+    """Recompute every event's registration_count from event_registration (admin only)"""
+    response = await run_query(db.rpc("recount_event_registrations", {}))
+    return RegistrationRecountReport(**response.data)
+
+
+@router.get("/{event_id}/attendance", response_model=EventAttendance)
+async def get_event_attendance(event_id: int, db: Client = Depends(get_supabase)):
+    """
+    Live check-in count: the event's maintained attended_count, kept in
+    memory by the check-in buffer's flushes, plus check-ins still buffered.
+    Buffered scans aren't checked against registrations until they are
+    written, so `attended` may briefly include users without a seat.
+    """
+    attended = await checkin_buffer.load_attended(db, event_id)
+    if attended is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    pending = checkin_buffer.pending(event_id)
+    return EventAttendance(event_id=event_id, attended=attended + pending, pending=pending)
 
 
 @router.get("/{event_id}", response_model=EventWithRegistrations)
-async def get_event(event_id: int, db: Client = Depends(get_supabase)):
-    """Get a specific event with registrations"""
-    event_response = db.table("events").select("*").eq("event_id", event_id).execute()
+async def get_event(
+    event_id: int,
+    count_only: bool = False,
+    include: Optional[str] = Query(None, pattern="^users$"),
+    db: Client = Depends(get_supabase)
+):
+    """
+    Get a specific event with registrations. count_only=true skips the
+    list and reads the event's maintained registration_count;
+    include=users embeds each registrant's public profile.
+    """
+    event_response = await run_query(db.table("events").select("*").eq("event_id", event_id))
 
     if not event_response.data:
         raise HTTPException(status_code=404, detail="Event not found")
 
     event = event_response.data[0]
 
-    # Get registrations for this event
-    reg_response = (
+    if count_only:
+        return EventWithRegistrations(
+            event_id=event["event_id"],
+            name=event.get("name"),
+            start_time=event["start_time"],
+            end_time=event["end_time"],
+            registrations=[],
+            total_registrations=event.get("registration_count") or 0,
+        )
+
+    # Get registrations for this event, projecting only what's returned
+    columns = "registration_id, user_id, event_id, status"
+    if include == "users":
+        columns += f", users({REGISTRATION_USER_FIELDS})"
+    reg_response = await run_query(
         db.table("event_registration")
-        .select("*, users(*)")
+        .select(columns)
         .eq("event_id", event_id)
-        .execute()
     )
 
     registrations = [
@@ -50,6 +173,8 @@ async def get_event(event_id: int, db: Client = Depends(get_supabase)):
             registration_id=reg["registration_id"],
             user_id=reg["user_id"],
             event_id=reg["event_id"],
+            status=reg.get("status") or "registered",
+            user=UserMatch(**reg["users"]) if reg.get("users") else None,
         )
         for reg in reg_response.data
     ]
@@ -60,7 +185,7 @@ async def get_event(event_id: int, db: Client = Depends(get_supabase)):
         start_time=event["start_time"],
         end_time=event["end_time"],
         registrations=registrations,
-        total_registrations=len(registrations),
+        total_registrations=sum(reg.status != "waitlisted" for reg in registrations),
     )
 
 
@@ -72,23 +197,41 @@ async def create_event(
     db: Client = Depends(get_supabase)
 ):
     """Create a new event"""
-    if request.end_time <= request.start_time:
+    # Stored as UTC like the exdates, so cancelled occurrences match on expansion
+    start = parse_timestamp(request.start_time)
+    end = parse_timestamp(request.end_time)
+    if end <= start:
         raise HTTPException(
             status_code=400, detail="Event end time must be after start time"
         )
 
     insert_data = {
         "name": request.name or "Untitled Event",
-        "start_time": request.start_time.isoformat(),
-        "end_time": request.end_time.isoformat(),
+        "start_time": db_timestamp(start),
+        "end_time": db_timestamp(end),
+        "max_participants": request.max_participants,
     }
 
-    response = db.table("events").insert(insert_data).execute()
+    if request.recurrence_rule:
+        try:
+            rule = RecurrenceRule.parse(request.recurrence_rule)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid recurrence rule: {e}")
+        last = last_occurrence(start, rule)
+        insert_data["recurrence_rule"] = str(rule)
+        insert_data["recurrence_exdates"] = [
+            db_timestamp(parse_timestamp(value)) for value in request.recurrence_exdates
+        ]
+        insert_data["recurrence_until"] = db_timestamp(last + (end - start)) if last else None
+
+    response = await run_query(db.table("events").insert(insert_data))
 
     if not response.data:
         raise HTTPException(status_code=400, detail="Failed to create event")
 
-    return Event(**response.data[0])
+    event = Event(**response.data[0])
+    broker.publish("events", "created", event_id=event.event_id)
+    return event
 
 
 @router.put("/{event_id}", response_model=Event)
@@ -100,7 +243,7 @@ async def update_event(
     db: Client = Depends(get_supabase),
 ):
     """Update an event"""
-    event_response = db.table("events").select("*").eq("event_id", event_id).execute()
+    event_response = await run_query(db.table("events").select("*").eq("event_id", event_id))
 
     if not event_response.data:
         raise HTTPException(status_code=404, detail="Event not found")
@@ -110,45 +253,80 @@ async def update_event(
     if request.name is not None:
         update_data["name"] = request.name
     if request.start_time:
-        update_data["start_time"] = request.start_time.isoformat()
+        update_data["start_time"] = db_timestamp(parse_timestamp(request.start_time))
     if request.end_time:
-        update_data["end_time"] = request.end_time.isoformat()
+        update_data["end_time"] = db_timestamp(parse_timestamp(request.end_time))
+    if request.max_participants is not None:
+        update_data["max_participants"] = request.max_participants
 
     if not update_data:
         raise HTTPException(status_code=400, detail="No fields to update")
 
     # Validate times
     current_event = event_response.data[0]
-
-    current_start = (
-        datetime.fromisoformat(current_event["start_time"].replace("Z", "+00:00"))
-        if isinstance(current_event["start_time"], str)
-        else current_event["start_time"]
-    )
-    current_end = (
-        datetime.fromisoformat(current_event["end_time"].replace("Z", "+00:00"))
-        if isinstance(current_event["end_time"], str)
-        else current_event["end_time"]
-    )
-
-    final_start = request.start_time or current_start
-    final_end = request.end_time or current_end
+    final_start = parse_timestamp(request.start_time or current_event["start_time"])
+    final_end = parse_timestamp(request.end_time or current_event["end_time"])
 
     if final_end <= final_start:
         raise HTTPException(
             status_code=400, detail="Event end time must be after start time"
         )
 
-    response = (
-        db.table("events").update(update_data).eq("event_id", event_id).execute()
+    if (request.start_time or request.end_time) and current_event.get("recurrence_rule"):
+        # Keep window reads (recurrence_until.gt.<from>) seeing the moved series
+        last = last_occurrence(final_start, RecurrenceRule.parse(current_event["recurrence_rule"]))
+        update_data["recurrence_until"] = db_timestamp(last + (final_end - final_start)) if last else None
+
+    response = await run_query(
+        db.table("events").update(update_data).eq("event_id", event_id)
     )
 
     if not response.data:
         raise HTTPException(status_code=400, detail="Failed to update event")
 
+    broker.publish("events", "updated", event_id=event_id)
+    if request.max_participants is not None:
+        # A raised cap frees seats for the head of the waitlist
+        promoted = await run_query(db.rpc("promote_event_waitlist", {"p_event_id": event_id}))
+        for row in promoted.data or []:
+            broker.publish("registrations", "promoted", event_id=event_id, user_id=str(row["user_id"]))
+        if promoted.data:
+            refreshed = await run_query(db.table("events").select("*").eq("event_id", event_id))
+            return Event(**refreshed.data[0])
     return Event(**response.data[0])
 
 
+@router.post("/{event_id}/cancel", status_code=204)
+async def cancel_event_occurrence(
+    event_id: int,
+    request: CancelOccurrenceRequest,
+    current_user: dict = Depends(get_current_user),
+    _: None = Depends(require_role(["admin"])),
+    db: Client = Depends(get_supabase)
+):
+    """Cancel one occurrence of a recurring event (by its start time)"""
+    event_response = await run_query(
+        db.table("events").select("event_id, recurrence_rule").eq("event_id", event_id)
+    )
+
+    if not event_response.data:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    if not event_response.data[0].get("recurrence_rule"):
+        raise HTTPException(status_code=400, detail="Event is not recurring")
+
+    occurrence = db_timestamp(parse_timestamp(request.occurrence_start))
+    # Appended in the database so concurrent cancellations don't overwrite each other
+    result = await run_query(db.rpc("add_event_exdate", {
+        "p_event_id": event_id,
+        "p_occurrence": occurrence,
+    }))
+    if result.data["status"] == "ok":
+        broker.publish("events", "occurrence_cancelled", event_id=event_id, occurrence_start=occurrence)
+
+    return None
+
+
 @router.delete("/{event_id}", status_code=204)
 async def delete_event(
     event_id: int,
@@ -157,15 +335,16 @@ async def delete_event(
     db: Client = Depends(get_supabase)
 ):
     """Delete an event and all its registrations"""
-    event_response = db.table("events").select("*").eq("event_id", event_id).execute()
+    event_response = await run_query(db.table("events").select("*").eq("event_id", event_id))
 
     if not event_response.data:
         raise HTTPException(status_code=404, detail="Event not found")
 
     # Delete registrations first
-    db.table("event_registration").delete().eq("event_id", event_id).execute()
+    await run_query(db.table("event_registration").delete().eq("event_id", event_id))
 
     # Delete event
-    db.table("events").delete().eq("event_id", event_id).execute()
+    await run_query(db.table("events").delete().eq("event_id", event_id))
+    broker.publish("events", "deleted", event_id=event_id)
 
     return None
@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import List
 from supabase import Client
 
-from src.app.core.database import get_supabase
+from src.app.core.database import get_supabase, run_query
 from src.app.domain.schemas import Item
 
 router = APIRouter()
@@ -11,7 +11,7 @@ router = APIRouter()
 @router.get("", response_model=List[Item])
 async def get_all_items(db: Client = Depends(get_supabase)):
     """Get all available items"""
-    response = db.table("items").select("*").execute()
+    response = await run_query(db.table("items").select("*"))
 
     if not response.data:
         return []
@@ -22,7 +22,7 @@ async def get_all_items(db: Client = Depends(get_supabase)):
 @router.get("/{item_id}", response_model=Item)
 async def get_item(item_id: int, db: Client = Depends(get_supabase)):
     """Get a specific item by ID"""
-    response = db.table("items").select("*").eq("item_id", item_id).execute()
+    response = await run_query(db.table("items").select("*").eq("item_id", item_id))
 
     if not response.data:
         raise HTTPException(status_code=404, detail="Item not found")
@@ -33,10 +33,10 @@ async def get_item(item_id: int, db: Client = Depends(get_supabase)):
 @router.post("", response_model=Item, status_code=201)
 async def create_item(item: Item, db: Client = Depends(get_supabase)):
     """Create a new item (admin only)"""
-    response = db.table("items").insert({
+    response = await run_query(db.table("items").insert({
         "name": item.name,
         "cost": item.cost
-    }).execute()
+    }))
 
     if not response.data:
         raise HTTPException(status_code=400, detail="Failed to create item")
@@ -1,16 +1,33 @@
-from fastapi import APIRouter, HTTPException, Depends
-from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime, timedelta, timezone
 from supabase import Client
+import base64
 import time
-import jwt
+import uuid
 import os
-from typing import List
+from itertools import islice
+from typing import List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from src.app.core.database import get_supabase
-from src.app.core.auth import get_current_user
+from src.app.core.cache import TTLCache
+from src.app.core.database import get_supabase, run_query
+from src.app.core.pubsub import broker
+from src.app.core.auth import get_current_user, require_role
+from src.app.core.zoom import get_signature
+from src.app.domain.availability import (
+    Slot, db_timestamp, load_availability_index, materialize_occurrences, parse_timestamp
+)
+from src.app.domain.matching import MatchRequest, assign
+from src.app.domain.meeting_status import meeting_status_scheduler
+from src.app.domain.recurrence import RecurrenceRule, occurrences
+from src.app.domain.scoring import rank_candidates, recent_load
 from src.app.domain.schemas import (
+    BatchScheduleRequest, BatchScheduleResponse, BatchScheduleResult,
     ScheduleMeetingRequest, ScheduleMeetingResponse, UserMatch, AvailabilitySlot,
-    CreateMeetingRequest, Meeting, MeetingResponse, JoinMeetingRequest, JoinMeetingResponse
+    CreateMeetingRequest, Meeting, MeetingResponse, JoinMeetingRequest, JoinMeetingResponse,
+    RosterSignatureRequest, RosterSignatureResponse, RosterSignature,
+    CreateMeetingSeriesRequest, UpdateMeetingSeriesRequest, MeetingSeriesResponse
 )
 
 router = APIRouter()
@@ -19,7 +36,125 @@ router = APIRouter()
 from src.app.core.config import settings
 
 ZOOM_SDK_KEY = settings.ZOOM_SDK_KEY
-ZOOM_SDK_SECRET = settings.ZOOM_SDK_SECRET
+
+# meeting_id -> meetings row, so a burst of joins reads the row once
+meeting_cache = TTLCache(maxsize=1000, ttl=settings.MEETING_CACHE_TTL_SECONDS)
+
+
+def _on_status_transitions(changed: dict[str, list[int]]) -> None:
+    for status, meeting_ids in changed.items():
+        for meeting_id in meeting_ids:
+            meeting_cache.invalidate(meeting_id)
+            broker.publish("meetings", "status", meeting_id=meeting_id, status=status)
+
+
+meeting_status_scheduler.subscribe(_on_status_transitions)
+
+# Reservation conflicts tolerated before giving up on a stale index
+MAX_SCHEDULE_ATTEMPTS = 5
+STALE_INDEX = object()
+
+# Batch rounds: a retry after a reload covers slots lost to concurrent bookings
+MAX_BATCH_ROUNDS = 2
+
+# Occurrences a single series may create
+MAX_SERIES_OCCURRENCES = 200
+
+# GET /meetings page size
+MEETINGS_PAGE_SIZE = 50
+MAX_MEETINGS_PAGE_SIZE = 200
+
+# Slots this process is currently trying to reserve. Concurrent requests
+# try other candidates first instead of all racing for the earliest slot.
+_reserving: set[int] = set()
+
+
+async def _reserve(db, index, slot: Slot, booking_start: datetime, duration: timedelta) -> dict:
+    """Claim `slot` via reserve_availability() and sync the index with the result."""
+    if slot.availability_id in index.virtual:
+        # A recurring-rule occurrence: write it as a real row first
+        slot = (await materialize_occurrences(db, index, [slot]))[slot.availability_id]
+        if slot is None:
+            return {"status": "gone"}
+    _reserving.add(slot.availability_id)
+    try:
+        response = await run_query(db.rpc("reserve_availability", {
+            "p_availability_id": slot.availability_id,
+            "p_expected_start": db_timestamp(slot.time_start),
+            "p_expected_end": db_timestamp(slot.time_end),
+            "p_booking_start": db_timestamp(booking_start),
+            "p_booking_end": db_timestamp(booking_start + duration),
+        }))
+    finally:
+        _reserving.discard(slot.availability_id)
+    reservation = response.data
+
+    if reservation["status"] == "gone":
+        index.remove(slot.availability_id)
+    elif reservation["status"] == "changed":
+        # Re-file under its current times; it may still fit somewhere else
+        index.add(Slot.from_row(reservation["slot"]))
+    elif reservation["status"] == "ok":
+        index.remove(slot.availability_id)
+        for row in reservation["remaining"]:
+            index.add(Slot.from_row(row))
+    return reservation
+
+
+def _user_match(user: dict) -> UserMatch:
+    return UserMatch(
+        user_id=user["user_id"],
+        first_name=user["first_name"],
+        last_name=user["last_name"],
+        user_type=user["user_type"],
+        experience_points=user.get("experience_points"),
+        gender=user.get("gender")
+    )
+
+
+def _ordered_candidates(index, requester_id, duration, not_before, preferences):
+    """Earliest fit first, or best preference score first when preferences are given."""
+    candidates = (
+        (slot, booking_start)
+        for slot, booking_start in index.candidates(duration, not_before)
+        if slot.user_id != str(requester_id)
+    )
+    if preferences is None:
+        return candidates
+    pool = list(islice(candidates, settings.MATCH_MAX_SCORED_CANDIDATES))
+    return rank_candidates(pool, duration, index.profiles, preferences)
+
+
+async def _reserve_first_candidate(db, index, requester_id, duration, not_before, preferences=None):
+    """
+    Walk index candidates in order and reserve the first one that is still
+    free. Returns (reservation, booking start), None if nothing fits, or
+    STALE_INDEX after MAX_SCHEDULE_ATTEMPTS conflicts.
+    """
+    conflicts = 0
+    deferred = []
+    for slot, booking_start in _ordered_candidates(index, requester_id, duration, not_before, preferences):
+        if index.get(slot.availability_id) != slot:
+            # Dropped or changed by an earlier conflict while ranking
+            continue
+        if slot.availability_id in _reserving:
+            deferred.append((slot, booking_start))
+            continue
+        reservation = await _reserve(db, index, slot, booking_start, duration)
+        if reservation["status"] == "ok":
+            return reservation, booking_start
+        conflicts += 1
+        if conflicts == MAX_SCHEDULE_ATTEMPTS:
+            return STALE_INDEX
+
+    # Slots another request was claiming; whatever it didn't take is fair game
+    for slot, booking_start in deferred:
+        if index.get(slot.availability_id) != slot:
+            continue
+        reservation = await _reserve(db, index, slot, booking_start, duration)
+        if reservation["status"] == "ok":
+            return reservation, booking_start
+    return None
 
 
 @router.post("/schedule", response_model=ScheduleMeetingResponse)
@@ -31,77 +166,175 @@ async def schedule_meeting(
     """
     Schedule a meeting by finding a user with overlapping availability.
     Updates the matched user's availability by removing/splitting the used slot.
-    """
-
-    # Find available users (excluding the requesting user)
-    availability_response = db.table("availabilities").select(
-        "*, users(*)"
-    ).neq("user_id", request.user_id).execute()
-
-    if not availability_response.data:
-        raise HTTPException(status_code=404, detail="No available users found")
 
+    Candidates come from the in-memory availability index (earliest fit
+    first, or ranked by `preferences` when given, see domain/scoring.py).
+    Each is claimed with the reserve_availability() RPC, which deletes the
+    slot and writes back the leftover fragments atomically; if another
+    booking got there first, the next candidate is tried.
+    """
     duration_delta = timedelta(minutes=request.duration_minutes)
-    matched_slot = None
-    matched_user = None
-
-    # Find a slot that can accommodate the requested duration
-    for availability in availability_response.data:
-        time_start = datetime.fromisoformat(availability["time_start"].replace("Z", "+00:00"))
-        time_end = datetime.fromisoformat(availability["time_end"].replace("Z", "+00:00"))
-        slot_duration = time_end - time_start
-
-        if slot_duration >= duration_delta:
-            matched_slot = availability
-            matched_user = availability["users"]
-            break
+    not_before = parse_timestamp(request.not_before) if request.not_before else None
 
-    if not matched_slot:
+    index = await load_availability_index(db)
+    match = await _reserve_first_candidate(
+        db, index, request.user_id, duration_delta, not_before, request.preferences
+    )
+    if match is STALE_INDEX:
+        # Too many candidates were already taken; rebuild from the table and retry
+        index = await load_availability_index(db, force=True)
+        match = await _reserve_first_candidate(
+            db, index, request.user_id, duration_delta, not_before, request.preferences
+        )
+
+    if not match or match is STALE_INDEX:
+        if not index.has_slots_excluding(request.user_id):
+            raise HTTPException(status_code=404, detail="No available users found")
         raise HTTPException(
             status_code=404,
             detail=f"No availability slots found that can accommodate {request.duration_minutes} minutes"
         )
 
-    # Calculate the new time slots after booking
-    original_start = datetime.fromisoformat(matched_slot["time_start"].replace("Z", "+00:00"))
-    original_end = datetime.fromisoformat(matched_slot["time_end"].replace("Z", "+00:00"))
-    meeting_end = original_start + duration_delta
-
-    # Delete the original slot
-    db.table("availabilities").delete().eq("availability_id", matched_slot["availability_id"]).execute()
-
-    # If there's remaining time after the meeting, create a new slot
-    if meeting_end < original_end:
-        db.table("availabilities").insert({
-            "user_id": matched_slot["user_id"],
-            "time_start": meeting_end.isoformat(),
-            "time_end": original_end.isoformat()
-        }).execute()
+    reservation, booking_start = match
+    matched_slot = Slot.from_row(reservation["slot"])
+    matched_user = reservation["user"]
+    meeting_end = booking_start + duration_delta
+    recent_load.record(matched_slot.user_id)
 
     # Return the scheduled meeting details
     scheduled_slot = AvailabilitySlot(
-        availability_id=matched_slot["availability_id"],
-        user_id=matched_slot["user_id"],
-        time_start=original_start,
+        availability_id=matched_slot.availability_id,
+        user_id=matched_slot.user_id,
+        time_start=booking_start,
         time_end=meeting_end
     )
 
-    user_match = UserMatch(
-        user_id=matched_user["user_id"],
-        first_name=matched_user["first_name"],
-        last_name=matched_user["last_name"],
-        user_type=matched_user["user_type"],
-        experience_points=matched_user.get("experience_points"),
-        gender=matched_user.get("gender")
-    )
-
     return ScheduleMeetingResponse(
-        matched_user=user_match,
+        matched_user=_user_match(matched_user),
         scheduled_slot=scheduled_slot,
         message=f"Meeting scheduled successfully for {request.duration_minutes} minutes"
     )
 
 
+async def _commit_batch(db, index, assignments: dict) -> tuple[dict, bool]:
+    """
+    Reserve every assigned slot with one reserve_availability_batch() call
+    (after materializing any recurring-rule occurrences). Returns
+    (request key -> (reserved Slot, volunteer row), whether any slot conflicted).
+    """
+    virtual = {
+        assignment.slot.availability_id: assignment.slot
+        for assignment in assignments.values()
+        if assignment.slot.availability_id in index.virtual
+    }
+    concrete = await materialize_occurrences(db, index, list(virtual.values())) if virtual else {}
+    conflicted = any(slot is None for slot in concrete.values())
+
+    slots = {}
+    by_slot = {}
+    for key, assignment in assignments.items():
+        slot = concrete.get(assignment.slot.availability_id, assignment.slot)
+        if slot is None:
+            continue
+        slots[key] = slot
+        entry = by_slot.setdefault(slot.availability_id, {
+            "availability_id": slot.availability_id,
+            "expected_start": db_timestamp(slot.time_start),
+            "expected_end": db_timestamp(slot.time_end),
+            "bookings": [],
+        })
+        entry["bookings"].append({
+            "start": db_timestamp(assignment.start),
+            "end": db_timestamp(assignment.end),
+        })
+    if not by_slot:
+        return {}, conflicted
+
+    response = await run_query(db.rpc("reserve_availability_batch", {
+        "p_reservations": list(by_slot.values())
+    }))
+
+    volunteers = {}
+    for reserved in response.data["reserved"]:
+        index.remove(reserved["availability_id"])
+        for row in reserved["remaining"]:
+            index.add(Slot.from_row(row))
+        volunteers[reserved["availability_id"]] = reserved["user"]
+    for availability_id in response.data["conflicts"]:
+        index.remove(availability_id)
+        conflicted = True
+
+    committed = {
+        key: (slot, volunteers[slot.availability_id])
+        for key, slot in slots.items()
+        if slot.availability_id in volunteers
+    }
+    return committed, conflicted
+
+
+@router.post("/schedule/batch", response_model=BatchScheduleResponse)
+async def schedule_meetings_batch(
+    request: BatchScheduleRequest,
+    _: None = Depends(require_role(["admin", "organizer"])),
+    db: Client = Depends(get_supabase)
+):
+    """
+    Match many students to volunteer availability at once (e.g. cohort
+    onboarding). The assignment maximizes the number of scheduled students
+    (see domain/matching.py) and is committed in a single bulk reservation;
+    students whose slot was taken concurrently are re-matched once against
+    freshly loaded availability.
+    """
+    pending = {
+        i: MatchRequest(
+            requester_id=item.user_id,
+            duration=timedelta(minutes=item.duration_minutes),
+            window_start=parse_timestamp(item.window_start) if item.window_start else None,
+            window_end=parse_timestamp(item.window_end) if item.window_end else None,
+        )
+        for i, item in enumerate(request.requests)
+    }
+    results = {}
+
+    index = await load_availability_index(db)
+    for _round in range(MAX_BATCH_ROUNDS):
+        # CPU-bound; keep it off the event loop
+        assignments = await run_in_threadpool(assign, pending, index.slots(), request.balance_load)
+        if not assignments:
+            break
+
+        committed, conflicted = await _commit_batch(db, index, assignments)
+        for key, (slot, volunteer) in committed.items():
+            assignment = assignments[key]
+            recent_load.record(slot.user_id)
+            results[key] = BatchScheduleResult(
+                user_id=request.requests[key].user_id,
+                status="scheduled",
+                matched_user=_user_match(volunteer),
+                scheduled_slot=AvailabilitySlot(
+                    availability_id=slot.availability_id,
+                    user_id=slot.user_id,
+                    time_start=assignment.start,
+                    time_end=assignment.end
+                )
+            )
+            del pending[key]
+
+        if not conflicted or not pending:
+            break
+        index = await load_availability_index(db, force=True)
+
+    ordered = [
+        results.get(i) or BatchScheduleResult(user_id=item.user_id, status="unmatched")
+        for i, item in enumerate(request.requests)
+    ]
+    return BatchScheduleResponse(
+        results=ordered,
+        scheduled=len(results),
+        unmatched=len(ordered) - len(results)
+    )
+
+
 @router.post("/create", response_model=MeetingResponse)
 async def create_meeting(
     request: CreateMeetingRequest,
@@ -141,12 +374,14 @@ async def create_meeting(
     }
     
     # Insert meeting into database
-    result = db.table("meetings").insert(meeting_data).execute()
+    result = await run_query(db.table("meetings").insert(meeting_data))
     
     if not result.data:
         raise HTTPException(status_code=500, detail="Failed to create meeting")
     
     meeting = result.data[0]
+    meeting_status_scheduler.schedule(meeting)
+    broker.publish("meetings", "created", meeting_id=meeting["meeting_id"])
     
     return MeetingResponse(
         meeting_id=meeting["meeting_id"],
@@ -167,53 +402,249 @@ async def create_meeting(
     )
 
 
+def _series_starts(request: CreateMeetingSeriesRequest) -> list[datetime]:
+    """UTC starts of every occurrence; the rule is expanded in local wall-clock time."""
+    try:
+        zone = ZoneInfo(request.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {request.timezone}")
+    try:
+        rule = RecurrenceRule.parse(request.recurrence_rule)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid recurrence rule: {e}")
+    if rule.count is None and rule.until is None:
+        raise HTTPException(status_code=400, detail="Recurrence rule needs COUNT or UNTIL")
+
+    dtstart = request.start_time
+    if dtstart.tzinfo is not None:
+        dtstart = dtstart.astimezone(zone).replace(tzinfo=None)
+    starts = [
+        local.replace(tzinfo=zone).astimezone(timezone.utc)
+        for local in islice(occurrences(dtstart, rule, dtstart, datetime.max), MAX_SERIES_OCCURRENCES + 1)
+    ]
+    if len(starts) > MAX_SERIES_OCCURRENCES:
+        raise HTTPException(
+            status_code=400, detail=f"A series may have at most {MAX_SERIES_OCCURRENCES} occurrences"
+        )
+    return starts
+
+
+@router.post("/series", response_model=MeetingSeriesResponse, status_code=201)
+async def create_meeting_series(
+    request: CreateMeetingSeriesRequest,
+    user_id: str,
+    user_type: str,
+    db: Client = Depends(get_supabase)
+):
+    """
+    Create a recurring series of meetings in one bulk insert. Only
+    volunteers and admins can create meetings.
+    """
+    if user_type not in ["volunteer", "admin"]:
+        raise HTTPException(
+            status_code=403,
+            detail="Only volunteers and admins can create meetings"
+        )
+
+    starts = _series_starts(request)
+    duration = timedelta(minutes=request.duration_minutes)
+    series_id = str(uuid.uuid4())
+    # One Zoom meeting for the whole series, like a Zoom recurring meeting
+    zoom_meeting_id = f"{int(time.time())}{user_id[:8]}"
+
+    rows = [
+        {
+            "title": request.title,
+            "description": request.description,
+            "meeting_type": request.meeting_type,
+            "start_time": db_timestamp(start),
+            "end_time": db_timestamp(start + duration),
+            "max_participants": request.max_participants,
+            "meeting_password": request.meeting_password,
+            "zoom_meeting_id": zoom_meeting_id,
+            "zoom_meeting_url": f"https://zoom.us/j/{zoom_meeting_id}",
+            "created_by": user_id,
+            "status": "scheduled",
+            "series_id": series_id,
+        }
+        for start in starts
+    ]
+
+    result = await run_query(db.table("meetings").insert(rows))
+
+    if not result.data:
+        raise HTTPException(status_code=500, detail="Failed to create meeting series")
+
+    for meeting in result.data:
+        meeting_status_scheduler.schedule(meeting)
+    broker.publish(
+        "meetings", "series_created",
+        series_id=series_id, meeting_ids=[meeting["meeting_id"] for meeting in result.data]
+    )
+
+    return MeetingSeriesResponse(
+        series_id=series_id,
+        meetings=[
+            MeetingResponse(**meeting, can_join=True, user_role="host")
+            for meeting in sorted(result.data, key=lambda meeting: meeting["start_time"])
+        ]
+    )
+
+
+async def _check_series_owner(db, series_id: str, user_id: str) -> None:
+    result = await run_query(
+        db.table("meetings").select("created_by").eq("series_id", series_id).limit(1)
+    )
+    if not result.data:
+        raise HTTPException(status_code=404, detail="Meeting series not found")
+    if result.data[0]["created_by"] != user_id:
+        raise HTTPException(status_code=403, detail="Only meeting creator can update the series")
+
+
+@router.put("/series/{series_id}", response_model=MeetingSeriesResponse)
+async def update_meeting_series(
+    series_id: uuid.UUID,
+    request: UpdateMeetingSeriesRequest,
+    user_id: str,
+    db: Client = Depends(get_supabase)
+):
+    """
+    Update every meeting of a series that hasn't started yet, in one
+    statement. Only the series creator can update it.
+    """
+    update_data = request.model_dump(exclude_none=True)
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No fields to update")
+
+    await _check_series_owner(db, str(series_id), user_id)
+
+    result = await run_query(
+        db.table("meetings").update(update_data)
+        .eq("series_id", str(series_id))
+        .eq("status", "scheduled")
+    )
+
+    meetings = sorted(result.data or [], key=lambda meeting: meeting["start_time"])
+    for meeting in meetings:
+        meeting_cache.invalidate(meeting["meeting_id"])
+    broker.publish(
+        "meetings", "series_updated",
+        series_id=str(series_id), meeting_ids=[meeting["meeting_id"] for meeting in meetings]
+    )
+
+    return MeetingSeriesResponse(
+        series_id=str(series_id),
+        meetings=[MeetingResponse(**meeting, can_join=True, user_role="host") for meeting in meetings]
+    )
+
+
+@router.post("/series/{series_id}/cancel", response_model=MeetingSeriesResponse)
+async def cancel_meeting_series(
+    series_id: uuid.UUID,
+    user_id: str,
+    db: Client = Depends(get_supabase)
+):
+    """
+    Cancel every meeting of a series that hasn't started yet, in one
+    statement. Past and running meetings are left as they are.
+    """
+    await _check_series_owner(db, str(series_id), user_id)
+
+    result = await run_query(
+        db.table("meetings").update({"status": "cancelled"})
+        .eq("series_id", str(series_id))
+        .eq("status", "scheduled")
+    )
+
+    meetings = sorted(result.data or [], key=lambda meeting: meeting["start_time"])
+    for meeting in meetings:
+        meeting_cache.invalidate(meeting["meeting_id"])
+    broker.publish(
+        "meetings", "series_cancelled",
+        series_id=str(series_id), meeting_ids=[meeting["meeting_id"] for meeting in meetings]
+    )
+
+    return MeetingSeriesResponse(
+        series_id=str(series_id),
+        meetings=[MeetingResponse(**meeting, can_join=False, user_role="host") for meeting in meetings]
+    )
+
+
+def _encode_cursor(meeting: dict) -> str:
+    key = f"{db_timestamp(parse_timestamp(meeting['start_time']))}|{meeting['meeting_id']}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    """(start_time, meeting_id) of the last meeting on the previous page."""
+    try:
+        start_time, meeting_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return db_timestamp(parse_timestamp(start_time)), int(meeting_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/", response_model=List[MeetingResponse])
 async def get_meetings(
     user_id: str,
     user_type: str,
+    response: Response,
+    from_time: Optional[datetime] = Query(None, alias="from"),
+    to_time: Optional[datetime] = Query(None, alias="to"),
+    status: Optional[str] = None,
+    meeting_type: Optional[str] = None,
+    limit: int = Query(MEETINGS_PAGE_SIZE, ge=1, le=MAX_MEETINGS_PAGE_SIZE),
+    cursor: Optional[str] = None,
     db: Client = Depends(get_supabase)
 ):
     """
-    Get all meetings. Users can see all meetings, but role determines permissions.
+    Get meetings ordered by start time, one page at a time. Users can see all
+    meetings, but role determines permissions.
+
+    from/to bound start_time (from inclusive, to exclusive). When more
+    meetings match, the X-Next-Cursor header holds the cursor for the next
+    page (keyset on start_time, meeting_id, so pages stay stable while
+    meetings are added).
     """
-    # Get all meetings
-    result = db.table("meetings").select("*").order("start_time", desc=False).execute()
-    
-    if not result.data:
-        return []
-    
+    query = db.table("meetings").select("*")
+    if from_time is not None:
+        query = query.gte("start_time", db_timestamp(parse_timestamp(from_time)))
+    if to_time is not None:
+        query = query.lt("start_time", db_timestamp(parse_timestamp(to_time)))
+    if status is not None:
+        query = query.eq("status", status)
+    if meeting_type is not None:
+        query = query.eq("meeting_type", meeting_type)
+    if cursor is not None:
+        after_start, after_id = _decode_cursor(cursor)
+        query = query.or_(
+            f"start_time.gt.{after_start},and(start_time.eq.{after_start},meeting_id.gt.{after_id})"
+        )
+    # One extra row tells whether there is a next page
+    result = await run_query(
+        query.order("start_time", desc=False).order("meeting_id", desc=False).limit(limit + 1)
+    )
+
+    rows = result.data or []
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
+
     meetings = []
-    for meeting in result.data:
+    for meeting in rows:
         # Determine user role and permissions
         user_role = "participant"
-        can_join = True
-        
+
         if meeting["created_by"] == user_id:
             user_role = "host"
         elif user_type in ["volunteer", "admin"] and meeting["meeting_type"] == "live":
             user_role = "presenter"
-        
+
         # Check if meeting can be joined (not ended or cancelled)
         can_join = meeting["status"] in ["scheduled", "live"]
-        
-        meetings.append(MeetingResponse(
-            meeting_id=meeting["meeting_id"],
-            title=meeting["title"],
-            description=meeting["description"],
-            meeting_type=meeting["meeting_type"],
-            start_time=datetime.fromisoformat(meeting["start_time"].replace("Z", "+00:00")),
-            end_time=datetime.fromisoformat(meeting["end_time"].replace("Z", "+00:00")),
-            max_participants=meeting["max_participants"],
-            meeting_password=meeting["meeting_password"],
-            zoom_meeting_id=meeting["zoom_meeting_id"],
-            zoom_meeting_url=meeting["zoom_meeting_url"],
-            created_by=meeting["created_by"],
-            created_at=datetime.fromisoformat(meeting["created_at"].replace("Z", "+00:00")),
-            status=meeting["status"],
-            can_join=can_join,
-            user_role=user_role
-        ))
-    
+
+        meetings.append(MeetingResponse(**meeting, can_join=can_join, user_role=user_role))
+
     return meetings
 
 
@@ -227,7 +658,7 @@ async def get_meeting(
     """
     Get a specific meeting by ID.
     """
-    result = db.table("meetings").select("*").eq("meeting_id", meeting_id).execute()
+    result = await run_query(db.table("meetings").select("*").eq("meeting_id", meeting_id))
     
     if not result.data:
         raise HTTPException(status_code=404, detail="Meeting not found")
@@ -260,11 +691,36 @@ async def get_meeting(
         created_by=meeting["created_by"],
         created_at=datetime.fromisoformat(meeting["created_at"].replace("Z", "+00:00")),
         status=meeting["status"],
+        participant_count=meeting.get("participant_count") or 0,
         can_join=can_join,
         user_role=user_role
     )
 
 
+async def _get_meeting(db, meeting_id: int) -> dict:
+    """The meetings row, served from meeting_cache when fresh; 404 if missing."""
+    meeting = meeting_cache.get(meeting_id)
+    if meeting is None:
+        result = await run_query(db.table("meetings").select("*").eq("meeting_id", meeting_id))
+        if not result.data:
+            raise HTTPException(status_code=404, detail="Meeting not found")
+        meeting = result.data[0]
+        meeting_cache.set(meeting_id, meeting)
+    return meeting
+
+
+def _join_role(meeting: dict, user_id: str, user_type: str) -> str:
+    if meeting["created_by"] == user_id:
+        return "host"
+    if user_type in ["volunteer", "admin"] and meeting["meeting_type"] == "live":
+        return "presenter"
+    return "participant"
+
+
+def _zoom_role(user_role: str) -> int:
+    return 1 if user_role in ["host", "presenter"] else 0
+
+
 @router.post("/{meeting_id}/join", response_model=JoinMeetingResponse)
 async def join_meeting(
     meeting_id: int,
@@ -276,40 +732,30 @@ async def join_meeting(
     """
     Join a meeting and get Zoom credentials.
     """
-    # Get meeting details
-    result = db.table("meetings").select("*").eq("meeting_id", meeting_id).execute()
-    
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Meeting not found")
-    
-    meeting = result.data[0]
-    
+    meeting = await _get_meeting(db, meeting_id)
+
     # Check if meeting can be joined
     if meeting["status"] not in ["scheduled", "live"]:
         raise HTTPException(status_code=400, detail="Meeting is not available for joining")
-    
-    # Determine user role
-    user_role = "participant"
-    if meeting["created_by"] == user_id:
-        user_role = "host"
-    elif user_type in ["volunteer", "admin"] and meeting["meeting_type"] == "live":
-        user_role = "presenter"
-    
-    # Generate Zoom signature
-    role = 1 if user_role in ["host", "presenter"] else 0
-    
-    payload = {
-        "sdkKey": ZOOM_SDK_KEY,
-        "mn": meeting["zoom_meeting_id"],
-        "role": role,
-        "iat": int(time.time()),
-        "exp": int(time.time()) + 60 * 60,  # 1 hour expiry
-        "appKey": ZOOM_SDK_KEY,
-        "tokenExp": int(time.time()) + 60 * 60
-    }
-    
-    signature = jwt.encode(payload, ZOOM_SDK_SECRET, algorithm="HS256")
-    
+
+    user_role = _join_role(meeting, user_id, user_type)
+
+    # Record attendance; hosts and presenters don't count against the cap
+    attendance = await run_query(db.rpc("join_meeting_participant", {
+        "p_meeting_id": meeting_id,
+        "p_user_id": user_id,
+        "p_enforce_capacity": user_role == "participant",
+    }))
+    if attendance.data["status"] == "full":
+        raise HTTPException(status_code=409, detail="Meeting is full")
+    if attendance.data["status"] == "joined":
+        broker.publish(
+            "meetings", "participants",
+            meeting_id=meeting_id, user_id=user_id, participant_count=attendance.data["participant_count"]
+        )
+
+    signature = get_signature(meeting["zoom_meeting_id"], _zoom_role(user_role))
+
     return JoinMeetingResponse(
         meeting_id=meeting_id,
         zoom_meeting_id=meeting["zoom_meeting_id"],
@@ -317,7 +763,54 @@ async def join_meeting(
         meeting_password=meeting["meeting_password"],
         user_role=user_role,
         signature=signature,
-        sdk_key=ZOOM_SDK_KEY
+        sdk_key=ZOOM_SDK_KEY,
+        participant_count=attendance.data["participant_count"]
+    )
+
+
+@router.post("/{meeting_id}/signatures", response_model=RosterSignatureResponse)
+async def issue_roster_signatures(
+    meeting_id: int,
+    request: RosterSignatureRequest,
+    current_user: dict = Depends(get_current_user),
+    db: Client = Depends(get_supabase)
+):
+    """
+    Pre-issue Zoom signatures for a meeting's roster. Only the meeting
+    creator can call this. Roles come from each member's users row, and
+    users without one are left out. Signatures are per role, so the whole
+    roster costs at most two signings and warms the cache for their join
+    requests.
+    """
+    meeting = await _get_meeting(db, meeting_id)
+
+    if meeting["created_by"] != current_user["user_id"]:
+        raise HTTPException(status_code=403, detail="Only meeting creator can issue signatures")
+    if meeting["status"] not in ["scheduled", "live"]:
+        raise HTTPException(status_code=400, detail="Meeting is not available for joining")
+
+    member_ids = list(dict.fromkeys(member.user_id for member in request.users))
+    user_types = {}
+    if member_ids:
+        users = await run_query(db.table("users").select("user_id, user_type").in_("user_id", member_ids))
+        user_types = {str(row["user_id"]): row["user_type"] for row in users.data or []}
+
+    signatures = []
+    for member_id in member_ids:
+        if member_id not in user_types:
+            continue
+        user_role = _join_role(meeting, member_id, user_types[member_id])
+        signatures.append(RosterSignature(
+            user_id=member_id,
+            user_role=user_role,
+            signature=get_signature(meeting["zoom_meeting_id"], _zoom_role(user_role))
+        ))
+
+    return RosterSignatureResponse(
+        meeting_id=meeting_id,
+        zoom_meeting_id=meeting["zoom_meeting_id"],
+        sdk_key=ZOOM_SDK_KEY,
+        signatures=signatures
     )
 
 
@@ -332,7 +825,9 @@ async def update_meeting_status(
     Update meeting status. Only meeting creator can update status.
     """
     # Check if user is the meeting creator
-    result = db.table("meetings").select("created_by").eq("meeting_id", meeting_id).execute()
+    result = await run_query(
+        db.table("meetings").select("created_by, start_time, end_time").eq("meeting_id", meeting_id)
+    )
     
     if not result.data:
         raise HTTPException(status_code=404, detail="Meeting not found")
@@ -341,6 +836,10 @@ async def update_meeting_status(
         raise HTTPException(status_code=403, detail="Only meeting creator can update status")
     
     # Update status
-    db.table("meetings").update({"status": status}).eq("meeting_id", meeting_id).execute()
+    await run_query(db.table("meetings").update({"status": status}).eq("meeting_id", meeting_id))
+    meeting_cache.invalidate(meeting_id)
+    # Reopened meetings get their remaining transitions queued again
+    meeting_status_scheduler.schedule({**result.data[0], "meeting_id": meeting_id, "status": status})
+    broker.publish("meetings", "status", meeting_id=meeting_id, status=status)
     
     return {"message": f"Meeting status updated to {status}"}
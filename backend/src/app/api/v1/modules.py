@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import List
 from supabase import Client
 
-from src.app.core.database import get_supabase
+from src.app.core.database import get_supabase, run_query
 from src.app.core.auth import get_current_user
 from src.app.domain.schemas import Module, CreateModuleRequest, UpdateModuleProgressRequest, UserModulesResponse
 
@@ -12,8 +12,8 @@ router = APIRouter()
 @router.get("/user/{user_id}", response_model=UserModulesResponse)
 async def get_user_modules(user_id: str, db: Client = Depends(get_supabase)):
     """Get all modules for a user"""
-    response = db.table("user_modules").select("*").eq("user_id",
-  user_id).execute()
+    response = await run_query(db.table("user_modules").select("*").eq("user_id",
+  user_id))
 
     modules = [Module(**module) for module in response.data]
 
@@ -23,7 +23,7 @@ async def get_user_modules(user_id: str, db: Client = Depends(get_supabase)):
 @router.get("/{module_id}", response_model=Module)
 async def get_module(module_id: int, db: Client = Depends(get_supabase)):
     """Get a specific module by ID"""
-    response = db.table("modules").select("*").eq("module_id", module_id).execute()
+    response = await run_query(db.table("modules").select("*").eq("module_id", module_id))
 
     if not response.data:
         raise HTTPException(status_code=404, detail="Module not found")
@@ -39,38 +39,38 @@ async def create_module(
 ):
     """Create a new module for a user"""
     # Check if user exists
-    user_response = db.table("users").select("user_id").eq("user_id", request.user_id).execute()
+    user_response = await run_query(db.table("users").select("user_id").eq("user_id", request.user_id))
 
     if not user_response.data:
         raise HTTPException(status_code=404, detail="User not found")
 
     # First, ensure a default module exists in modules table
-    modules_check = db.table("modules").select("module_id").limit(1).execute()
+    modules_check = await run_query(db.table("modules").select("module_id").limit(1))
 
     if not modules_check.data:
         # Create a default module if none exists
-        default_module = db.table("modules").insert({
+        default_module = await run_query(db.table("modules").insert({
             "name": "Default Learning Path"
-        }).execute()
+        }))
         module_id = default_module.data[0]["module_id"]
     else:
         module_id = modules_check.data[0]["module_id"]
 
     # Check if user already has this module
-    existing = db.table("user_modules").select("*").eq(
+    existing = await run_query(db.table("user_modules").select("*").eq(
         "user_id", request.user_id
-    ).eq("module_id", module_id).execute()
+    ).eq("module_id", module_id))
 
     if existing.data:
         # User already has this module, return it instead of creating duplicate
         return Module(**existing.data[0])
 
     # Create user_module entry
-    response = db.table("user_modules").insert({
+    response = await run_query(db.table("user_modules").insert({
         "user_id": request.user_id,
         "module_id": module_id,
         "progress": request.progress
-    }).execute()
+    }))
 
     if not response.data:
         raise HTTPException(status_code=400, detail="Failed to create module")
@@ -87,7 +87,7 @@ async def update_module_progress(
 ):
     """Update module progress"""
     # Check if module exists in user_modules table
-    module_response = db.table("user_modules").select("*").eq("module_id", module_id).execute()
+    module_response = await run_query(db.table("user_modules").select("*").eq("module_id", module_id))
 
     if not module_response.data:
         raise HTTPException(status_code=404, detail="Module not found")
@@ -97,9 +97,9 @@ async def update_module_progress(
         raise HTTPException(status_code=400, detail="Progress must be between 0 and 100")
 
     # Update progress in user_modules table
-    response = db.table("user_modules").update({
+    response = await run_query(db.table("user_modules").update({
         "progress": request.progress
-    }).eq("module_id", module_id).execute()
+    }).eq("module_id", module_id))
 
     if not response.data:
         raise HTTPException(status_code=400, detail="Failed to update module")
@@ -116,14 +116,14 @@ async def delete_module(
 ):
     """Delete a specific user's module"""
     # Check if module exists for this specific user
-    module_response = db.table("user_modules").select("*").eq(
+    module_response = await run_query(db.table("user_modules").select("*").eq(
         "module_id", module_id
-    ).eq("user_id", user_id).execute()
+    ).eq("user_id", user_id))
 
     if not module_response.data:
         raise HTTPException(status_code=404, detail="Module not found for this user")
 
     # Delete module from user_modules for this specific user only
-    db.table("user_modules").delete().eq("module_id", module_id).eq("user_id", user_id).execute()
+    await run_query(db.table("user_modules").delete().eq("module_id", module_id).eq("user_id", user_id))
 
     return None
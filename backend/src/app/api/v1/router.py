@@ -1,5 +1,8 @@
 from fastapi import APIRouter
-from app.api.v1 import meetings, items, user_items, modules, events, event_registration, chatbot, users
+from src.app.api.v1 import (
+    meetings, availability, items, user_items, modules, events, event_registration, chatbot, users,
+    diagnostics, zoom, stream, calendar
+)
 
 api_router = APIRouter()
 
@@ -8,9 +11,14 @@ api_router.include_router(users.router, prefix="/users", tags=["auth"])
 
 # Include v1 routers
 api_router.include_router(meetings.router, prefix="/meetings", tags=["meetings"])
+api_router.include_router(availability.router, prefix="/availability", tags=["availability"])
 api_router.include_router(items.router, prefix="/items", tags=["items"])
 api_router.include_router(user_items.router, prefix="/users", tags=["user-items"])
 api_router.include_router(modules.router, prefix="/modules", tags=["modules"])
 api_router.include_router(events.router, prefix="/events", tags=["events"])
 api_router.include_router(event_registration.router, prefix="/users", tags=["event-registration"])
-api_router.include_router(chatbot.router, prefix="/chatbot", tags=["chatbot"])
\ No newline at end of file
+api_router.include_router(chatbot.router, prefix="/chatbot", tags=["chatbot"])
+api_router.include_router(diagnostics.router, prefix="/diagnostics", tags=["diagnostics"])
+api_router.include_router(zoom.router, prefix="/zoom", tags=["zoom"])
+api_router.include_router(stream.router, prefix="/stream", tags=["stream"])
+api_router.include_router(calendar.router, prefix="/calendar", tags=["calendar"])
@@ -0,0 +1,58 @@
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from src.app.core.config import settings
+from src.app.core.pubsub import TOPICS, Notification, broker
+
+router = APIRouter()
+
+
+def format_sse(notification: Notification) -> str:
+    payload = json.dumps({"type": notification.type, **notification.data}, default=str)
+    return f"id: {notification.id}\nevent: {notification.topic}\ndata: {payload}\n\n"
+
+
+async def _event_stream(request: Request, subscription):
+    try:
+        # Tell the client how long to wait before reconnecting
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                notification = await asyncio.wait_for(
+                    subscription.get(), timeout=settings.STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(notification)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.get("")
+async def stream_changes(request: Request, topics: Optional[str] = None):
+    """
+    Server-sent events with change notifications for meetings, events and
+    registrations (?topics=meetings,events to narrow). Each message's event
+    name is the topic and its data holds the change type and ids. A
+    "resync" message means notifications were missed and lists should be
+    re-fetched once.
+    """
+    wanted = [topic.strip() for topic in topics.split(",") if topic.strip()] if topics else list(TOPICS)
+    unknown = sorted(set(wanted) - set(TOPICS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown topics: {', '.join(unknown)}")
+
+    subscription = broker.subscribe(wanted)
+    return StreamingResponse(
+        _event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
-from datetime import datetime, UTC
+from datetime import datetime
 from supabase import Client
 
-from src.app.core.database import get_supabase
+from src.app.core.auth import invalidate_user_profile
+from src.app.core.database import get_supabase, run_query
 from src.app.domain.schemas import (
     PurchaseItemRequest,
     PurchaseItemResponse,
@@ -18,9 +19,9 @@ router = APIRouter()
 @router.get("/{user_id}/items", response_model=UserInventoryResponse)
 async def get_user_inventory(user_id: int, db: Client = Depends(get_supabase)):
     """Get all items owned by a user"""
-    response = db.table("user_items").select(
+    response = await run_query(db.table("user_items").select(
         "*, items(*)"
-    ).eq("user_id", user_id).execute()
+    ).eq("user_id", user_id))
 
     user_items = []
     for item_data in response.data:
@@ -43,62 +44,43 @@ async def purchase_item(
     request: PurchaseItemRequest,
     db: Client = Depends(get_supabase)
 ):
-    """Purchase an item for a user"""
-    # Get the item details
-    item_response = db.table("items").select("*").eq("item_id", request.item_id).execute()
-
-    if not item_response.data:
+    """
+    Purchase an item for a user.
+
+    Runs as one server-side transaction (migration 007): the balance check,
+    XP deduction and inventory upsert can't interleave with another purchase.
+    """
+    result = await run_query(db.rpc("purchase_item", {
+        "p_user_id": user_id,
+        "p_item_id": request.item_id,
+        "p_quantity": request.quantity
+    }))
+    purchase = result.data
+
+    if purchase["status"] == "item_not_found":
         raise HTTPException(status_code=404, detail="Item not found")
 
-    item = item_response.data[0]
-    total_cost = item["cost"] * request.quantity
-
-    # Get user's current experience points
-    user_response = db.table("users").select("experience_points").eq("user_id", user_id).execute()
-
-    if not user_response.data:
+    if purchase["status"] == "user_not_found":
         raise HTTPException(status_code=404, detail="User not found")
 
-    user_exp = user_response.data[0]["experience_points"] or 0
+    if purchase["status"] == "invalid_quantity":
+        raise HTTPException(status_code=400, detail="Quantity must be at least 1")
 
-    # Check if user has enough experience points
-    if user_exp < total_cost:
+    if purchase["status"] == "insufficient_points":
         raise HTTPException(
             status_code=400,
-            detail=f"Insufficient experience points. Need {total_cost}, have {user_exp}"
+            detail=f"Insufficient experience points. Need {purchase['total_cost']}, have {purchase['balance']}"
         )
 
-    # Deduct experience points
-    new_exp = user_exp - total_cost
-    db.table("users").update({"experience_points": new_exp}).eq("user_id", user_id).execute()
-
-    # Check if user already owns this item
-    existing_item = db.table("user_items").select("*").eq(
-        "user_id", user_id
-    ).eq("item_id", request.item_id).execute()
-
-    if existing_item.data:
-        # Update quantity
-        new_quantity = existing_item.data[0]["quantity"] + request.quantity
-        db.table("user_items").update({
-            "quantity": new_quantity
-        }).eq("user_id", user_id).eq("item_id", request.item_id).execute()
-    else:
-        # Create new user_item entry
-        db.table("user_items").insert({
-            "user_id": user_id,
-            "item_id": request.item_id,
-            "quantity": request.quantity,
-            "acquired_at": datetime.now(UTC).isoformat(),
-            "equipped": False
-        }).execute()
+    invalidate_user_profile(user_id)
 
+    item = purchase["item"]
     return PurchaseItemResponse(
         message=f"Successfully purchased {request.quantity}x {item['name']}",
         item=Item(**item),
         quantity=request.quantity,
-        total_cost=total_cost,
-        remaining_experience_points=new_exp
+        total_cost=purchase["total_cost"],
+        remaining_experience_points=purchase["balance"]
     )
 
 
@@ -111,17 +93,17 @@ async def equip_item(
 ):
     """Equip or unequip an item"""
     # Check if user owns the item
-    user_item = db.table("user_items").select("*").eq(
+    user_item = await run_query(db.table("user_items").select("*").eq(
         "user_id", user_id
-    ).eq("item_id", item_id).execute()
+    ).eq("item_id", item_id))
 
     if not user_item.data:
         raise HTTPException(status_code=404, detail="User does not own this item")
 
     # Update equipped status
-    db.table("user_items").update({
+    await run_query(db.table("user_items").update({
         "equipped": request.equipped
-    }).eq("user_id", user_id).eq("item_id", item_id).execute()
+    }).eq("user_id", user_id).eq("item_id", item_id))
 
     action = "equipped" if request.equipped else "unequipped"
     return {"message": f"Item {action} successfully"}
@@ -1,10 +1,17 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List
+from starlette.concurrency import run_in_threadpool
 from supabase import Client
 
-from app.core.database import get_supabase
-from app.core.auth import get_current_user, require_role
-from app.domain.schemas import (
+from src.app.core.database import get_supabase, run_query
+from src.app.core.auth import (
+    get_current_user,
+    require_role,
+    resolve_user_id,
+    get_user_profile,
+    invalidate_user_profile,
+)
+from src.app.domain.schemas import (
     UserRegisterRequest,
     UserLoginRequest,
     AuthResponse,
@@ -16,7 +23,7 @@ router = APIRouter()
 @router.get("", response_model=List[UserProfileResponse])
 async def get_all_users(db: Client = Depends(get_supabase)):
     """Get all users (for organizer dashboard)"""
-    response = db.table("users").select("*").execute()
+    response = await run_query(db.table("users").select("*"))
 
     users = []
     for user_data in response.data:
@@ -41,7 +48,7 @@ async def register_user(
     """Register a new user with Supabase Auth"""
     try:
         # Register user with Supabase Auth
-        auth_response = db.auth.sign_up({
+        auth_response = await run_in_threadpool(db.auth.sign_up, {
             "email": request.email,
             "password": request.password,
             "options": {
@@ -68,7 +75,7 @@ async def register_user(
             "experience_points": 0
         }
 
-        db.table("users").insert(user_data).execute()
+        await run_query(db.table("users").insert(user_data))
 
         # Return auth response
         return AuthResponse(
@@ -101,7 +108,7 @@ async def login_user(
     """Login user with Supabase Auth"""
     try:
         # Authenticate with Supabase
-        auth_response = db.auth.sign_in_with_password({
+        auth_response = await run_in_threadpool(db.auth.sign_in_with_password, {
             "email": request.email,
             "password": request.password
         })
@@ -113,9 +120,9 @@ async def login_user(
             )
 
         # Get user profile from users table
-        user_profile = db.table("users").select("*").eq(
+        user_profile = await run_query(db.table("users").select("*").eq(
             "user_id", auth_response.user.id
-        ).execute()
+        ))
 
         if not user_profile.data:
             raise HTTPException(
@@ -157,27 +164,23 @@ async def get_current_user(
     """Get current user profile using JWT token"""
     try:
         # Verify token and get user
-        user_response = db.auth.get_user(token)
+        auth_user_id = await resolve_user_id(token, db)
 
-        if not user_response.user:
+        if not auth_user_id:
             raise HTTPException(
                 status_code=401,
                 detail="Invalid or expired token"
             )
 
         # Get user profile
-        user_profile = db.table("users").select("*").eq(
-            "user_id", user_response.user.id
-        ).execute()
+        profile = await get_user_profile(auth_user_id, db)
 
-        if not user_profile.data:
+        if not profile:
             raise HTTPException(
                 status_code=404,
                 detail="User profile not found"
             )
 
-        profile = user_profile.data[0]
-
         return UserProfileResponse(
             user_id=profile["user_id"],
             email=profile["email"],
@@ -222,9 +225,10 @@ async def update_user_profile(
             raise HTTPException(status_code=400, detail="No fields to update")
 
         # Update user profile
-        response = db.table("users").update(update_data).eq(
+        response = await run_query(db.table("users").update(update_data).eq(
             "user_id", user_id
-        ).execute()
+        ))
+        invalidate_user_profile(user_id)
 
         if not response.data:
             raise HTTPException(status_code=404, detail="User not found")
@@ -259,9 +263,10 @@ async def update_profile_picture(
     """Update user profile picture URL"""
     try:
         # Update profile picture URL
-        response = db.table("users").update({
+        response = await run_query(db.table("users").update({
             "profile_picture_url": profile_picture_url
-        }).eq("user_id", user_id).execute()
+        }).eq("user_id", user_id))
+        invalidate_user_profile(user_id)
 
         if not response.data:
             raise HTTPException(status_code=404, detail="User not found")
@@ -309,9 +314,10 @@ async def update_user_role(
 
     try:
         # Update user role
-        response = db.table("users").update({
+        response = await run_query(db.table("users").update({
             "user_type": new_role
-        }).eq("user_id", user_id).execute()
+        }).eq("user_id", user_id))
+        invalidate_user_profile(user_id)
 
         if not response.data:
             raise HTTPException(status_code=404, detail="User not found")
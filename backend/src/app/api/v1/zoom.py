@@ -1,22 +1,30 @@
-import time, jwt
-from fastapi import FastAPI
+from fastapi import APIRouter, Depends, HTTPException
+from supabase import Client
 
-app = FastAPI()
+from src.app.api.v1.meetings import _join_role, _zoom_role
+from src.app.core.auth import get_current_user
+from src.app.core.database import get_supabase, run_query
+from src.app.core.zoom import get_signature as cached_signature
 
-SDK_KEY = process.env.ZOOM_SDK_KEY
-SDK_SECRET = process.env.ZOOM_SDK_SECRET
+router = APIRouter()
 
 
-@app.get("/get_signature")
-def get_signature(meeting_number: str, role: int):
-    payload = {
-        "sdkKey": SDK_KEY,
-        "mn": meeting_number,
-        "role": role,  # 0 = participant, 1 = host
-        "iat": int(time.time()),
-        "exp": int(time.time()) + 60 * 60,
-        "appKey": SDK_KEY,
-        "tokenExp": int(time.time()) + 60 * 60
-    }
-    token = jwt.encode(payload, SDK_SECRET, algorithm="HS256")
-    return {"signature": token}
+@router.get("/get_signature")
+async def get_signature(
+    meeting_number: str,
+    current_user: dict = Depends(get_current_user),
+    db: Client = Depends(get_supabase)
+):
+    """
+    Zoom Meeting SDK signature for the caller, cached per meeting and role.
+    The role is derived from the meeting row the same way join_meeting does,
+    never taken from the request.
+    """
+    result = await run_query(
+        db.table("meetings").select("created_by, meeting_type").eq("zoom_meeting_id", meeting_number)
+    )
+    if not result.data:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    user_role = _join_role(result.data[0], current_user["user_id"], current_user["user_type"])
+    return {"signature": cached_signature(meeting_number, _zoom_role(user_role))}
@@ -1,12 +1,62 @@
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
 from supabase import Client
 from typing import Optional
 
-from app.core.database import get_supabase
+from src.app.core.cache import TTLCache
+from src.app.core.config import settings
+from src.app.core.database import get_supabase, run_query
+from src.app.core.jwt_verifier import token_verifier, UnknownSigningKey
 
 security = HTTPBearer()
 
+# user_id -> users row, shared by every authenticated request in this process
+profile_cache = TTLCache(
+    maxsize=settings.PROFILE_CACHE_MAX_ENTRIES,
+    ttl=settings.PROFILE_CACHE_TTL_SECONDS,
+)
+
+
+async def get_user_profile(user_id: str, db: Client) -> Optional[dict]:
+    """Return the users row for user_id, served from the profile cache when fresh."""
+    profile = profile_cache.get(str(user_id))
+    if profile is None:
+        response = await run_query(db.table("users").select("*").eq("user_id", user_id))
+        if not response.data:
+            return None
+        profile = response.data[0]
+        profile_cache.set(str(user_id), profile)
+    # Copy so handlers can't mutate the cached row
+    return dict(profile)
+
+
+def invalidate_user_profile(user_id) -> None:
+    """Drop a cached profile. Call after any write to the user's row."""
+    profile_cache.invalidate(str(user_id))
+
+
+async def resolve_user_id(token: str, db: Client) -> Optional[str]:
+    """
+    Return the Supabase Auth user id for an access token, or None if invalid.
+
+    In "local" verify mode the token is checked in-process; Supabase Auth is
+    only called for tokens signed by a key we don't have cached.
+    """
+    if settings.AUTH_JWT_VERIFY_MODE == "local":
+        try:
+            return token_verifier.verify(token)["sub"]
+        except UnknownSigningKey:
+            pass
+        except jwt.InvalidTokenError:
+            return None
+
+    user_response = await run_in_threadpool(db.auth.get_user, token)
+    if not user_response.user:
+        return None
+    return user_response.user.id
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Client = Depends(get_supabase)
@@ -23,28 +73,26 @@ async def get_current_user(
     token = credentials.credentials
 
     try:
-        # Verify token with Supabase Auth
-        user_response = db.auth.get_user(token)
+        # Verify token (locally when possible, else with Supabase Auth)
+        auth_user_id = await resolve_user_id(token, db)
 
-        if not user_response.user:
+        if not auth_user_id:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        # Get user profile from database
-        user_profile = db.table("users").select("*").eq(
-            "user_id", user_response.user.id
-        ).execute()
+        # Get user profile (cached per process)
+        user_profile = await get_user_profile(auth_user_id, db)
 
-        if not user_profile.data:
+        if not user_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User profile not found"
             )
 
-        return user_profile.data[0]
+        return user_profile
 
     except HTTPException:
         raise
@@ -68,19 +116,12 @@ async def get_current_user_optional(
 
     try:
         token = credentials.credentials
-        user_response = db.auth.get_user(token)
-
-        if not user_response.user:
-            return None
-
-        user_profile = db.table("users").select("*").eq(
-            "user_id", user_response.user.id
-        ).execute()
+        auth_user_id = await resolve_user_id(token, db)
 
-        if not user_profile.data:
+        if not auth_user_id:
             return None
 
-        return user_profile.data[0]
+        return await get_user_profile(auth_user_id, db)
     except Exception:
         return None
 
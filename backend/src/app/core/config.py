@@ -8,6 +8,9 @@ backend_dir = Path(__file__).parent.parent.parent.parent
 env_path = backend_dir / ".env"
 load_dotenv(env_path)
 
+# Placeholder SECRET_KEY; anything keyed by it is forgeable until it is replaced
+DEFAULT_SECRET_KEY = "change-this-in-production-please"
+
 class Settings:
     PROJECT_NAME: str = "Backend API"
     VERSION: str = "0.1.0"
@@ -23,12 +26,47 @@ class Settings:
     # Supabase - CRITICAL: These must be set
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
+
+    # Supabase Auth token verification
+    # "local" verifies access tokens in-process (JWT secret / JWKS) and only
+    # calls Supabase Auth for tokens signed by an unknown key; "remote" always
+    # calls Supabase Auth.
+    AUTH_JWT_VERIFY_MODE: str = os.getenv("AUTH_JWT_VERIFY_MODE", "local")
+    SUPABASE_JWT_SECRET: str = os.getenv("SUPABASE_JWT_SECRET", "")
+    SUPABASE_JWT_AUDIENCE: str = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+    AUTH_JWKS_REFRESH_SECONDS: int = int(os.getenv("AUTH_JWKS_REFRESH_SECONDS", "600"))
+
+    # Per-process cache of user profile rows resolved during authentication
+    PROFILE_CACHE_TTL_SECONDS: int = int(os.getenv("PROFILE_CACHE_TTL_SECONDS", "60"))
+    PROFILE_CACHE_MAX_ENTRIES: int = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "10000"))
     
+    # Threads available for blocking Supabase calls (see database.run_query)
+    DB_THREADPOOL_SIZE: int = int(os.getenv("DB_THREADPOOL_SIZE", "40"))
+
+    # Event-loop lag diagnostics (see core/diagnostics.py)
+    LOOP_DIAGNOSTICS_ENABLED: bool = os.getenv("LOOP_DIAGNOSTICS_ENABLED", "false").lower() == "true"
+    LOOP_LAG_THRESHOLD_MS: int = int(os.getenv("LOOP_LAG_THRESHOLD_MS", "100"))
+    LOOP_LAG_SAMPLE_INTERVAL_MS: int = int(os.getenv("LOOP_LAG_SAMPLE_INTERVAL_MS", "50"))
+
+    # Availability index used by meetings.schedule_meeting
+    AVAILABILITY_INDEX_TTL_SECONDS: int = int(os.getenv("AVAILABILITY_INDEX_TTL_SECONDS", "30"))
+    # How far ahead recurring availability rules are expanded for matching
+    AVAILABILITY_RULE_HORIZON_DAYS: int = int(os.getenv("AVAILABILITY_RULE_HORIZON_DAYS", "28"))
+
+    # Availability compaction (expired slots, fragments shorter than the minimum)
+    AVAILABILITY_COMPACTION_ENABLED: bool = os.getenv("AVAILABILITY_COMPACTION_ENABLED", "true").lower() == "true"
+    AVAILABILITY_COMPACTION_INTERVAL_SECONDS: int = int(os.getenv("AVAILABILITY_COMPACTION_INTERVAL_SECONDS", "900"))
+    AVAILABILITY_MIN_BOOKABLE_MINUTES: int = int(os.getenv("AVAILABILITY_MIN_BOOKABLE_MINUTES", "15"))
+
+    # Preference scoring for schedule_meeting
+    MATCH_MAX_SCORED_CANDIDATES: int = int(os.getenv("MATCH_MAX_SCORED_CANDIDATES", "5000"))
+    MATCH_RECENT_LOAD_WINDOW_HOURS: int = int(os.getenv("MATCH_RECENT_LOAD_WINDOW_HOURS", "24"))
+
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
     
     # Security
-    SECRET_KEY: str = os.getenv("SECRET_KEY", "change-this-in-production-please")
+    SECRET_KEY: str = os.getenv("SECRET_KEY", DEFAULT_SECRET_KEY)
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "another-secret-for-jwt")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
     
@@ -44,5 +82,23 @@ class Settings:
     # Zoom SDK settings
     ZOOM_SDK_KEY: str = os.getenv("ZOOM_SDK_KEY", "")
     ZOOM_SDK_SECRET: str = os.getenv("ZOOM_SDK_SECRET", "")
+    # Signatures are reused until REFRESH_MARGIN seconds before they expire
+    ZOOM_SIGNATURE_TTL_SECONDS: int = int(os.getenv("ZOOM_SIGNATURE_TTL_SECONDS", "3600"))
+    ZOOM_SIGNATURE_REFRESH_MARGIN_SECONDS: int = int(os.getenv("ZOOM_SIGNATURE_REFRESH_MARGIN_SECONDS", "300"))
+    ZOOM_SIGNATURE_CACHE_MAX_ENTRIES: int = int(os.getenv("ZOOM_SIGNATURE_CACHE_MAX_ENTRIES", "10000"))
+    # Server-sent change notifications (see core/pubsub.py)
+    STREAM_QUEUE_SIZE: int = int(os.getenv("STREAM_QUEUE_SIZE", "100"))
+    STREAM_HEARTBEAT_SECONDS: int = int(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+    # iCalendar feeds (see api/v1/calendar.py)
+    CALENDAR_FEED_CACHE_TTL_SECONDS: int = int(os.getenv("CALENDAR_FEED_CACHE_TTL_SECONDS", "300"))
+    # Scheduler moving meetings scheduled -> live -> ended at their start/end times
+    MEETING_STATUS_SCHEDULER_ENABLED: bool = os.getenv("MEETING_STATUS_SCHEDULER_ENABLED", "true").lower() == "true"
+    MEETING_STATUS_MAX_SLEEP_SECONDS: int = int(os.getenv("MEETING_STATUS_MAX_SLEEP_SECONDS", "60"))
+    # Meeting rows cached for join requests (invalidated on status changes)
+    MEETING_CACHE_TTL_SECONDS: int = int(os.getenv("MEETING_CACHE_TTL_SECONDS", "10"))
+    # Event check-ins are buffered and written in batches (see domain/checkin.py)
+    CHECKIN_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("CHECKIN_FLUSH_INTERVAL_SECONDS", "2"))
+    CHECKIN_MAX_BATCH: int = int(os.getenv("CHECKIN_MAX_BATCH", "5000"))
+    CHECKIN_ATTENDANCE_TTL_SECONDS: int = int(os.getenv("CHECKIN_ATTENDANCE_TTL_SECONDS", "5"))
 
 settings = Settings()
\ No newline at end of file
@@ -34,6 +34,7 @@ def create_tables():
     """Create database tables"""
     Base.metadata.create_all(bind=engine)
 from supabase import create_client, Client
+from starlette.concurrency import run_in_threadpool
 from src.app.core.config import settings
 
 
@@ -42,3 +43,16 @@ supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
 def get_supabase() -> Client:
     return supabase
+
+
+async def run_query(query):
+    """
+    Execute a supabase-py query builder without blocking the event loop.
+
+    The client is synchronous, so .execute() runs in the threadpool and other
+    requests on this worker keep being served while PostgREST responds.
+
+    Usage:
+        response = await run_query(db.table("items").select("*"))
+    """
+    return await run_in_threadpool(query.execute)
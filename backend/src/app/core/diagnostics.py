@@ -0,0 +1,169 @@
+"""
+Event-loop lag diagnostics.
+
+A heartbeat coroutine sleeps for a fixed interval and records how late it
+wakes up (loop lag). A watchdog thread checks the heartbeat and, when the
+loop has been stuck longer than the threshold, captures the loop thread's
+stack and the API route whose handler is on it. This catches synchronous
+I/O inside async endpoints as it happens.
+
+Enabled with LOOP_DIAGNOSTICS_ENABLED; results are served at
+GET /api/v1/diagnostics/event-loop.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, UTC
+from typing import Optional
+
+from fastapi.routing import APIRoute
+
+from src.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LoopMonitor:
+    def __init__(
+        self,
+        interval: float = 0.05,
+        threshold: float = 0.1,
+        max_samples: int = 4096,
+        max_reports: int = 50,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self._samples: deque[float] = deque(maxlen=max_samples)
+        self._reports: deque[dict] = deque(maxlen=max_reports)
+        self._routes: dict = {}
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._beats = 0
+        self._pending_report: Optional[dict] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, app=None) -> None:
+        """Start monitoring the running loop. `app` is used to name routes in reports."""
+        if self.running:
+            return
+        if app is not None:
+            self._routes = {
+                route.endpoint.__code__: f"{','.join(sorted(route.methods))} {route.path}"
+                for route in app.routes
+                if isinstance(route, APIRoute)
+            }
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            # Measured from the previous beat (or start()), so a stall that
+            # begins before this task first runs is still counted
+            lag = max(0.0, now - self._last_beat - self.interval)
+            self._samples.append(lag)
+            self._last_beat = now
+            self._beats += 1
+
+            report = self._pending_report
+            if report is not None:
+                report["blocked_ms"] = round(lag * 1000, 1)
+                self._pending_report = None
+            elif lag > self.threshold:
+                # Stall too short for the watchdog to catch in the act
+                self._record(lag, route=None, stack=None)
+
+    def _watch(self) -> None:
+        reported_beat = -1
+        poll = max(self.threshold / 4, 0.005)
+        while not self._stop.wait(poll):
+            stalled = time.monotonic() - self._last_beat - self.interval
+            if stalled <= self.threshold or reported_beat == self._beats:
+                continue
+            reported_beat = self._beats
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._pending_report = self._record(
+                stalled,
+                route=self._route_for(frame),
+                stack="".join(traceback.format_stack(frame)),
+            )
+
+    def _route_for(self, frame) -> Optional[str]:
+        while frame is not None:
+            route = self._routes.get(frame.f_code)
+            if route:
+                return route
+            frame = frame.f_back
+        return None
+
+    def _record(self, blocked: float, route: Optional[str], stack: Optional[str]) -> dict:
+        report = {
+            "detected_at": datetime.now(UTC),
+            "blocked_ms": round(blocked * 1000, 1),
+            "route": route,
+            "stack": stack,
+        }
+        self._reports.append(report)
+        logger.warning(
+            "Event loop blocked for %.0f ms%s%s",
+            blocked * 1000,
+            f" in {route}" if route else "",
+            f"\n{stack}" if stack else "",
+        )
+        return report
+
+    def report(self) -> dict:
+        samples = sorted(self._samples)
+        return {
+            "enabled": self.running,
+            "threshold_ms": self.threshold * 1000,
+            "samples": len(samples),
+            "p50_ms": round(percentile(samples, 50) * 1000, 2),
+            "p90_ms": round(percentile(samples, 90) * 1000, 2),
+            "p99_ms": round(percentile(samples, 99) * 1000, 2),
+            "max_ms": round((samples[-1] if samples else 0.0) * 1000, 2),
+            "slow_callbacks": list(reversed(self._reports)),
+        }
+
+
+loop_monitor = LoopMonitor(
+    interval=settings.LOOP_LAG_SAMPLE_INTERVAL_MS / 1000,
+    threshold=settings.LOOP_LAG_THRESHOLD_MS / 1000,
+)
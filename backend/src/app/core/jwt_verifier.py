@@ -0,0 +1,137 @@
+"""
+Local verification of Supabase Auth access tokens.
+
+Supabase signs access tokens either with the project's JWT secret (HS256) or
+with an asymmetric key published at /auth/v1/.well-known/jwks.json. Both are
+cached here so get_current_user can check signature, expiry and audience
+without a round trip to Supabase Auth. Tokens signed by a key id we have not
+seen yet raise UnknownSigningKey; the caller falls back to db.auth.get_user
+while a JWKS refresh picks up the rotated key in the background.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+import jwt
+
+from src.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Algorithms Supabase issues access tokens with
+ASYMMETRIC_ALGORITHMS = {"RS256", "ES256", "EdDSA"}
+
+
+class UnknownSigningKey(Exception):
+    """The token was signed by a key that is not in the local cache."""
+
+
+class TokenVerifier:
+    def __init__(
+        self,
+        jwks_url: Optional[str],
+        secret: str = "",
+        audience: str = "authenticated",
+        min_refresh_interval: float = 30.0,
+    ):
+        self.jwks_url = jwks_url
+        self.secret = secret
+        self.audience = audience
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._refresh_lock = threading.Lock()
+        self._last_refresh = 0.0
+
+    @property
+    def key_ids(self) -> list[str]:
+        return list(self._keys)
+
+    def verify(self, token: str) -> dict:
+        """
+        Verify signature, expiry and audience and return the token claims.
+
+        Raises jwt.InvalidTokenError for bad tokens and UnknownSigningKey when
+        the token can't be checked locally.
+        """
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg")
+
+        if algorithm == "HS256":
+            if not self.secret:
+                raise UnknownSigningKey("no JWT secret configured")
+            key = self.secret
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            jwk = self._keys.get(header.get("kid"))
+            if jwk is None:
+                self.request_refresh()
+                raise UnknownSigningKey(header.get("kid"))
+            # Trust the algorithm pinned by the JWKS, not the token header
+            if jwk.algorithm_name != algorithm:
+                raise jwt.InvalidAlgorithmError("Token algorithm does not match signing key")
+            key = jwk.key
+        else:
+            raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {algorithm}")
+
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=self.audience,
+            options={"require": ["exp", "sub"]},
+        )
+
+    def refresh(self) -> None:
+        """Fetch the JWKS and swap in the new key set (blocking)."""
+        if not self.jwks_url:
+            return
+        with self._refresh_lock:
+            self._last_refresh = time.monotonic()
+            response = httpx.get(self.jwks_url, timeout=5.0)
+            response.raise_for_status()
+            keys = {}
+            for key_data in response.json().get("keys", []):
+                try:
+                    jwk = jwt.PyJWK(key_data)
+                except jwt.PyJWKError:
+                    # Skip key types this build can't use (e.g. missing crypto backend)
+                    continue
+                if jwk.key_id and jwk.algorithm_name in ASYMMETRIC_ALGORITHMS:
+                    keys[jwk.key_id] = jwk
+            # Replace wholesale so revoked keys stop validating after rotation
+            self._keys = keys
+
+    def request_refresh(self) -> None:
+        """Refresh in a background thread, at most once per min_refresh_interval."""
+        if not self.jwks_url:
+            return
+        if time.monotonic() - self._last_refresh < self.min_refresh_interval:
+            return
+        if self._refresh_lock.locked():
+            return
+        self._last_refresh = time.monotonic()
+        threading.Thread(target=self._safe_refresh, name="jwks-refresh", daemon=True).start()
+
+    async def refresh_async(self) -> None:
+        await asyncio.to_thread(self._safe_refresh)
+
+    def _safe_refresh(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning("JWKS refresh failed: %s", e)
+
+
+def _jwks_url() -> Optional[str]:
+    if not settings.SUPABASE_URL:
+        return None
+    return f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json"
+
+
+token_verifier = TokenVerifier(
+    jwks_url=_jwks_url(),
+    secret=settings.SUPABASE_JWT_SECRET,
+    audience=settings.SUPABASE_JWT_AUDIENCE,
+)
@@ -0,0 +1,99 @@
+"""
+In-process publish/subscribe for change notifications.
+
+Routers publish small notifications ("meeting 12 is now live", "event 3
+got a registration") after their writes succeed; the SSE endpoint in
+api/v1/stream.py forwards them to dashboards so they can update
+incrementally instead of re-fetching whole lists.
+
+Every subscriber gets its own bounded queue and publishing never blocks:
+when a slow client's queue fills up, its backlog is replaced by a single
+"resync" notification telling the client to re-fetch once.
+
+Notifications only reach subscribers in the same worker process, so with
+several workers a write is only pushed to clients connected to the
+worker that made it.
+"""
+import asyncio
+import itertools
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from src.app.core.config import settings
+
+TOPICS = ("meetings", "events", "registrations")
+
+
+@dataclass(frozen=True)
+class Notification:
+    id: int
+    topic: str
+    type: str
+    data: dict
+
+
+# Sent in place of notifications a slow subscriber missed
+RESYNC = "resync"
+
+
+@dataclass(eq=False)
+class Subscription:
+    topics: frozenset
+    queue: asyncio.Queue
+    dropped: int = 0
+
+    async def get(self) -> Notification:
+        return await self.queue.get()
+
+    def offer(self, notification: Notification) -> None:
+        if notification.topic not in self.topics:
+            return
+        if self.queue.full():
+            # Too far behind to catch up: replace the backlog with one resync
+            missed = self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.dropped += missed
+            self.queue.put_nowait(Notification(notification.id, notification.topic, RESYNC, {"dropped": missed}))
+        self.queue.put_nowait(notification)
+
+
+class Broker:
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = max(queue_size, 2)
+        self._subscribers: set[Subscription] = set()
+        self._listeners: list[Callable[[Notification], None]] = []
+        self._ids = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, topics: Optional[Iterable[str]] = None) -> Subscription:
+        subscription = Subscription(
+            topics=frozenset(topics or TOPICS),
+            queue=asyncio.Queue(maxsize=self.queue_size),
+        )
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def add_listener(self, listener: Callable[[Notification], None]) -> None:
+        """Call `listener` synchronously for every notification (e.g. cache invalidation)."""
+        self._listeners.append(listener)
+
+    def publish(self, topic: str, type: str, **data: Any) -> Notification:
+        """Fan a notification out to every subscriber of `topic`. Must run on the event loop."""
+        notification = Notification(next(self._ids), topic, type, data)
+        for listener in self._listeners:
+            listener(notification)
+        for subscription in self._subscribers:
+            subscription.offer(notification)
+        return notification
+
+    def clear(self) -> None:
+        self._subscribers.clear()
+
+
+broker = Broker(queue_size=settings.STREAM_QUEUE_SIZE)
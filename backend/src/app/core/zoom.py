@@ -0,0 +1,41 @@
+import time
+
+import jwt
+
+from src.app.core.cache import TTLCache
+from src.app.core.config import settings
+
+# (zoom_meeting_id, role) -> Meeting SDK signature. A signature only encodes
+# the meeting number and role, so everyone joining a meeting with the same
+# role can share one token; entries expire REFRESH_MARGIN seconds before
+# the token does, so a cached signature always has that long left to use.
+signature_cache = TTLCache(
+    maxsize=settings.ZOOM_SIGNATURE_CACHE_MAX_ENTRIES,
+    ttl=max(settings.ZOOM_SIGNATURE_TTL_SECONDS - settings.ZOOM_SIGNATURE_REFRESH_MARGIN_SECONDS, 0),
+)
+
+
+def sign(meeting_number: str, role: int) -> str:
+    """Issue a fresh Zoom Meeting SDK JWT (role: 0 = participant, 1 = host)."""
+    issued_at = int(time.time())
+    expires_at = issued_at + settings.ZOOM_SIGNATURE_TTL_SECONDS
+    payload = {
+        "sdkKey": settings.ZOOM_SDK_KEY,
+        "mn": meeting_number,
+        "role": role,
+        "iat": issued_at,
+        "exp": expires_at,
+        "appKey": settings.ZOOM_SDK_KEY,
+        "tokenExp": expires_at
+    }
+    return jwt.encode(payload, settings.ZOOM_SDK_SECRET, algorithm="HS256")
+
+
+def get_signature(meeting_number: str, role: int) -> str:
+    """Signature for (meeting, role), reused from the cache while it has time left."""
+    key = (str(meeting_number), role)
+    signature = signature_cache.get(key)
+    if signature is None:
+        signature = sign(meeting_number, role)
+        signature_cache.set(key, signature)
+    return signature
@@ -0,0 +1,419 @@
+"""
+In-memory index over volunteer availability slots.
+
+Slots are kept in a treap ordered by (time_start, availability_id) and each
+node carries the maximum slot duration and maximum end time of its subtree.
+That lets schedule_meeting ask "earliest slot that fits N minutes at or after
+time T" in O(log n) without pulling every availability row, and lets the
+index be updated in place when a booking splits or deletes a slot.
+
+The index is a per-process cache of the availabilities table: rows are
+loaded once (ids, times and the volunteer attributes used for preference
+scoring) and refreshed after AVAILABILITY_INDEX_TTL_SECONDS. A candidate
+is booked with the reserve_availability() RPC, which checks the slot
+still has the indexed times and splits it atomically; if another booking
+changed or took it first, the index is corrected and the next candidate
+is tried.
+
+Recurring availability_rules are expanded over the next
+AVAILABILITY_RULE_HORIZON_DAYS into virtual slots (negative ids). A virtual
+slot only becomes an availabilities row when it is booked, via
+materialize_occurrences().
+"""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, time as wall_time, timedelta, timezone, tzinfo
+from typing import Iterator, Optional
+from zoneinfo import ZoneInfo
+
+from supabase import Client
+
+from src.app.core.config import settings
+from src.app.core.database import run_query
+from src.app.domain.recurrence import RecurrenceRule, occurrences
+
+logger = logging.getLogger(__name__)
+
+def parse_timestamp(value) -> datetime:
+    """Parse a Supabase timestamp; naive values (TIMESTAMP columns) are UTC."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def db_timestamp(value: datetime) -> str:
+    """availabilities uses TIMESTAMP columns holding UTC."""
+    return value.astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def merge_intervals(intervals) -> list[tuple[datetime, datetime]]:
+    """Sort and merge overlapping or touching (start, end) intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def weekly_intervals(
+    rules, zone: tzinfo, range_start: date, range_end: date
+) -> list[tuple[datetime, datetime]]:
+    """
+    Expand weekly rules (weekday, start_time, end_time in `zone`) into UTC
+    intervals for every matching day from range_start to range_end
+    inclusive. Each day is localised separately, so DST changes keep the
+    local wall-clock times.
+    """
+    by_weekday = {}
+    for rule in rules:
+        by_weekday.setdefault(rule.weekday, []).append(rule)
+
+    intervals = []
+    day = range_start
+    while day <= range_end:
+        for rule in by_weekday.get(day.weekday(), ()):
+            start = datetime.combine(day, rule.start_time, tzinfo=zone)
+            end_day = day if rule.end_time > rule.start_time else day + timedelta(days=1)
+            end = datetime.combine(end_day, rule.end_time, tzinfo=zone)
+            intervals.append((start.astimezone(timezone.utc), end.astimezone(timezone.utc)))
+        day += timedelta(days=1)
+    return intervals
+
+
+def local_day_start(day: date, zone: tzinfo) -> datetime:
+    """Midnight of `day` in `zone`, as UTC."""
+    return datetime.combine(day, wall_time(), tzinfo=zone).astimezone(timezone.utc)
+
+
+@dataclass(frozen=True)
+class Slot:
+    availability_id: int
+    user_id: str
+    time_start: datetime
+    time_end: datetime
+
+    @property
+    def duration(self) -> timedelta:
+        return self.time_end - self.time_start
+
+    @property
+    def key(self) -> tuple:
+        return (self.time_start, self.availability_id)
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Slot":
+        return cls(
+            availability_id=row["availability_id"],
+            user_id=str(row["user_id"]),
+            time_start=parse_timestamp(row["time_start"]),
+            time_end=parse_timestamp(row["time_end"]),
+        )
+
+
+class _Node:
+    __slots__ = ("slot", "key", "priority", "left", "right", "max_end", "max_duration")
+
+    def __init__(self, slot: Slot):
+        self.slot = slot
+        self.key = slot.key
+        self.priority = random.random()
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.max_end = slot.time_end
+        self.max_duration = slot.duration
+
+    def update(self) -> None:
+        self.max_end = self.slot.time_end
+        self.max_duration = self.slot.duration
+        for child in (self.left, self.right):
+            if child is not None:
+                if child.max_end > self.max_end:
+                    self.max_end = child.max_end
+                if child.max_duration > self.max_duration:
+                    self.max_duration = child.max_duration
+
+
+def _split(node: Optional[_Node], key: tuple) -> tuple:
+    """Split into (keys < key, keys >= key)."""
+    if node is None:
+        return None, None
+    if node.key < key:
+        left, right = _split(node.right, key)
+        node.right = left
+        node.update()
+        return node, right
+    left, right = _split(node.left, key)
+    node.left = right
+    node.update()
+    return left, node
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+def _first_overlapping(node, after, before: datetime, need_end: datetime):
+    """Leftmost node with key > after, time_start < before and time_end >= need_end."""
+    if node is None or node.max_end < need_end:
+        return None
+    if after is not None and node.key <= after:
+        return _first_overlapping(node.right, after, before, need_end)
+    found = _first_overlapping(node.left, after, before, need_end)
+    if found is not None:
+        return found
+    if node.slot.time_start >= before:
+        return None
+    if node.slot.time_end >= need_end:
+        return node
+    return _first_overlapping(node.right, after, before, need_end)
+
+
+def _first_fitting(node, after, need_duration: timedelta):
+    """Leftmost node with key > after and duration >= need_duration."""
+    if node is None or node.max_duration < need_duration:
+        return None
+    if after is not None and node.key <= after:
+        return _first_fitting(node.right, after, need_duration)
+    found = _first_fitting(node.left, after, need_duration)
+    if found is not None:
+        return found
+    if node.slot.duration >= need_duration:
+        return node
+    return _first_fitting(node.right, after, need_duration)
+
+
+class AvailabilityIndex:
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._by_id: dict[int, Slot] = {}
+        # user_id -> volunteer attributes used for preference scoring
+        self.profiles: dict[str, dict] = {}
+        # virtual slot id -> (rule_id, local occurrence start)
+        self.virtual: dict[int, tuple[int, datetime]] = {}
+        self._next_virtual_id = -1
+        self.loaded_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, availability_id: int) -> bool:
+        return availability_id in self._by_id
+
+    def get(self, availability_id: int) -> Optional[Slot]:
+        return self._by_id.get(availability_id)
+
+    def has_slots_excluding(self, user_id) -> bool:
+        return any(slot.user_id != str(user_id) for slot in self._by_id.values())
+
+    def slots(self) -> list[Slot]:
+        return sorted(self._by_id.values(), key=lambda slot: slot.key)
+
+    def clear(self) -> None:
+        """Drop every slot; the next load_availability_index() reloads."""
+        self._root = None
+        self._by_id = {}
+        self.profiles = {}
+        self.virtual = {}
+        self._next_virtual_id = -1
+        self.loaded_at = None
+
+    def rebuild(self, slots, profiles: Optional[dict] = None) -> None:
+        self.clear()
+        for slot in slots:
+            self.add(slot)
+        self.profiles = profiles or {}
+        self.loaded_at = time.monotonic()
+
+    def is_stale(self, ttl: float) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > ttl
+
+    def add(self, slot: Slot) -> None:
+        if slot.availability_id in self._by_id:
+            self.remove(slot.availability_id)
+        left, right = _split(self._root, slot.key)
+        self._root = _merge(_merge(left, _Node(slot)), right)
+        self._by_id[slot.availability_id] = slot
+
+    def add_rule(self, row: dict, window_start: datetime, window_end: datetime) -> list[Slot]:
+        """Add virtual slots for an availability_rules row's occurrences in the window."""
+        added = []
+        for occurrence, start, end in rule_occurrences(row, window_start, window_end):
+            slot = Slot(
+                availability_id=self._next_virtual_id,
+                user_id=str(row["user_id"]),
+                time_start=start,
+                time_end=end,
+            )
+            self._next_virtual_id -= 1
+            self.virtual[slot.availability_id] = (row["rule_id"], occurrence)
+            self.add(slot)
+            added.append(slot)
+        return added
+
+    def remove(self, availability_id: int) -> Optional[Slot]:
+        self.virtual.pop(availability_id, None)
+        slot = self._by_id.pop(availability_id, None)
+        if slot is None:
+            return None
+        left, rest = _split(self._root, slot.key)
+        # rest starts with the node for slot.key; drop it
+        _, right = _split(rest, (slot.time_start, slot.availability_id + 1))
+        self._root = _merge(left, right)
+        return slot
+
+    def candidates(
+        self,
+        duration: timedelta,
+        not_before: Optional[datetime] = None,
+    ) -> Iterator[tuple[Slot, datetime]]:
+        """
+        Yield (slot, booking_start) for every slot that can hold `duration`
+        starting no earlier than `not_before`, earliest booking first.
+
+        Each step is a fresh O(log n) search, so the index may be modified
+        between steps (e.g. removing a candidate that turned out to be stale).
+        """
+        if not_before is not None:
+            # Slots already running at not_before: book from not_before
+            after = None
+            while True:
+                node = _first_overlapping(self._root, after, not_before, not_before + duration)
+                if node is None:
+                    break
+                yield node.slot, not_before
+                after = node.key
+            after = (not_before, -1)
+        else:
+            after = None
+
+        while True:
+            node = _first_fitting(self._root, after, duration)
+            if node is None:
+                return
+            yield node.slot, node.slot.time_start
+            after = node.key
+
+
+# Per-process index of the availabilities table
+availability_index = AvailabilityIndex()
+
+
+def rule_occurrences(row: dict, window_start: datetime, window_end: datetime):
+    """
+    (local occurrence start, UTC start, UTC end) for each occurrence of an
+    availability_rules row overlapping the UTC window.
+    """
+    zone = ZoneInfo(row.get("timezone") or "UTC")
+    duration = timedelta(minutes=row["duration_minutes"])
+    dtstart = datetime.fromisoformat(row["dtstart"]) if isinstance(row["dtstart"], str) else row["dtstart"]
+    exdates = [
+        datetime.fromisoformat(value) if isinstance(value, str) else value
+        for value in row.get("exdates") or []
+    ]
+    local_start = window_start.astimezone(zone).replace(tzinfo=None)
+    local_end = window_end.astimezone(zone).replace(tzinfo=None)
+    for occurrence in occurrences(
+        dtstart, RecurrenceRule.parse(row["rrule"]), local_start, local_end, duration, exdates
+    ):
+        start = occurrence.replace(tzinfo=zone).astimezone(timezone.utc)
+        end = (occurrence + duration).replace(tzinfo=zone).astimezone(timezone.utc)
+        yield occurrence, start, end
+
+
+def rule_horizon() -> tuple[datetime, datetime]:
+    """UTC window that availability rules are expanded over."""
+    now = datetime.now(timezone.utc)
+    return now, now + timedelta(days=settings.AVAILABILITY_RULE_HORIZON_DAYS)
+
+
+async def load_availability_index(db: Client, force: bool = False) -> AvailabilityIndex:
+    """Return the availability index, reloading slots, rules and profiles if it has gone stale."""
+    if force or availability_index.is_stale(settings.AVAILABILITY_INDEX_TTL_SECONDS):
+        window_start, window_end = rule_horizon()
+        profile_columns = "users(gender, user_type, experience_points)"
+        slots_response, rules_response = await asyncio.gather(
+            run_query(
+                db.table("availabilities").select(
+                    f"availability_id, user_id, time_start, time_end, {profile_columns}"
+                )
+            ),
+            run_query(
+                db.table("availability_rules")
+                .select(f"*, {profile_columns}")
+                .or_(f"until_utc.is.null,until_utc.gt.{db_timestamp(window_start)}")
+            ),
+        )
+        rows = slots_response.data or []
+        rules = rules_response.data or []
+        availability_index.rebuild(
+            (Slot.from_row(row) for row in rows),
+            profiles={str(row["user_id"]): row.get("users") or {} for row in rows + rules},
+        )
+        for rule in rules:
+            availability_index.add_rule(rule, window_start, window_end)
+    return availability_index
+
+
+async def materialize_occurrences(db: Client, index: AvailabilityIndex, slots: list[Slot]) -> dict:
+    """
+    Turn virtual slots into availabilities rows (one RPC for all of them) so
+    they can be reserved. Returns virtual id -> concrete Slot, or None if the
+    occurrence was booked or cancelled elsewhere; the index is updated.
+    """
+    entries = [(slot, *index.virtual[slot.availability_id]) for slot in slots]
+    response = await run_query(db.rpc("materialize_availability_occurrences", {
+        "p_occurrences": [
+            {
+                "rule_id": rule_id,
+                "occurrence": occurrence.isoformat(),
+                "time_start": db_timestamp(slot.time_start),
+                "time_end": db_timestamp(slot.time_end),
+            }
+            for slot, rule_id, occurrence in entries
+        ]
+    }))
+
+    result = {}
+    for (slot, _, _), row in zip(entries, response.data):
+        index.remove(slot.availability_id)
+        concrete = Slot.from_row(row) if row else None
+        if concrete is not None:
+            index.add(concrete)
+        result[slot.availability_id] = concrete
+    return result
+
+
+async def compact_availabilities(db: Client, min_minutes: Optional[int] = None) -> dict:
+    """
+    Purge expired slots, merge adjacent fragments and drop unbookable ones
+    (compact_availabilities() RPC), then reload the index from the result.
+    """
+    if min_minutes is None:
+        min_minutes = settings.AVAILABILITY_MIN_BOOKABLE_MINUTES
+    response = await run_query(db.rpc("compact_availabilities", {"p_min_minutes": min_minutes}))
+    report = response.data
+    logger.info(
+        "Availability compaction reclaimed %s rows (%s expired, %s merged, %s too short), %s remain",
+        report["rows_reclaimed"], report["expired"], report["merged"],
+        report["dropped_short"], report["remaining"],
+    )
+    await load_availability_index(db, force=True)
+    return report
@@ -0,0 +1,155 @@
+"""
+Buffered event check-in.
+
+Volunteers scan students in at the door in bursts, so each scan only
+records (event, user, time) in memory and returns; a PeriodicTask flushes
+everything pending every few seconds with one check_in_attendees() call
+(migration 019), which marks the whole batch 'attended' in a single
+UPDATE. A failed flush puts the batch back for the next attempt.
+
+Rescans are harmless twice over: users already checked in (pending or
+flushed by this process) are answered from memory without being queued
+again, and the RPC only changes 'registered' rows, so duplicates that do
+reach it - from another worker, or a retried batch - are no-ops. Scans
+the RPC skipped (no registration, waitlisted, or already attended) are
+forgotten after the flush, so a user registered at the door can be
+scanned again.
+
+Attendance is events.attended_count (kept by a trigger), refreshed by
+every flush that touches the event and otherwise cached for a few
+seconds, plus this process's pending check-ins. Reading the count also
+confirms the event exists, so scans for unknown events are rejected
+without a query per scan. Pending check-ins haven't been matched against
+registrations yet: until the flush drops them, scans of waitlisted or
+unregistered users are counted too. Other workers' scans show up once
+they have flushed and the cached count expires.
+"""
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from supabase import Client
+
+from src.app.core.cache import TTLCache
+from src.app.core.config import settings
+from src.app.core.database import run_query
+from src.app.core.pubsub import broker
+from src.app.domain.availability import db_timestamp
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+ALREADY_CHECKED_IN = "already_checked_in"
+
+
+class CheckInBuffer:
+    def __init__(
+        self,
+        max_batch: int = 5000,
+        attendance_ttl: float = 5.0,
+        max_events: int = 1000,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.max_batch = max_batch
+        self._clock = clock
+        # (event_id, user_id) -> scan time, in arrival order
+        self._pending: dict[tuple[int, str], datetime] = {}
+        self._pending_per_event: Counter = Counter()
+        # Users this process has seen checked in, per event (a day is
+        # plenty for rescans at the door; the RPC dedupes after that)
+        self._checked_in = TTLCache(max_events, 24 * 3600)
+        # Last attended_count read for each event
+        self._attended = TTLCache(max_events, attendance_ttl)
+        self._flush_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, event_id: int, user_ids: list[str]) -> list[str]:
+        """Queue check-ins; returns each user's status ("queued" or "already_checked_in")."""
+        now = self._clock()
+        seen = self._checked_in.get(event_id)
+        if seen is None:
+            seen = set()
+            self._checked_in.set(event_id, seen)
+        statuses = []
+        for user_id in user_ids:
+            if user_id in seen:
+                statuses.append(ALREADY_CHECKED_IN)
+                continue
+            seen.add(user_id)
+            self._pending[(event_id, user_id)] = now
+            self._pending_per_event[event_id] += 1
+            statuses.append(QUEUED)
+        return statuses
+
+    def pending(self, event_id: int) -> int:
+        return self._pending_per_event[event_id]
+
+    def attended(self, event_id: int) -> Optional[int]:
+        """Flushed attendance last read for the event, or None if unknown/expired."""
+        return self._attended.get(event_id)
+
+    async def load_attended(self, db: Client, event_id: int) -> Optional[int]:
+        """Flushed attendance, read through the cache; None if the event doesn't exist."""
+        attended = self._attended.get(event_id)
+        if attended is None:
+            response = await run_query(db.table("events").select("attended_count").eq("event_id", event_id))
+            if not response.data:
+                return None
+            attended = response.data[0].get("attended_count") or 0
+            self._attended.set(event_id, attended)
+        return attended
+
+    async def flush(self, db: Client) -> int:
+        """Write pending check-ins in batches; returns how many registrations changed."""
+        changed = 0
+        async with self._flush_lock:
+            while self._pending:
+                batch = dict(list(self._pending.items())[:self.max_batch])
+                for key in batch:
+                    del self._pending[key]
+                events = Counter(event_id for event_id, _ in batch)
+                self._pending_per_event -= events
+                try:
+                    response = await run_query(db.rpc("check_in_attendees", {"p_checkins": [
+                        {"event_id": event_id, "user_id": user_id, "checked_in_at": db_timestamp(at)}
+                        for (event_id, user_id), at in batch.items()
+                    ]}))
+                except Exception:
+                    # Keep the scans (ahead of newer ones) for the next flush
+                    self._pending = {**batch, **self._pending}
+                    self._pending_per_event += events
+                    raise
+                result = response.data
+                changed += len(result["checked_in"])
+                self._forget_skipped(batch, result["checked_in"])
+                for event_id, count in result["attended"].items():
+                    self._attended.set(int(event_id), count)
+                for event_id in events:
+                    broker.publish(
+                        "events", "attendance", event_id=event_id,
+                        attended=(self._attended.get(event_id) or 0) + self.pending(event_id),
+                    )
+        if changed:
+            logger.info("Checked in %s registrations", changed)
+        return changed
+
+    def _forget_skipped(self, batch: dict[tuple[int, str], datetime], checked_in: list[dict]) -> None:
+        written = {(int(row["event_id"]), str(row["user_id"])) for row in checked_in}
+        for event_id, user_id in batch:
+            if (event_id, user_id) not in written:
+                seen = self._checked_in.get(event_id)
+                if seen is not None:
+                    seen.discard(user_id)
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self._pending_per_event.clear()
+        self._checked_in.clear()
+        self._attended.clear()
+
+
+checkin_buffer = CheckInBuffer(settings.CHECKIN_MAX_BATCH, settings.CHECKIN_ATTENDANCE_TTL_SECONDS)
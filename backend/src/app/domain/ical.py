@@ -0,0 +1,101 @@
+"""
+iCalendar (RFC 5545) feed writer.
+
+write_calendar() is a generator of CRLF-terminated content lines, so a
+feed is produced one component at a time and callers can hash, cache or
+stream it without building intermediate objects. Times are written in
+UTC. Recurring events are emitted once with their RRULE and EXDATEs
+rather than expanded, so calendar apps show the whole series.
+"""
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+from src.app.domain.availability import parse_timestamp
+from src.app.domain.recurrence import RecurrenceRule
+
+PRODID = "-//Learning Platform//Schedule Feed//EN"
+
+# DTSTAMP for rows without a creation time. Fixed, so a feed whose rows
+# haven't changed is byte-identical (and keeps its ETag) when regenerated.
+DEFAULT_STAMP = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def escape_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Fold a content line at 75 octets, as RFC 5545 requires."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    start, limit = 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Don't split a UTF-8 sequence
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_utc(value) -> str:
+    return parse_timestamp(value).astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _rrule(rule_text: str) -> str:
+    """The stored rule with UNTIL in UTC, matching the UTC DTSTART."""
+    rule = RecurrenceRule.parse(rule_text)
+    text = str(rule)
+    return text + "Z" if rule.until is not None else text
+
+
+def _event_lines(event: dict) -> Iterator[str]:
+    yield "BEGIN:VEVENT"
+    yield f"UID:event-{event['event_id']}"
+    yield f"DTSTAMP:{format_utc(event.get('created_at') or DEFAULT_STAMP)}"
+    yield f"DTSTART:{format_utc(event['start_time'])}"
+    yield f"DTEND:{format_utc(event['end_time'])}"
+    yield f"SUMMARY:{escape_text(event.get('name') or 'Event')}"
+    if event.get("recurrence_rule"):
+        yield f"RRULE:{_rrule(event['recurrence_rule'])}"
+        exdates = event.get("recurrence_exdates") or []
+        if exdates:
+            yield "EXDATE:" + ",".join(format_utc(value) for value in exdates)
+    yield "END:VEVENT"
+
+
+def _meeting_lines(meeting: dict) -> Iterator[str]:
+    yield "BEGIN:VEVENT"
+    yield f"UID:meeting-{meeting['meeting_id']}"
+    yield f"DTSTAMP:{format_utc(meeting.get('created_at') or DEFAULT_STAMP)}"
+    yield f"DTSTART:{format_utc(meeting['start_time'])}"
+    yield f"DTEND:{format_utc(meeting['end_time'])}"
+    yield f"SUMMARY:{escape_text(meeting.get('title') or 'Meeting')}"
+    if meeting.get("description"):
+        yield f"DESCRIPTION:{escape_text(meeting['description'])}"
+    if meeting.get("zoom_meeting_url"):
+        yield f"URL:{meeting['zoom_meeting_url']}"
+    yield "STATUS:CANCELLED" if meeting.get("status") == "cancelled" else "STATUS:CONFIRMED"
+    yield "END:VEVENT"
+
+
+def write_calendar(name: str, events: Iterable[dict], meetings: Iterable[dict]) -> Iterator[str]:
+    """Content lines of a VCALENDAR holding `events` and `meetings` rows."""
+    yield fold("BEGIN:VCALENDAR")
+    yield fold("VERSION:2.0")
+    yield fold(f"PRODID:{PRODID}")
+    yield fold("CALSCALE:GREGORIAN")
+    yield fold(f"X-WR-CALNAME:{escape_text(name)}")
+    for event in events:
+        for line in _event_lines(event):
+            yield fold(line)
+    for meeting in meetings:
+        for line in _meeting_lines(meeting):
+            yield fold(line)
+    yield fold("END:VCALENDAR")
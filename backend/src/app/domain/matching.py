@@ -0,0 +1,255 @@
+"""
+Batch assignment of meeting requests to volunteer availability.
+
+Requests are grouped by duration and handled longest first. For each group
+the free availability is carved into back-to-back positions of that length
+and requests are matched to positions with min-cost max-flow, so the number
+of matched requests is maximal for the group; among maximum matchings the
+solver prefers earlier meetings and, with balance_load, spreads meetings
+across volunteers (each extra meeting for the same volunteer costs more
+than any difference in start time). Positions used by one group are cut out
+of the free intervals before the next group is matched.
+
+Positions are aligned to the start of each free interval (or the earliest
+requested window), so a request whose window straddles two positions may
+go unmatched even though a shifted start would fit.
+"""
+import heapq
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from src.app.domain.availability import Slot
+
+# Earliest eligible positions kept per request (per volunteer when
+# balancing). Enough to keep the matching maximal for groups up to this
+# size; bounds the graph for large cohorts.
+MAX_CANDIDATES_PER_REQUEST = 50
+
+
+@dataclass(frozen=True)
+class MatchRequest:
+    requester_id: str
+    duration: timedelta
+    window_start: Optional[datetime] = None
+    window_end: Optional[datetime] = None
+
+
+@dataclass(frozen=True)
+class Assignment:
+    slot: Slot
+    start: datetime
+    end: datetime
+
+
+class MinCostFlow:
+    """Successive shortest paths with Dijkstra and Johnson potentials (costs >= 0)."""
+
+    def __init__(self, nodes: int):
+        self.graph: list[list[int]] = [[] for _ in range(nodes)]
+        self.to: list[int] = []
+        self.cap: list[int] = []
+        self.cost: list[int] = []
+
+    def add_edge(self, u: int, v: int, cap: int, cost: int) -> int:
+        """Add u -> v and its residual edge; returns the forward edge id."""
+        edge = len(self.to)
+        self.graph[u].append(edge)
+        self.to.append(v)
+        self.cap.append(cap)
+        self.cost.append(cost)
+        self.graph[v].append(edge + 1)
+        self.to.append(u)
+        self.cap.append(0)
+        self.cost.append(-cost)
+        return edge
+
+    def flow(self, edge: int) -> int:
+        return self.cap[edge ^ 1]
+
+    def solve(self, source: int, sink: int) -> tuple[int, int]:
+        """Push as much flow as possible at minimum cost; returns (flow, cost)."""
+        nodes = len(self.graph)
+        potential = [0] * nodes
+        total_flow = total_cost = 0
+        while True:
+            dist = [None] * nodes
+            via = [-1] * nodes
+            dist[source] = 0
+            heap = [(0, source)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d != dist[u]:
+                    continue
+                for edge in self.graph[u]:
+                    if not self.cap[edge]:
+                        continue
+                    v = self.to[edge]
+                    nd = d + self.cost[edge] + potential[u] - potential[v]
+                    if dist[v] is None or nd < dist[v]:
+                        dist[v] = nd
+                        via[v] = edge
+                        heapq.heappush(heap, (nd, v))
+            if dist[sink] is None:
+                return total_flow, total_cost
+
+            for node in range(nodes):
+                if dist[node] is not None:
+                    potential[node] += dist[node]
+
+            push = None
+            node = sink
+            while node != source:
+                edge = via[node]
+                push = self.cap[edge] if push is None else min(push, self.cap[edge])
+                node = self.to[edge ^ 1]
+            node = sink
+            while node != source:
+                edge = via[node]
+                self.cap[edge] -= push
+                self.cap[edge ^ 1] += push
+                node = self.to[edge ^ 1]
+            total_flow += push
+            total_cost += push * (potential[sink] - potential[source])
+
+
+def _minutes(delta: timedelta) -> int:
+    return int(delta.total_seconds() // 60)
+
+
+def _carve(free: dict, duration: timedelta, lo: Optional[datetime], hi: Optional[datetime]) -> list:
+    """Back-to-back (start, availability_id) positions of `duration` in the free intervals."""
+    positions = []
+    for availability_id, intervals in free.items():
+        for start, end in intervals:
+            if lo is not None and start < lo:
+                start = lo
+            if hi is not None and end > hi:
+                end = hi
+            while start + duration <= end:
+                positions.append((start, availability_id))
+                start += duration
+    positions.sort()
+    return positions
+
+
+def _match_group(
+    requests: dict[int, MatchRequest],
+    duration: timedelta,
+    free: dict,
+    slots: dict[int, Slot],
+    load: Counter,
+    balance_load: bool,
+) -> dict[int, tuple[int, datetime]]:
+    """Match one duration group; returns request key -> (availability_id, start)."""
+    starts = [r.window_start for r in requests.values()]
+    ends = [r.window_end for r in requests.values()]
+    lo = None if None in starts else min(starts)
+    hi = None if None in ends else max(ends)
+    positions = _carve(free, duration, lo, hi)
+    if not positions:
+        return {}
+    position_starts = [start for start, _ in positions]
+
+    # Nodes: source, requests, positions, volunteers, sink
+    keys = list(requests)
+    volunteers = sorted({slots[availability_id].user_id for _, availability_id in positions})
+    volunteer_node = {user_id: 1 + len(keys) + len(positions) + i for i, user_id in enumerate(volunteers)}
+    source, sink = 0, 1 + len(keys) + len(positions) + len(volunteers)
+    flow = MinCostFlow(sink + 1)
+
+    keep = min(len(keys), MAX_CANDIDATES_PER_REQUEST)
+    candidate_edges = []
+    used_positions = set()
+    for i, key in enumerate(keys):
+        request = requests[key]
+        flow.add_edge(source, 1 + i, 1, 0)
+        first = bisect_left(position_starts, request.window_start) if request.window_start else 0
+        # Earliest `keep` positions overall, or per volunteer when balancing
+        # (otherwise the earliest volunteer could hide everyone else)
+        found = Counter()
+        for p in range(first, len(positions)):
+            start, availability_id = positions[p]
+            if request.window_end is not None and start + duration > request.window_end:
+                break
+            user_id = slots[availability_id].user_id
+            if user_id == request.requester_id:
+                continue
+            bucket = user_id if balance_load else None
+            if found[bucket] == keep:
+                if balance_load:
+                    continue
+                break
+            offset = _minutes(start - (request.window_start or positions[0][0]))
+            candidate_edges.append((key, p, flow.add_edge(1 + i, 1 + len(keys) + p, 1, offset)))
+            used_positions.add(p)
+            found[bucket] += 1
+
+    if not candidate_edges:
+        return {}
+
+    # Per-volunteer marginal costs: flat, or increasing with load when balancing
+    balance_weight = max(flow.cost[edge] for _, _, edge in candidate_edges) + 1
+    per_volunteer = Counter(slots[positions[p][1]].user_id for p in used_positions)
+    for p in used_positions:
+        user_id = slots[positions[p][1]].user_id
+        flow.add_edge(1 + len(keys) + p, volunteer_node[user_id], 1, 0)
+    for user_id, count in per_volunteer.items():
+        if balance_load:
+            for k in range(min(count, len(keys))):
+                flow.add_edge(volunteer_node[user_id], sink, 1, balance_weight * (load[user_id] + k))
+        else:
+            flow.add_edge(volunteer_node[user_id], sink, count, 0)
+
+    flow.solve(source, sink)
+
+    matched = {}
+    for key, p, edge in candidate_edges:
+        if flow.flow(edge):
+            start, availability_id = positions[p]
+            matched[key] = (availability_id, start)
+    return matched
+
+
+def _cut(intervals: list, start: datetime, end: datetime) -> list:
+    """Remove [start, end) from a list of disjoint intervals."""
+    remaining = []
+    for interval_start, interval_end in intervals:
+        if end <= interval_start or start >= interval_end:
+            remaining.append((interval_start, interval_end))
+            continue
+        if interval_start < start:
+            remaining.append((interval_start, start))
+        if end < interval_end:
+            remaining.append((end, interval_end))
+    return remaining
+
+
+def assign(
+    requests: dict[int, MatchRequest],
+    slots: list[Slot],
+    balance_load: bool = False,
+) -> dict[int, Assignment]:
+    """
+    Assign requests (keyed by caller-chosen ids) to non-overlapping meeting
+    times inside `slots`. Unmatched requests are left out of the result.
+    """
+    by_id = {slot.availability_id: slot for slot in slots}
+    free = {slot.availability_id: [(slot.time_start, slot.time_end)] for slot in slots}
+    load: Counter = Counter()
+
+    groups = defaultdict(dict)
+    for key, request in requests.items():
+        groups[request.duration][key] = request
+
+    assignments = {}
+    for duration in sorted(groups, reverse=True):
+        matched = _match_group(groups[duration], duration, free, by_id, load, balance_load)
+        for key, (availability_id, start) in matched.items():
+            slot = by_id[availability_id]
+            assignments[key] = Assignment(slot=slot, start=start, end=start + duration)
+            free[availability_id] = _cut(free[availability_id], start, start + duration)
+            load[slot.user_id] += 1
+    return assignments
@@ -0,0 +1,171 @@
+"""
+Time-driven meeting status changes.
+
+Meetings move scheduled -> live at start_time and live -> ended at
+end_time. Instead of a timer per meeting or a polling query, the
+scheduler keeps one heap of upcoming transitions and a single task that
+sleeps until the earliest one is due. Everything due in a tick is applied
+with one apply_meeting_status_transitions() call (migration 013), which
+only moves meetings forward, so manual ends/cancellations win and
+duplicate or stale heap entries are harmless.
+
+The heap is rebuilt from the open (scheduled/live) meetings at startup;
+create_meeting and status updates push new entries. Each worker process
+runs its own scheduler; the RPC is idempotent, so overlapping workers
+only repeat no-op writes.
+"""
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from supabase import Client
+
+from src.app.core.config import settings
+from src.app.core.database import run_query
+from src.app.domain.availability import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Transition targets, in the order a meeting goes through them
+LIVE = "live"
+ENDED = "ended"
+
+
+class MeetingStatusScheduler:
+    def __init__(
+        self,
+        max_sleep: float = 60.0,
+        resolution: float = 1.0,
+        retry_delay: float = 5.0,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.max_sleep = max_sleep
+        # Transitions due within this many seconds are applied together
+        self.resolution = timedelta(seconds=resolution)
+        self.retry_delay = timedelta(seconds=retry_delay)
+        self._clock = clock
+        self._heap: list[tuple[datetime, int, str]] = []
+        self._wakeup = asyncio.Event()
+        self._listeners: list[Callable[[dict[str, list[int]]], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._db: Optional[Client] = None
+        self.loaded = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def subscribe(self, listener: Callable[[dict[str, list[int]]], None]) -> None:
+        """Call `listener({"live": [...], "ended": [...]})` after each applied batch."""
+        self._listeners.append(listener)
+
+    def schedule(self, meeting: dict) -> None:
+        """Queue the remaining transitions of a meetings row."""
+        status = meeting.get("status")
+        meeting_id = meeting["meeting_id"]
+        earliest = self._heap[0][0] if self._heap else None
+        if status == "scheduled":
+            heapq.heappush(self._heap, (parse_timestamp(meeting["start_time"]), meeting_id, LIVE))
+        if status in ("scheduled", "live"):
+            heapq.heappush(self._heap, (parse_timestamp(meeting["end_time"]), meeting_id, ENDED))
+        if self._heap and (earliest is None or self._heap[0][0] < earliest):
+            # New earliest deadline: cut the current sleep short
+            self._wakeup.set()
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self.loaded = False
+
+    async def load(self, db: Client) -> None:
+        """Rebuild the heap from every meeting that hasn't ended yet."""
+        response = await run_query(
+            db.table("meetings")
+            .select("meeting_id, start_time, end_time, status")
+            .in_("status", ["scheduled", "live"])
+        )
+        self._heap.clear()
+        for meeting in response.data or []:
+            self.schedule(meeting)
+        self.loaded = True
+        logger.info("Meeting status scheduler loaded %d transitions", len(self._heap))
+
+    def _pop_due(self, now: datetime) -> dict[int, str]:
+        """Remove due entries; per meeting only the furthest target matters."""
+        due: dict[int, str] = {}
+        horizon = now + self.resolution
+        while self._heap and self._heap[0][0] <= horizon:
+            _, meeting_id, target = heapq.heappop(self._heap)
+            if due.get(meeting_id) != ENDED:
+                due[meeting_id] = target
+        return due
+
+    async def tick(self, db: Client) -> dict[str, list[int]]:
+        """Apply every transition that is due; returns the meetings that changed."""
+        due = self._pop_due(self._clock())
+        if not due:
+            return {LIVE: [], ENDED: []}
+        try:
+            response = await run_query(db.rpc("apply_meeting_status_transitions", {
+                "p_live": sorted(i for i, target in due.items() if target == LIVE),
+                "p_ended": sorted(i for i, target in due.items() if target == ENDED),
+            }))
+        except Exception:
+            # Put the batch back so a later tick retries it
+            retry_at = self._clock() + self.retry_delay
+            for meeting_id, target in due.items():
+                heapq.heappush(self._heap, (retry_at, meeting_id, target))
+            raise
+        changed = {LIVE: response.data.get(LIVE, []), ENDED: response.data.get(ENDED, [])}
+        if changed[LIVE] or changed[ENDED]:
+            logger.info("Meeting status scheduler: %d live, %d ended", len(changed[LIVE]), len(changed[ENDED]))
+            for listener in self._listeners:
+                listener(changed)
+        return changed
+
+    def _seconds_until_next(self) -> float:
+        if not self._heap:
+            return self.max_sleep
+        wait = (self._heap[0][0] - self._clock()).total_seconds()
+        return min(max(wait, 0.0), self.max_sleep)
+
+    def start(self, db: Client) -> None:
+        if not self.running:
+            self._db = db
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="meeting-status-scheduler")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if not self.loaded:
+                    await self.load(self._db)
+                await self.tick(self._db)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Meeting status scheduler tick failed")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._seconds_until_next())
+            except asyncio.TimeoutError:
+                pass
+
+
+meeting_status_scheduler = MeetingStatusScheduler(
+    max_sleep=settings.MEETING_STATUS_MAX_SLEEP_SECONDS,
+)
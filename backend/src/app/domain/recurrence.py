@@ -0,0 +1,186 @@
+"""
+Minimal RRULE (RFC 5545) support for recurring events and availability.
+
+Supported parts: FREQ=DAILY|WEEKLY, INTERVAL, BYDAY (weekly only, plain
+weekday codes), COUNT and UNTIL. Weeks start on Monday (WKST=MO).
+
+Rules are stored once and expanded lazily: occurrences() jumps straight to
+the first period that can overlap the requested window instead of walking
+from DTSTART, so reading one week of a year-long series only generates that
+week's occurrences. Arithmetic is done on whatever datetimes are passed in,
+so callers expanding local wall-clock times pass naive local values and
+localise the results.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional
+
+WEEKDAY_CODES = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+
+@dataclass(frozen=True)
+class RecurrenceRule:
+    freq: str  # "DAILY" or "WEEKLY"
+    interval: int = 1
+    byday: tuple[int, ...] = ()  # weekdays, 0 = Monday
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+
+    @classmethod
+    def parse(cls, text: str) -> "RecurrenceRule":
+        """Parse "FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10"; raises ValueError if unsupported."""
+        parts = {}
+        for part in text.strip().removeprefix("RRULE:").split(";"):
+            if not part:
+                continue
+            key, sep, value = part.partition("=")
+            if not sep:
+                raise ValueError(f"Malformed RRULE part: {part}")
+            parts[key.upper()] = value
+
+        freq = parts.pop("FREQ", "").upper()
+        if freq not in ("DAILY", "WEEKLY"):
+            raise ValueError("FREQ must be DAILY or WEEKLY")
+        interval = int(parts.pop("INTERVAL", "1"))
+        if interval < 1:
+            raise ValueError("INTERVAL must be positive")
+
+        byday = ()
+        if "BYDAY" in parts:
+            if freq != "WEEKLY":
+                raise ValueError("BYDAY is only supported with FREQ=WEEKLY")
+            try:
+                byday = tuple(sorted({WEEKDAY_CODES.index(code.upper()) for code in parts.pop("BYDAY").split(",")}))
+            except ValueError:
+                raise ValueError("BYDAY must list weekday codes (MO..SU)")
+
+        count = int(parts.pop("COUNT")) if "COUNT" in parts else None
+        until = _parse_until(parts.pop("UNTIL")) if "UNTIL" in parts else None
+        if count is not None and until is not None:
+            raise ValueError("COUNT and UNTIL can't both be set")
+        if count is not None and count < 1:
+            raise ValueError("COUNT must be positive")
+        if parts:
+            raise ValueError(f"Unsupported RRULE parts: {', '.join(sorted(parts))}")
+        return cls(freq=freq, interval=interval, byday=byday, count=count, until=until)
+
+    def __str__(self) -> str:
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.byday:
+            parts.append("BYDAY=" + ",".join(WEEKDAY_CODES[day] for day in self.byday))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append("UNTIL=" + self.until.strftime("%Y%m%dT%H%M%S"))
+        return ";".join(parts)
+
+
+def _parse_until(value: str) -> datetime:
+    value = value.rstrip("Z")
+    for fmt in ("%Y%m%dT%H%M%S", "%Y%m%d"):
+        try:
+            until = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        # Date-only UNTIL includes the whole day
+        return until if "T" in value else until + timedelta(days=1) - timedelta(microseconds=1)
+    raise ValueError("UNTIL must look like 20240131 or 20240131T170000")
+
+
+def _as_comparable(value: datetime, like: datetime) -> datetime:
+    """Match `value`'s awareness to `like` (UNTIL is parsed naive)."""
+    if like.tzinfo is not None and value.tzinfo is None:
+        return value.replace(tzinfo=like.tzinfo)
+    if like.tzinfo is None and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+
+def _ceil_div(a: int, b: int) -> int:
+    return -(-a // b)
+
+
+def occurrences(
+    dtstart: datetime,
+    rule: RecurrenceRule,
+    window_start: datetime,
+    window_end: datetime,
+    duration: timedelta = timedelta(0),
+    exdates: Iterable[datetime] = (),
+) -> Iterator[datetime]:
+    """
+    Yield occurrence starts whose [start, start + duration) overlaps
+    [window_start, window_end) (or, for zero duration, that fall inside
+    it), in order, skipping `exdates`.
+    """
+    excluded = set(exdates)
+    until = _as_comparable(rule.until, dtstart) if rule.until is not None else None
+    # Earliest start that can still overlap the window
+    lower = window_start - duration
+    if rule.freq == "DAILY":
+        occurrences_iter = _daily(dtstart, rule, lower)
+    else:
+        occurrences_iter = _weekly(dtstart, rule, lower)
+
+    for index, start in occurrences_iter:
+        if rule.count is not None and index >= rule.count:
+            return
+        if until is not None and start > until:
+            return
+        if start >= window_end:
+            return
+        if start + duration <= window_start and not (duration == timedelta(0) and start == window_start):
+            continue
+        if start in excluded:
+            continue
+        yield start
+
+
+def _daily(dtstart: datetime, rule: RecurrenceRule, lower: datetime) -> Iterator[tuple[int, datetime]]:
+    """(occurrence index, start) from the first period at or after `lower`."""
+    step = timedelta(days=rule.interval)
+    index = max(0, _ceil_div(int((lower - dtstart).total_seconds()), int(step.total_seconds())))
+    start = dtstart + index * step
+    while True:
+        yield index, start
+        index += 1
+        start += step
+
+
+def _weekly(dtstart: datetime, rule: RecurrenceRule, lower: datetime) -> Iterator[tuple[int, datetime]]:
+    """(occurrence index, start) from the first week that can reach `lower`."""
+    days = rule.byday or (dtstart.weekday(),)
+    week_zero = dtstart - timedelta(days=dtstart.weekday())
+    step = timedelta(weeks=rule.interval)
+    first_week = [day for day in days if week_zero + timedelta(days=day) >= dtstart]
+
+    # Skip whole periods that end before `lower`
+    period = 0
+    if lower > week_zero:
+        period = max(0, (lower - week_zero) // step)
+    index = 0 if period == 0 else len(first_week) + (period - 1) * len(days)
+
+    while True:
+        week_start = week_zero + period * step
+        for day in (first_week if period == 0 else days):
+            yield index, week_start + timedelta(days=day)
+            index += 1
+        period += 1
+
+
+def last_occurrence(dtstart: datetime, rule: RecurrenceRule) -> Optional[datetime]:
+    """Start of the final occurrence, or None for an open-ended rule."""
+    if rule.count is None and rule.until is None:
+        return None
+    until = _as_comparable(rule.until, dtstart) if rule.until is not None else None
+    generator = _daily(dtstart, rule, dtstart) if rule.freq == "DAILY" else _weekly(dtstart, rule, dtstart)
+    last = dtstart
+    for index, start in generator:
+        if rule.count is not None and index >= rule.count:
+            break
+        if until is not None and start > until:
+            break
+        last = start
+    return last
@@ -1,11 +1,24 @@
-from datetime import datetime
-from pydantic import BaseModel
+from datetime import date, datetime, time
+from pydantic import BaseModel, Field
 from typing import Optional, List
 
 
+class MatchPreferences(BaseModel):
+    """Weighted ranking criteria for schedule_meeting; zero weights are ignored."""
+    preferred_gender: Optional[str] = None
+    gender_weight: float = Field(default=1.0, ge=0)
+    preferred_user_type: Optional[str] = None  # e.g. "volunteer"
+    user_type_weight: float = Field(default=1.0, ge=0)
+    experience_weight: float = Field(default=0.5, ge=0)
+    fit_weight: float = Field(default=0.5, ge=0)  # favour slots the meeting fills
+    load_weight: float = Field(default=0.5, ge=0)  # penalise recently busy volunteers
+
+
 class ScheduleMeetingRequest(BaseModel):
     user_id: str  # Changed to UUID
-    duration_minutes: int
+    duration_minutes: int = Field(gt=0)
+    not_before: Optional[datetime] = None  # earliest acceptable start
+    preferences: Optional[MatchPreferences] = None  # rank candidates instead of earliest fit
 
 
 class AvailabilitySlot(BaseModel):
@@ -30,6 +43,31 @@ class ScheduleMeetingResponse(BaseModel):
     message: str
 
 
+class BatchScheduleItem(BaseModel):
+    user_id: str  # UUID of the student
+    duration_minutes: int = Field(gt=0)
+    window_start: Optional[datetime] = None  # meeting must start at or after
+    window_end: Optional[datetime] = None  # and end at or before
+
+
+class BatchScheduleRequest(BaseModel):
+    requests: List[BatchScheduleItem] = Field(min_length=1, max_length=1000)
+    balance_load: bool = False  # spread meetings across volunteers
+
+
+class BatchScheduleResult(BaseModel):
+    user_id: str
+    status: str  # "scheduled" or "unmatched"
+    matched_user: Optional[UserMatch] = None
+    scheduled_slot: Optional[AvailabilitySlot] = None
+
+
+class BatchScheduleResponse(BaseModel):
+    results: List[BatchScheduleResult]  # in request order
+    scheduled: int
+    unmatched: int
+
+
 # New meeting schemas for live meetings
 class CreateMeetingRequest(BaseModel):
     title: str
@@ -41,6 +79,18 @@ class CreateMeetingRequest(BaseModel):
     meeting_password: Optional[str] = None
 
 
+class CreateMeetingSeriesRequest(CreateMeetingRequest):
+    recurrence_rule: str  # RRULE with COUNT or UNTIL, e.g. "FREQ=WEEKLY;BYDAY=TU;COUNT=12"
+    timezone: str = "UTC"  # IANA name; occurrences keep local wall-clock time
+
+
+class UpdateMeetingSeriesRequest(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    max_participants: Optional[int] = None
+    meeting_password: Optional[str] = None
+
+
 class Meeting(BaseModel):
     meeting_id: int
     title: str
@@ -55,6 +105,8 @@ class Meeting(BaseModel):
     created_by: str  # UUID
     created_at: datetime
     status: str  # "scheduled", "live", "ended", "cancelled"
+    participant_count: int = 0
+    series_id: Optional[str] = None
 
 
 class MeetingResponse(BaseModel):
@@ -71,10 +123,17 @@ class MeetingResponse(BaseModel):
     created_by: str
     created_at: datetime
     status: str
+    participant_count: int = 0
+    series_id: Optional[str] = None
     can_join: bool = False
     user_role: str = "participant"  # "host", "presenter", "participant"
 
 
+class MeetingSeriesResponse(BaseModel):
+    series_id: str
+    meetings: List[MeetingResponse]
+
+
 class JoinMeetingRequest(BaseModel):
     meeting_id: int
     user_name: str
@@ -88,6 +147,32 @@ class JoinMeetingResponse(BaseModel):
     user_role: str
     signature: str
     sdk_key: str
+    participant_count: Optional[int] = None
+
+
+class CalendarFeedUrl(BaseModel):
+    url: str
+
+
+class RosterMember(BaseModel):
+    user_id: str
+
+
+class RosterSignatureRequest(BaseModel):
+    users: List[RosterMember] = Field(..., max_length=1000)
+
+
+class RosterSignature(BaseModel):
+    user_id: str
+    user_role: str
+    signature: str
+
+
+class RosterSignatureResponse(BaseModel):
+    meeting_id: int
+    zoom_meeting_id: str
+    sdk_key: str
+    signatures: List[RosterSignature]
 
 
 # Item schemas
@@ -153,14 +238,24 @@ class UserModulesResponse(BaseModel):
 class Event(BaseModel):
     event_id: int
     name: Optional[str] = None
-    start_time: datetime
+    start_time: datetime  # for a recurring event read over a window: this occurrence
     end_time: datetime
+    recurrence_rule: Optional[str] = None  # RRULE, e.g. "FREQ=WEEKLY;BYDAY=TU"
+    max_participants: Optional[int] = None  # seats; further registrations are waitlisted
+    registration_count: int = 0  # seats taken, maintained by a trigger on event_registration
 
 
 class CreateEventRequest(BaseModel):
     name: Optional[str] = None  # ← keep this if you want name to be optional
     start_time: datetime
     end_time: datetime
+    recurrence_rule: Optional[str] = None  # repeat the event (first occurrence = start/end)
+    recurrence_exdates: List[datetime] = []  # skipped occurrence starts
+    max_participants: Optional[int] = Field(None, ge=1)  # None = unlimited
+
+
+class CancelOccurrenceRequest(BaseModel):
+    occurrence_start: datetime
 
 
 
@@ -168,12 +263,15 @@ class UpdateEventRequest(BaseModel):
     name: Optional[str] = None  # ← keep this if you want name to be optional
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
+    max_participants: Optional[int] = Field(None, ge=1)
 
 
 class EventRegistration(BaseModel):
     registration_id: int
     user_id: str  # UUID
     event_id: int
+    status: str = "registered"  # "registered", "waitlisted", "attended", "cancelled"
+    waitlist_position: Optional[int] = None  # 1 = next to get a seat
     event: Optional[Event] = None
     user: Optional[UserMatch] = None
 
@@ -182,13 +280,59 @@ class RegisterForEventRequest(BaseModel):
     user_id: str  # UUID
 
 
+class BulkRegistrationRequest(BaseModel):
+    user_ids: List[str] = Field(min_length=1, max_length=1000)  # UUIDs
+
+
+class BulkRegistrationResult(BaseModel):
+    user_id: str
+    status: str  # "registered", "waitlisted", "already_registered", "user_not_found"
+    registration_id: Optional[int] = None
+
+
+class BulkRegistrationResponse(BaseModel):
+    event_id: int
+    registered: int
+    waitlisted: int
+    already_registered: int
+    not_found: int
+    results: List[BulkRegistrationResult]
+
+
+class RegistrationRecountReport(BaseModel):
+    corrected: int
+
+
+class CheckInRequest(BaseModel):
+    user_ids: List[str] = Field(min_length=1, max_length=1000)  # UUIDs; one per scan or a batch
+
+
+class CheckInResult(BaseModel):
+    user_id: str
+    status: str  # "queued", "already_checked_in", "user_not_found"
+
+
+class CheckInResponse(BaseModel):
+    event_id: int
+    queued: int
+    already_checked_in: int
+    not_found: int
+    results: List[CheckInResult]
+
+
+class EventAttendance(BaseModel):
+    event_id: int
+    attended: int  # checked in, including buffered scans not yet matched to a registration
+    pending: int  # of which still buffered
+
+
 class EventWithRegistrations(BaseModel):
     event_id: int
     name: Optional[str] = None
     start_time: datetime
     end_time: datetime
     registrations: List[EventRegistration]
-    total_registrations: int
+    total_registrations: int  # seats taken; waitlisted registrations aren't counted
 
 
 class UserEventsResponse(BaseModel):
@@ -226,3 +370,76 @@ class AuthResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
     user: UserProfileResponse
+
+
+# Diagnostics schemas
+class SlowCallbackReport(BaseModel):
+    detected_at: datetime
+    blocked_ms: float
+    route: Optional[str] = None
+    stack: Optional[str] = None
+
+
+class EventLoopLagReport(BaseModel):
+    enabled: bool
+    threshold_ms: float
+    samples: int
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    slow_callbacks: List[SlowCallbackReport]
+
+
+class AvailabilityCompactionReport(BaseModel):
+    expired: int  # slots that had already ended
+    trimmed: int  # running slots cut back to start now
+    merged: int  # rows absorbed into an adjacent/overlapping slot
+    dropped_short: int  # fragments below the minimum bookable length
+    rows_reclaimed: int
+    remaining: int
+
+
+class WeeklyAvailabilityRule(BaseModel):
+    weekday: int = Field(ge=0, le=6)  # 0 = Monday
+    start_time: time  # local wall-clock time in the upload's timezone
+    end_time: time  # at or before start_time means the slot runs past midnight
+
+
+class AvailabilityInterval(BaseModel):
+    time_start: datetime  # naive values are in the upload's timezone
+    time_end: datetime
+
+
+class AvailabilityUploadRequest(BaseModel):
+    timezone: str = "UTC"  # IANA name, e.g. "America/New_York"
+    range_start: Optional[date] = None  # first day replaced (required with weekly)
+    range_end: Optional[date] = None  # last day replaced, inclusive
+    weekly: List[WeeklyAvailabilityRule] = []
+    intervals: List[AvailabilityInterval] = []
+
+
+class AvailabilityUploadResponse(BaseModel):
+    inserted: int
+    deleted: int
+    unchanged: int
+    slots: List[AvailabilitySlot]  # the user's availability in the range afterwards
+
+
+class AvailabilityRuleRequest(BaseModel):
+    dtstart: datetime  # start of the first occurrence, local to `timezone` if naive
+    timezone: str = "UTC"  # IANA name; occurrences keep local wall-clock time
+    duration_minutes: int = Field(gt=0)
+    rrule: str  # e.g. "FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20240601"
+    exdates: List[datetime] = []  # local starts of skipped occurrences
+
+
+class AvailabilityRule(BaseModel):
+    rule_id: int
+    user_id: str
+    dtstart: datetime
+    timezone: str
+    duration_minutes: int
+    rrule: str
+    exdates: List[datetime] = []
+    until_utc: Optional[datetime] = None
@@ -1,14 +1,69 @@
+import logging
+from contextlib import asynccontextmanager
+
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.v1.router import api_router
-from app.core.config import settings
-from app.core.database import create_tables
+from src.app.api.v1.router import api_router
+from src.app.core.background import PeriodicTask
+from src.app.core.config import settings
+from src.app.core.database import create_tables, supabase
+from src.app.core.diagnostics import loop_monitor
+from src.app.core.jwt_verifier import token_verifier
+from src.app.domain.availability import compact_availabilities
+from src.app.domain.checkin import checkin_buffer
+from src.app.domain.meeting_status import meeting_status_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Background jobs started with the app
+background_tasks: list[PeriodicTask] = []
+
+if settings.AUTH_JWT_VERIFY_MODE == "local" and token_verifier.jwks_url:
+    background_tasks.append(PeriodicTask(
+        "jwks-refresh", token_verifier.refresh_async, settings.AUTH_JWKS_REFRESH_SECONDS
+    ))
+
+if settings.AVAILABILITY_COMPACTION_ENABLED:
+    background_tasks.append(PeriodicTask(
+        "availability-compaction",
+        lambda: compact_availabilities(supabase),
+        settings.AVAILABILITY_COMPACTION_INTERVAL_SECONDS,
+    ))
+
+background_tasks.append(PeriodicTask(
+    "checkin-flush", lambda: checkin_buffer.flush(supabase), settings.CHECKIN_FLUSH_INTERVAL_SECONDS
+))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Blocking Supabase calls are offloaded to anyio's default thread limiter
+    to_thread.current_default_thread_limiter().total_tokens = settings.DB_THREADPOOL_SIZE
+    if settings.LOOP_DIAGNOSTICS_ENABLED:
+        loop_monitor.start(app)
+    for task in background_tasks:
+        task.start()
+    if settings.MEETING_STATUS_SCHEDULER_ENABLED:
+        meeting_status_scheduler.start(supabase)
+    yield
+    for task in background_tasks:
+        await task.stop()
+    # Don't drop check-ins scanned since the last flush
+    try:
+        await checkin_buffer.flush(supabase)
+    except Exception:
+        logger.exception("Final check-in flush failed; %s check-ins lost", len(checkin_buffer))
+    await meeting_status_scheduler.stop()
+    await loop_monitor.stop()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 
@@ -22,6 +77,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API router
@@ -30,4 +86,4 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to the API", "version": settings.VERSION}
\ No newline at end of file
+    return {"message": "Welcome to the API", "version": settings.VERSION}
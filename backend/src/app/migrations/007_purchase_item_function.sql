@@ -0,0 +1,62 @@
+-- Migration 007: Atomic shop purchase
+-- purchase_item() checks the balance, deducts experience points and upserts
+-- the inventory row in a single transaction, so two concurrent purchases
+-- can't both pass the balance check. Called via supabase rpc("purchase_item").
+
+-- The API reads quantity / acquired_at on user_items
+ALTER TABLE user_items ADD COLUMN IF NOT EXISTS quantity INT NOT NULL DEFAULT 1;
+ALTER TABLE user_items ADD COLUMN IF NOT EXISTS acquired_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+
+CREATE OR REPLACE FUNCTION purchase_item(p_user_id UUID, p_item_id INT, p_quantity INT)
+RETURNS JSONB AS $$
+DECLARE
+    v_item items%ROWTYPE;
+    v_total INT;
+    v_balance INT;
+BEGIN
+    IF p_quantity IS NULL OR p_quantity < 1 THEN
+        RETURN jsonb_build_object('status', 'invalid_quantity');
+    END IF;
+
+    SELECT * INTO v_item FROM items WHERE item_id = p_item_id;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('status', 'item_not_found');
+    END IF;
+
+    v_total := v_item.cost * p_quantity;
+
+    -- Conditional decrement: the row lock serializes concurrent purchases
+    -- and the WHERE clause re-checks the balance after acquiring it
+    UPDATE users
+       SET experience_points = COALESCE(experience_points, 0) - v_total
+     WHERE user_id = p_user_id
+       AND COALESCE(experience_points, 0) >= v_total
+    RETURNING experience_points INTO v_balance;
+
+    IF NOT FOUND THEN
+        SELECT COALESCE(experience_points, 0) INTO v_balance
+          FROM users WHERE user_id = p_user_id;
+        IF NOT FOUND THEN
+            RETURN jsonb_build_object('status', 'user_not_found');
+        END IF;
+        RETURN jsonb_build_object(
+            'status', 'insufficient_points',
+            'item', to_jsonb(v_item),
+            'total_cost', v_total,
+            'balance', v_balance
+        );
+    END IF;
+
+    INSERT INTO user_items (user_id, item_id, quantity, acquired_at, equipped)
+    VALUES (p_user_id, p_item_id, p_quantity, CURRENT_TIMESTAMP, FALSE)
+    ON CONFLICT (user_id, item_id)
+    DO UPDATE SET quantity = user_items.quantity + EXCLUDED.quantity;
+
+    RETURN jsonb_build_object(
+        'status', 'ok',
+        'item', to_jsonb(v_item),
+        'total_cost', v_total,
+        'balance', v_balance
+    );
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,67 @@
+-- Migration 008: Atomic availability reservation
+-- reserve_availability() claims a volunteer slot for a meeting and writes
+-- the unused fragments back in a single transaction. The slot row is locked
+-- and compared against the times the caller matched on (optimistic check),
+-- so two concurrent bookings can't both take the same slot: the loser sees
+-- 'gone' or 'changed' and moves on to its next candidate.
+-- Called via supabase rpc("reserve_availability").
+
+CREATE OR REPLACE FUNCTION reserve_availability(
+    p_availability_id INT,
+    p_expected_start TIMESTAMP,
+    p_expected_end TIMESTAMP,
+    p_booking_start TIMESTAMP,
+    p_booking_end TIMESTAMP
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_slot availabilities%ROWTYPE;
+    v_user JSONB;
+    v_remaining JSONB;
+BEGIN
+    -- Blocks behind a concurrent reservation of the same row; once that one
+    -- commits the row is gone and NOT FOUND is reported
+    SELECT * INTO v_slot
+      FROM availabilities
+     WHERE availability_id = p_availability_id
+       FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('status', 'gone');
+    END IF;
+
+    IF v_slot.time_start <> p_expected_start OR v_slot.time_end <> p_expected_end THEN
+        RETURN jsonb_build_object('status', 'changed', 'slot', to_jsonb(v_slot));
+    END IF;
+
+    IF p_booking_start < v_slot.time_start OR p_booking_end > v_slot.time_end
+       OR p_booking_end <= p_booking_start THEN
+        RETURN jsonb_build_object('status', 'no_fit', 'slot', to_jsonb(v_slot));
+    END IF;
+
+    SELECT to_jsonb(u) INTO v_user FROM users u WHERE u.user_id = v_slot.user_id;
+
+    DELETE FROM availabilities WHERE availability_id = p_availability_id;
+
+    -- Put back whatever the meeting didn't use, before and after it
+    WITH inserted AS (
+        INSERT INTO availabilities (user_id, time_start, time_end)
+        SELECT v_slot.user_id, fragment.time_start, fragment.time_end
+          FROM (VALUES
+                    (v_slot.time_start, p_booking_start),
+                    (p_booking_end, v_slot.time_end)
+               ) AS fragment (time_start, time_end)
+         WHERE fragment.time_end > fragment.time_start
+        RETURNING availability_id, user_id, time_start, time_end
+    )
+    SELECT COALESCE(jsonb_agg(to_jsonb(inserted) ORDER BY inserted.time_start), '[]'::jsonb)
+      INTO v_remaining
+      FROM inserted;
+
+    RETURN jsonb_build_object(
+        'status', 'ok',
+        'slot', to_jsonb(v_slot),
+        'user', v_user,
+        'remaining', v_remaining
+    );
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,89 @@
+-- Migration 009: Bulk availability reservation for batch scheduling
+-- reserve_availability_batch() commits a whole batch assignment in one
+-- transaction. Each entry names a slot, the times it was matched on and the
+-- meetings booked inside it; the slot is locked, checked, deleted and the
+-- gaps between the meetings are written back. Slots that were taken or
+-- edited in the meantime are reported in 'conflicts' and left untouched.
+-- Rows are locked in availability_id order so concurrent batches can't
+-- deadlock. Called via supabase rpc("reserve_availability_batch").
+--
+-- p_reservations: [{"availability_id": 1,
+--                   "expected_start": "...", "expected_end": "...",
+--                   "bookings": [{"start": "...", "end": "..."}, ...]}, ...]
+
+CREATE OR REPLACE FUNCTION reserve_availability_batch(p_reservations JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    v_entry JSONB;
+    v_booking JSONB;
+    v_slot availabilities%ROWTYPE;
+    v_cursor TIMESTAMP;
+    v_start TIMESTAMP;
+    v_end TIMESTAMP;
+    v_fragment availabilities%ROWTYPE;
+    v_remaining JSONB;
+    v_reserved JSONB := '[]'::jsonb;
+    v_conflicts JSONB := '[]'::jsonb;
+BEGIN
+    FOR v_entry IN
+        SELECT value FROM jsonb_array_elements(p_reservations)
+         ORDER BY (value->>'availability_id')::INT
+    LOOP
+        SELECT * INTO v_slot
+          FROM availabilities
+         WHERE availability_id = (v_entry->>'availability_id')::INT
+           FOR UPDATE;
+
+        IF NOT FOUND
+           OR v_slot.time_start <> (v_entry->>'expected_start')::TIMESTAMP
+           OR v_slot.time_end <> (v_entry->>'expected_end')::TIMESTAMP THEN
+            v_conflicts := v_conflicts || to_jsonb((v_entry->>'availability_id')::INT);
+            CONTINUE;
+        END IF;
+
+        DELETE FROM availabilities WHERE availability_id = v_slot.availability_id;
+
+        -- Write back the gaps before, between and after the booked meetings
+        v_cursor := v_slot.time_start;
+        v_remaining := '[]'::jsonb;
+        FOR v_booking IN
+            SELECT value FROM jsonb_array_elements(v_entry->'bookings')
+             ORDER BY (value->>'start')::TIMESTAMP
+        LOOP
+            v_start := (v_booking->>'start')::TIMESTAMP;
+            v_end := (v_booking->>'end')::TIMESTAMP;
+            IF v_start > v_cursor THEN
+                INSERT INTO availabilities (user_id, time_start, time_end)
+                VALUES (v_slot.user_id, v_cursor, v_start)
+                RETURNING * INTO v_fragment;
+                v_remaining := v_remaining || jsonb_build_object(
+                    'availability_id', v_fragment.availability_id,
+                    'user_id', v_fragment.user_id,
+                    'time_start', v_fragment.time_start,
+                    'time_end', v_fragment.time_end
+                );
+            END IF;
+            v_cursor := GREATEST(v_cursor, v_end);
+        END LOOP;
+        IF v_cursor < v_slot.time_end THEN
+            INSERT INTO availabilities (user_id, time_start, time_end)
+            VALUES (v_slot.user_id, v_cursor, v_slot.time_end)
+            RETURNING * INTO v_fragment;
+            v_remaining := v_remaining || jsonb_build_object(
+                'availability_id', v_fragment.availability_id,
+                'user_id', v_fragment.user_id,
+                'time_start', v_fragment.time_start,
+                'time_end', v_fragment.time_end
+            );
+        END IF;
+
+        v_reserved := v_reserved || jsonb_build_object(
+            'availability_id', v_slot.availability_id,
+            'user', (SELECT to_jsonb(u) FROM users u WHERE u.user_id = v_slot.user_id),
+            'remaining', v_remaining
+        );
+    END LOOP;
+
+    RETURN jsonb_build_object('reserved', v_reserved, 'conflicts', v_conflicts);
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,92 @@
+-- Migration 010: Availability compaction
+-- Bookings split slots and write the remainders back, and past slots are
+-- never removed, so availabilities fills up with expired rows and small
+-- fragments. compact_availabilities() cleans the table in one transaction:
+--   1. deletes slots that ended before p_now and trims the past part off
+--      slots that are running now,
+--   2. merges overlapping or touching slots of the same user into one row
+--      (gaps-and-islands over time_start order),
+--   3. deletes slots shorter than p_min_minutes, which can't be booked.
+-- Rows are locked first, so a concurrent reserve_availability() either
+-- finishes before compaction touches its slot or sees 'gone'/'changed'.
+-- Called via supabase rpc("compact_availabilities") from the periodic
+-- sweeper and the admin endpoint.
+
+CREATE INDEX IF NOT EXISTS idx_availabilities_user_start ON availabilities(user_id, time_start);
+
+CREATE OR REPLACE FUNCTION compact_availabilities(
+    p_min_minutes INT,
+    p_now TIMESTAMP DEFAULT (now() AT TIME ZONE 'UTC')
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_expired INT;
+    v_trimmed INT;
+    v_merged INT;
+    v_dropped INT;
+    v_remaining INT;
+BEGIN
+    PERFORM 1 FROM availabilities FOR UPDATE;
+
+    DELETE FROM availabilities WHERE time_end <= p_now;
+    GET DIAGNOSTICS v_expired = ROW_COUNT;
+
+    UPDATE availabilities SET time_start = p_now
+     WHERE time_start < p_now AND time_end > p_now;
+    GET DIAGNOSTICS v_trimmed = ROW_COUNT;
+
+    -- A row starts a new island unless an earlier row of the same user
+    -- reaches its start; each island collapses into its lowest id
+    WITH ordered AS (
+        SELECT availability_id, user_id, time_start, time_end,
+               MAX(time_end) OVER (
+                   PARTITION BY user_id ORDER BY time_start, availability_id
+                   ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+               ) AS reach
+          FROM availabilities
+    ), islands AS (
+        SELECT availability_id, user_id, time_start, time_end,
+               SUM(CASE WHEN reach IS NULL OR time_start > reach THEN 1 ELSE 0 END) OVER (
+                   PARTITION BY user_id ORDER BY time_start, availability_id
+               ) AS island
+          FROM ordered
+    ), grouped AS (
+        SELECT user_id, island,
+               MIN(availability_id) AS keep_id,
+               MIN(time_start) AS island_start,
+               MAX(time_end) AS island_end
+          FROM islands
+         GROUP BY user_id, island
+        HAVING COUNT(*) > 1
+    ), widened AS (
+        UPDATE availabilities a
+           SET time_start = g.island_start, time_end = g.island_end
+          FROM grouped g
+         WHERE a.availability_id = g.keep_id
+        RETURNING a.availability_id
+    ), absorbed AS (
+        DELETE FROM availabilities a
+         USING islands i
+          JOIN grouped g ON g.user_id = i.user_id AND g.island = i.island
+         WHERE a.availability_id = i.availability_id
+           AND a.availability_id <> g.keep_id
+        RETURNING a.availability_id
+    )
+    SELECT COUNT(*) INTO v_merged FROM absorbed;
+
+    DELETE FROM availabilities
+     WHERE time_end - time_start < make_interval(mins => p_min_minutes);
+    GET DIAGNOSTICS v_dropped = ROW_COUNT;
+
+    SELECT COUNT(*) INTO v_remaining FROM availabilities;
+
+    RETURN jsonb_build_object(
+        'expired', v_expired,
+        'trimmed', v_trimmed,
+        'merged', v_merged,
+        'dropped_short', v_dropped,
+        'rows_reclaimed', v_expired + v_merged + v_dropped,
+        'remaining', v_remaining
+    );
+END;
+$$ LANGUAGE plpgsql;
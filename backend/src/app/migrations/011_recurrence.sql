@@ -0,0 +1,103 @@
+-- Migration 011: Recurring events and availability rules
+-- Recurring series are stored once as an RRULE (see domain/recurrence.py)
+-- and expanded lazily over the window being read, instead of being
+-- materialized as one row per occurrence.
+
+-- Events: a row with recurrence_rule set is a series starting at
+-- start_time/end_time. recurrence_exdates lists cancelled occurrence starts;
+-- recurrence_until is the end of the last occurrence (NULL = open-ended),
+-- so window reads can skip finished series without expanding them.
+ALTER TABLE events ADD COLUMN IF NOT EXISTS recurrence_rule TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS recurrence_exdates TIMESTAMP[] NOT NULL DEFAULT '{}';
+ALTER TABLE events ADD COLUMN IF NOT EXISTS recurrence_until TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS idx_events_recurring ON events(start_time) WHERE recurrence_rule IS NOT NULL;
+
+-- Availability rules: recurring volunteer availability in local wall-clock
+-- time. Occurrences are expanded into the scheduler's in-memory index and
+-- only written to availabilities when one is booked; exdates then records
+-- the occurrence so it is not expanded again.
+CREATE TABLE IF NOT EXISTS availability_rules (
+    rule_id SERIAL PRIMARY KEY,
+    user_id UUID NOT NULL,
+    dtstart TIMESTAMP NOT NULL,  -- local start of the first occurrence
+    timezone TEXT NOT NULL DEFAULT 'UTC',
+    duration_minutes INT NOT NULL,
+    rrule TEXT NOT NULL,
+    exdates TIMESTAMP[] NOT NULL DEFAULT '{}',  -- local starts of cancelled/booked occurrences
+    until_utc TIMESTAMP,  -- end of the last occurrence, NULL = open-ended
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    CHECK (duration_minutes > 0)
+);
+
+CREATE INDEX IF NOT EXISTS idx_availability_rules_user ON availability_rules(user_id);
+
+-- Turn rule occurrences into concrete availabilities rows so they can be
+-- reserved. p_occurrences: [{"rule_id", "occurrence" (local start),
+-- "time_start", "time_end" (UTC)}]. Returns an array aligned with the input
+-- holding the new row, or null where the occurrence was already booked or
+-- cancelled (or the rule is gone).
+CREATE OR REPLACE FUNCTION materialize_availability_occurrences(p_occurrences JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    v_entry JSONB;
+    v_rule availability_rules%ROWTYPE;
+    v_occurrence TIMESTAMP;
+    v_row availabilities%ROWTYPE;
+    v_result JSONB := '[]'::jsonb;
+BEGIN
+    -- Lock every rule up front in id order so concurrent callers can't deadlock
+    PERFORM 1 FROM availability_rules
+     WHERE rule_id IN (SELECT (value->>'rule_id')::INT FROM jsonb_array_elements(p_occurrences))
+     ORDER BY rule_id
+       FOR UPDATE;
+
+    FOR v_entry IN SELECT value FROM jsonb_array_elements(p_occurrences) WITH ORDINALITY ORDER BY ordinality
+    LOOP
+        v_occurrence := (v_entry->>'occurrence')::TIMESTAMP;
+        SELECT * INTO v_rule FROM availability_rules WHERE rule_id = (v_entry->>'rule_id')::INT;
+        IF NOT FOUND OR v_occurrence = ANY(v_rule.exdates) THEN
+            v_result := v_result || 'null'::jsonb;
+            CONTINUE;
+        END IF;
+
+        UPDATE availability_rules
+           SET exdates = array_append(exdates, v_occurrence)
+         WHERE rule_id = v_rule.rule_id;
+
+        INSERT INTO availabilities (user_id, time_start, time_end)
+        VALUES (v_rule.user_id, (v_entry->>'time_start')::TIMESTAMP, (v_entry->>'time_end')::TIMESTAMP)
+        RETURNING * INTO v_row;
+
+        v_result := v_result || jsonb_build_array(jsonb_build_object(
+            'availability_id', v_row.availability_id,
+            'user_id', v_row.user_id,
+            'time_start', v_row.time_start,
+            'time_end', v_row.time_end
+        ));
+    END LOOP;
+
+    RETURN v_result;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Cancel one occurrence of an availability rule.
+CREATE OR REPLACE FUNCTION add_availability_rule_exdate(p_rule_id INT, p_occurrence TIMESTAMP)
+RETURNS JSONB AS $$
+BEGIN
+    UPDATE availability_rules
+       SET exdates = array_append(exdates, p_occurrence)
+     WHERE rule_id = p_rule_id
+       AND NOT (p_occurrence = ANY(exdates));
+    IF FOUND THEN
+        RETURN jsonb_build_object('status', 'ok');
+    END IF;
+
+    PERFORM 1 FROM availability_rules WHERE rule_id = p_rule_id;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('status', 'not_found');
+    END IF;
+    RETURN jsonb_build_object('status', 'already_excluded');
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,55 @@
+-- Migration 012: Meeting attendance and capacity
+-- meeting_participants records who joined each meeting, and
+-- meetings.participant_count caches how many rows it holds so the capacity
+-- check doesn't count them on every join. join_meeting_participant() does
+-- the check-and-increment in one conditional UPDATE on the meeting row, so
+-- concurrent joins queue on that row lock for the length of one statement
+-- and the count can never pass max_participants. Users who already joined
+-- rejoin without taking another place (and without touching the lock).
+-- Called via supabase rpc("join_meeting_participant").
+
+CREATE TABLE IF NOT EXISTS meeting_participants (
+    meeting_id INT NOT NULL,
+    user_id UUID NOT NULL,
+    joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (meeting_id, user_id),
+    FOREIGN KEY (meeting_id) REFERENCES meetings(meeting_id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+ALTER TABLE meetings ADD COLUMN IF NOT EXISTS participant_count INT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION join_meeting_participant(
+    p_meeting_id INT,
+    p_user_id UUID,
+    p_enforce_capacity BOOLEAN DEFAULT TRUE
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_count INT;
+BEGIN
+    INSERT INTO meeting_participants (meeting_id, user_id)
+    VALUES (p_meeting_id, p_user_id)
+    ON CONFLICT (meeting_id, user_id) DO NOTHING;
+    IF NOT FOUND THEN
+        SELECT participant_count INTO v_count FROM meetings WHERE meeting_id = p_meeting_id;
+        RETURN jsonb_build_object('status', 'already_joined', 'participant_count', v_count);
+    END IF;
+
+    UPDATE meetings
+       SET participant_count = participant_count + 1
+     WHERE meeting_id = p_meeting_id
+       AND (NOT p_enforce_capacity
+            OR max_participants IS NULL
+            OR participant_count < max_participants)
+    RETURNING participant_count INTO v_count;
+
+    IF NOT FOUND THEN
+        DELETE FROM meeting_participants WHERE meeting_id = p_meeting_id AND user_id = p_user_id;
+        SELECT participant_count INTO v_count FROM meetings WHERE meeting_id = p_meeting_id;
+        RETURN jsonb_build_object('status', 'full', 'participant_count', v_count);
+    END IF;
+
+    RETURN jsonb_build_object('status', 'joined', 'participant_count', v_count);
+END;
+$$ LANGUAGE plpgsql;
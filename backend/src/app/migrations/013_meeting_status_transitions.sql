@@ -0,0 +1,34 @@
+-- Migration 013: Time-driven meeting status changes
+-- The in-process scheduler (domain/meeting_status.py) collects every
+-- meeting whose start_time or end_time has passed during one tick and
+-- applies them with a single call. Transitions only move forward
+-- (scheduled -> live -> ended), so a meeting the creator already ended or
+-- cancelled is left alone, and running the same batch twice (e.g. from two
+-- workers) is harmless. Returns the ids that actually changed.
+-- Called via supabase rpc("apply_meeting_status_transitions").
+
+CREATE INDEX IF NOT EXISTS idx_meetings_open ON meetings(meeting_id) WHERE status IN ('scheduled', 'live');
+
+CREATE OR REPLACE FUNCTION apply_meeting_status_transitions(p_live INT[], p_ended INT[])
+RETURNS JSONB AS $$
+DECLARE
+    v_live JSONB;
+    v_ended JSONB;
+BEGIN
+    WITH changed AS (
+        UPDATE meetings SET status = 'ended'
+         WHERE meeting_id = ANY(p_ended) AND status IN ('scheduled', 'live')
+        RETURNING meeting_id
+    )
+    SELECT COALESCE(jsonb_agg(meeting_id), '[]'::jsonb) INTO v_ended FROM changed;
+
+    WITH changed AS (
+        UPDATE meetings SET status = 'live'
+         WHERE meeting_id = ANY(p_live) AND status = 'scheduled'
+        RETURNING meeting_id
+    )
+    SELECT COALESCE(jsonb_agg(meeting_id), '[]'::jsonb) INTO v_live FROM changed;
+
+    RETURN jsonb_build_object('live', v_live, 'ended', v_ended);
+END;
+$$ LANGUAGE plpgsql;
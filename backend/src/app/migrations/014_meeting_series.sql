@@ -0,0 +1,9 @@
+-- Migration 014: Recurring meeting series
+-- A series is created as one meeting row per occurrence, inserted in a
+-- single bulk write, and tied together by series_id so the whole series
+-- can be edited or cancelled with one set-based UPDATE. Occurrences share
+-- the series' Zoom meeting id, like a Zoom recurring meeting.
+
+ALTER TABLE meetings ADD COLUMN IF NOT EXISTS series_id UUID;
+
+CREATE INDEX IF NOT EXISTS idx_meetings_series ON meetings(series_id, start_time) WHERE series_id IS NOT NULL;
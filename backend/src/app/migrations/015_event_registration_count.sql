@@ -0,0 +1,30 @@
+-- Migration 015: Maintained registration counter on events
+-- events.registration_count is kept in step with event_registration by a
+-- row trigger, so showing how many people registered reads one column
+-- instead of fetching (or counting) every registration row.
+
+ALTER TABLE events ADD COLUMN IF NOT EXISTS registration_count INT NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_event_registration_event ON event_registration(event_id);
+
+CREATE OR REPLACE FUNCTION sync_event_registration_count()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE events SET registration_count = registration_count + 1 WHERE event_id = NEW.event_id;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE events SET registration_count = registration_count - 1 WHERE event_id = OLD.event_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_event_registration_count ON event_registration;
+CREATE TRIGGER trg_event_registration_count
+AFTER INSERT OR DELETE OR UPDATE OF event_id ON event_registration
+FOR EACH ROW EXECUTE FUNCTION sync_event_registration_count();
+
+-- Backfill existing events
+UPDATE events e
+   SET registration_count = (SELECT COUNT(*) FROM event_registration r WHERE r.event_id = e.event_id);
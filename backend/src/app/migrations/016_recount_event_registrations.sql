@@ -0,0 +1,28 @@
+-- Migration 016: Registration counter reconciliation
+-- events.registration_count (migration 015) is maintained by a trigger, so
+-- it only drifts if rows are changed with triggers disabled (bulk loads,
+-- restores). recount_event_registrations() recomputes every counter in one
+-- statement and reports how many were wrong.
+-- Called via supabase rpc("recount_event_registrations").
+
+CREATE OR REPLACE FUNCTION recount_event_registrations()
+RETURNS JSONB AS $$
+DECLARE
+    v_corrected INT;
+BEGIN
+    WITH actual AS (
+        SELECT e.event_id, COUNT(r.registration_id)::INT AS registrations
+          FROM events e
+          LEFT JOIN event_registration r ON r.event_id = e.event_id
+         GROUP BY e.event_id
+    )
+    UPDATE events e
+       SET registration_count = a.registrations
+      FROM actual a
+     WHERE e.event_id = a.event_id
+       AND e.registration_count <> a.registrations;
+    GET DIAGNOSTICS v_corrected = ROW_COUNT;
+
+    RETURN jsonb_build_object('corrected', v_corrected);
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,37 @@
+-- Migration 017: Bulk event registration
+-- register_users_for_event() registers a whole class in one statement:
+-- the ids are checked against users in the same INSERT ... SELECT, and
+-- ON CONFLICT on UNIQUE (user_id, event_id) skips existing registrations
+-- (including ones made concurrently). Returns which ids were registered,
+-- were already registered, or don't exist; event_found is false (and
+-- nothing is written) when the event doesn't exist.
+-- Called via supabase rpc("register_users_for_event").
+
+CREATE OR REPLACE FUNCTION register_users_for_event(p_event_id INT, p_user_ids UUID[])
+RETURNS JSONB AS $$
+DECLARE
+    v_registered JSONB;
+    v_missing JSONB;
+BEGIN
+    PERFORM 1 FROM events WHERE event_id = p_event_id;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('event_found', false);
+    END IF;
+
+    WITH inserted AS (
+        INSERT INTO event_registration (user_id, event_id)
+        SELECT u.user_id, p_event_id
+          FROM users u
+         WHERE u.user_id = ANY(p_user_ids)
+        ON CONFLICT (user_id, event_id) DO NOTHING
+        RETURNING registration_id, user_id, event_id
+    )
+    SELECT COALESCE(jsonb_agg(to_jsonb(inserted)), '[]'::jsonb) INTO v_registered FROM inserted;
+
+    SELECT COALESCE(jsonb_agg(requested.user_id), '[]'::jsonb) INTO v_missing
+      FROM unnest(p_user_ids) AS requested(user_id)
+     WHERE NOT EXISTS (SELECT 1 FROM users u WHERE u.user_id = requested.user_id);
+
+    RETURN jsonb_build_object('event_found', true, 'registered', v_registered, 'missing', v_missing);
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,224 @@
+-- Migration 018: Event capacity and waitlist
+-- events.max_participants is enforced on registration. Registrations past
+-- the cap are stored with status 'waitlisted' and promoted first-come
+-- first-served (registered_at, registration_id) when a seat frees up.
+--
+-- Every function that hands out seats locks only the event's row (FOR
+-- UPDATE), so registrations for one event queue for the few statements of
+-- a single call and different events never wait on each other. Seats are
+-- counted by events.registration_count, which the trigger now maintains
+-- for seat-holding rows only ('registered'/'attended').
+-- Called via supabase rpc("register_for_event"), rpc("unregister_from_event")
+-- and rpc("promote_event_waitlist") (after max_participants is raised).
+
+ALTER TABLE event_registration DROP CONSTRAINT IF EXISTS event_registration_status_check;
+ALTER TABLE event_registration ADD CONSTRAINT event_registration_status_check
+    CHECK (status IN ('registered', 'waitlisted', 'attended', 'cancelled'));
+
+CREATE INDEX IF NOT EXISTS idx_event_registration_waitlist
+    ON event_registration(event_id, registered_at, registration_id) WHERE status = 'waitlisted';
+
+CREATE OR REPLACE FUNCTION sync_event_registration_count()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status IN ('registered', 'attended') THEN
+        UPDATE events SET registration_count = registration_count + 1 WHERE event_id = NEW.event_id;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') AND OLD.status IN ('registered', 'attended') THEN
+        UPDATE events SET registration_count = registration_count - 1 WHERE event_id = OLD.event_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_event_registration_count ON event_registration;
+CREATE TRIGGER trg_event_registration_count
+AFTER INSERT OR DELETE OR UPDATE OF event_id, status ON event_registration
+FOR EACH ROW EXECUTE FUNCTION sync_event_registration_count();
+
+CREATE OR REPLACE FUNCTION recount_event_registrations()
+RETURNS JSONB AS $$
+DECLARE
+    v_corrected INT;
+BEGIN
+    WITH actual AS (
+        SELECT e.event_id, COUNT(r.registration_id)::INT AS registrations
+          FROM events e
+          LEFT JOIN event_registration r
+            ON r.event_id = e.event_id AND r.status IN ('registered', 'attended')
+         GROUP BY e.event_id
+    )
+    UPDATE events e
+       SET registration_count = a.registrations
+      FROM actual a
+     WHERE e.event_id = a.event_id
+       AND e.registration_count <> a.registrations;
+    GET DIAGNOSTICS v_corrected = ROW_COUNT;
+
+    RETURN jsonb_build_object('corrected', v_corrected);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Fill free seats from the head of the waitlist in one statement. Caller
+-- must hold the event row lock. Returns the promoted registrations.
+CREATE OR REPLACE FUNCTION _promote_event_waitlist(p_event_id INT)
+RETURNS JSONB AS $$
+DECLARE
+    v_free INT;
+    v_promoted JSONB;
+BEGIN
+    SELECT CASE WHEN max_participants IS NULL THEN NULL
+                ELSE GREATEST(max_participants - registration_count, 0) END
+      INTO v_free
+      FROM events WHERE event_id = p_event_id;
+
+    WITH next_up AS (
+        SELECT registration_id
+          FROM event_registration
+         WHERE event_id = p_event_id AND status = 'waitlisted'
+         ORDER BY registered_at, registration_id
+         LIMIT v_free  -- NULL = no cap, promote everyone
+    ), promoted AS (
+        UPDATE event_registration r
+           SET status = 'registered'
+          FROM next_up
+         WHERE r.registration_id = next_up.registration_id
+        RETURNING r.registration_id, r.user_id, r.event_id, r.status
+    )
+    SELECT COALESCE(jsonb_agg(to_jsonb(promoted)), '[]'::jsonb) INTO v_promoted FROM promoted;
+
+    RETURN v_promoted;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION promote_event_waitlist(p_event_id INT)
+RETURNS JSONB AS $$
+BEGIN
+    PERFORM 1 FROM events WHERE event_id = p_event_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN '[]'::jsonb;
+    END IF;
+    RETURN _promote_event_waitlist(p_event_id);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Register one user: a seat if one is free, otherwise the end of the
+-- waitlist. Status: 'registered', 'waitlisted', 'already_registered',
+-- 'event_not_found' or 'user_not_found'.
+CREATE OR REPLACE FUNCTION register_for_event(p_event_id INT, p_user_id UUID)
+RETURNS JSONB AS $$
+DECLARE
+    v_event events%ROWTYPE;
+    v_row event_registration%ROWTYPE;
+    v_position INT;
+BEGIN
+    SELECT * INTO v_event FROM events WHERE event_id = p_event_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('status', 'event_not_found');
+    END IF;
+
+    PERFORM 1 FROM users WHERE user_id = p_user_id;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('status', 'user_not_found');
+    END IF;
+
+    INSERT INTO event_registration (user_id, event_id, status)
+    VALUES (
+        p_user_id, p_event_id,
+        CASE WHEN v_event.max_participants IS NULL
+                  OR v_event.registration_count < v_event.max_participants
+             THEN 'registered' ELSE 'waitlisted' END
+    )
+    ON CONFLICT (user_id, event_id) DO NOTHING
+    RETURNING * INTO v_row;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('status', 'already_registered');
+    END IF;
+
+    IF v_row.status = 'waitlisted' THEN
+        SELECT COUNT(*) INTO v_position
+          FROM event_registration
+         WHERE event_id = p_event_id AND status = 'waitlisted'
+           AND (registered_at, registration_id) <= (v_row.registered_at, v_row.registration_id);
+    END IF;
+
+    RETURN jsonb_build_object(
+        'status', v_row.status,
+        'registration', jsonb_build_object(
+            'registration_id', v_row.registration_id,
+            'user_id', v_row.user_id,
+            'event_id', v_row.event_id,
+            'status', v_row.status
+        ),
+        'waitlist_position', v_position
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Remove a registration and hand any freed seat to the waitlist, in the
+-- same transaction. Status: 'ok' or 'not_found'.
+CREATE OR REPLACE FUNCTION unregister_from_event(p_event_id INT, p_user_id UUID)
+RETURNS JSONB AS $$
+DECLARE
+    v_status TEXT;
+BEGIN
+    PERFORM 1 FROM events WHERE event_id = p_event_id FOR UPDATE;
+
+    DELETE FROM event_registration
+     WHERE event_id = p_event_id AND user_id = p_user_id
+    RETURNING status INTO v_status;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('status', 'not_found');
+    END IF;
+
+    RETURN jsonb_build_object('status', 'ok', 'promoted', _promote_event_waitlist(p_event_id));
+END;
+$$ LANGUAGE plpgsql;
+
+-- Bulk registration (migration 017) with capacity: seats go to the
+-- requested users in order until the event is full; the rest are
+-- waitlisted in the same order.
+CREATE OR REPLACE FUNCTION register_users_for_event(p_event_id INT, p_user_ids UUID[])
+RETURNS JSONB AS $$
+DECLARE
+    v_event events%ROWTYPE;
+    v_registered JSONB;
+    v_missing JSONB;
+BEGIN
+    SELECT * INTO v_event FROM events WHERE event_id = p_event_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('event_found', false);
+    END IF;
+
+    WITH candidates AS (
+        SELECT requested.user_id,
+               ROW_NUMBER() OVER (ORDER BY requested.ordinality) AS seat
+          FROM unnest(p_user_ids) WITH ORDINALITY AS requested(user_id, ordinality)
+          JOIN users u ON u.user_id = requested.user_id
+         WHERE NOT EXISTS (
+                   SELECT 1 FROM event_registration r
+                    WHERE r.event_id = p_event_id AND r.user_id = requested.user_id
+               )
+    ), inserted AS (
+        INSERT INTO event_registration (user_id, event_id, status)
+        SELECT user_id, p_event_id,
+               CASE WHEN v_event.max_participants IS NULL
+                         OR v_event.registration_count + seat <= v_event.max_participants
+                    THEN 'registered' ELSE 'waitlisted' END
+          FROM candidates
+         ORDER BY seat
+        ON CONFLICT (user_id, event_id) DO NOTHING
+        RETURNING registration_id, user_id, event_id, status
+    )
+    SELECT COALESCE(jsonb_agg(to_jsonb(inserted)), '[]'::jsonb) INTO v_registered FROM inserted;
+
+    SELECT COALESCE(jsonb_agg(requested.user_id), '[]'::jsonb) INTO v_missing
+      FROM unnest(p_user_ids) AS requested(user_id)
+     WHERE NOT EXISTS (SELECT 1 FROM users u WHERE u.user_id = requested.user_id);
+
+    RETURN jsonb_build_object('event_found', true, 'registered', v_registered, 'missing', v_missing);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill counts under the new definition
+SELECT recount_event_registrations();
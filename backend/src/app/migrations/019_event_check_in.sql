@@ -0,0 +1,90 @@
+-- Migration 019: Event check-in
+-- Door check-ins are buffered in the API process (domain/checkin.py) and
+-- written here in batches: check_in_attendees() marks every registration
+-- in the batch 'attended' with one UPDATE ... FROM jsonb_to_recordset.
+-- Only 'registered' rows change, so rescans, repeated flushes and
+-- check-ins for waitlisted or unknown registrations are no-ops.
+--
+-- events.attended_count is maintained by the registration counter trigger
+-- (migration 015/018) so attendance can be read without counting rows.
+-- Called via supabase rpc("check_in_attendees").
+
+ALTER TABLE event_registration ADD COLUMN IF NOT EXISTS checked_in_at TIMESTAMP;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS attended_count INT NOT NULL DEFAULT 0;
+
+-- Seats and attendance in one pass; a check-in (registered -> attended)
+-- leaves registration_count alone and only bumps attended_count.
+CREATE OR REPLACE FUNCTION sync_event_registration_count()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.event_id = NEW.event_id THEN
+        IF (OLD.status IN ('registered', 'attended')) IS DISTINCT FROM (NEW.status IN ('registered', 'attended'))
+           OR (OLD.status = 'attended') IS DISTINCT FROM (NEW.status = 'attended') THEN
+            UPDATE events
+               SET registration_count = registration_count
+                       + (NEW.status IN ('registered', 'attended'))::INT
+                       - (OLD.status IN ('registered', 'attended'))::INT,
+                   attended_count = attended_count
+                       + (NEW.status = 'attended')::INT
+                       - (OLD.status = 'attended')::INT
+             WHERE event_id = NEW.event_id;
+        END IF;
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE events
+           SET registration_count = registration_count + (NEW.status IN ('registered', 'attended'))::INT,
+               attended_count = attended_count + (NEW.status = 'attended')::INT
+         WHERE event_id = NEW.event_id;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE events
+           SET registration_count = registration_count - (OLD.status IN ('registered', 'attended'))::INT,
+               attended_count = attended_count - (OLD.status = 'attended')::INT
+         WHERE event_id = OLD.event_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- p_checkins: [{"event_id", "user_id", "checked_in_at" (UTC)}]. Returns
+-- {"checked_in": [{"event_id", "user_id"}] for rows changed by this call,
+--  "attended": {"<event_id>": attended_count} for every event in the batch}.
+CREATE OR REPLACE FUNCTION check_in_attendees(p_checkins JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    v_checked_in JSONB;
+    v_attended JSONB;
+BEGIN
+    WITH batch AS (
+        SELECT DISTINCT ON (c.event_id, c.user_id) c.event_id, c.user_id, c.checked_in_at
+          FROM jsonb_to_recordset(p_checkins) AS c(event_id INT, user_id UUID, checked_in_at TIMESTAMP)
+         ORDER BY c.event_id, c.user_id, c.checked_in_at
+    ), updated AS (
+        UPDATE event_registration r
+           SET status = 'attended', checked_in_at = b.checked_in_at
+          FROM batch b
+         WHERE r.event_id = b.event_id AND r.user_id = b.user_id
+           AND r.status = 'registered'
+        RETURNING r.event_id, r.user_id
+    )
+    SELECT COALESCE(jsonb_agg(to_jsonb(updated)), '[]'::jsonb) INTO v_checked_in FROM updated;
+
+    SELECT COALESCE(jsonb_object_agg(e.event_id, e.attended_count), '{}'::jsonb) INTO v_attended
+      FROM events e
+     WHERE e.event_id IN (SELECT (value->>'event_id')::INT FROM jsonb_array_elements(p_checkins));
+
+    RETURN jsonb_build_object('checked_in', v_checked_in, 'attended', v_attended);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill attendance for rows marked 'attended' before this migration
+UPDATE events e
+   SET attended_count = a.attended
+  FROM (
+      SELECT event_id, COUNT(*)::INT AS attended
+        FROM event_registration
+       WHERE status = 'attended'
+       GROUP BY event_id
+  ) a
+ WHERE e.event_id = a.event_id;
@@ -0,0 +1,25 @@
+-- Migration 020: Atomic event occurrence cancellation
+-- Cancelling an occurrence used to read recurrence_exdates, append in the
+-- API and write the whole array back, so concurrent cancellations could
+-- lose one another's exdate. add_event_exdate() appends in place, like
+-- add_availability_rule_exdate() (migration 011).
+-- Called via supabase rpc("add_event_exdate").
+
+CREATE OR REPLACE FUNCTION add_event_exdate(p_event_id INT, p_occurrence TIMESTAMP)
+RETURNS JSONB AS $$
+BEGIN
+    UPDATE events
+       SET recurrence_exdates = array_append(recurrence_exdates, p_occurrence)
+     WHERE event_id = p_event_id
+       AND NOT (p_occurrence = ANY(recurrence_exdates));
+    IF FOUND THEN
+        RETURN jsonb_build_object('status', 'ok');
+    END IF;
+
+    PERFORM 1 FROM events WHERE event_id = p_event_id;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('status', 'not_found');
+    END IF;
+    RETURN jsonb_build_object('status', 'already_excluded');
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,56 @@
+-- Migration 021: Hosts and presenters don't take participant seats
+-- join_meeting_participant() (migration 012) bumped participant_count for
+-- every join, including uncapped ones, so a host joining a 10-seat meeting
+-- left 9 seats for participants. participant_count now only counts joins
+-- made with p_enforce_capacity; hosts and presenters get their
+-- meeting_participants row without touching it.
+
+CREATE OR REPLACE FUNCTION join_meeting_participant(
+    p_meeting_id INT,
+    p_user_id UUID,
+    p_enforce_capacity BOOLEAN DEFAULT TRUE
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_count INT;
+BEGIN
+    INSERT INTO meeting_participants (meeting_id, user_id)
+    VALUES (p_meeting_id, p_user_id)
+    ON CONFLICT (meeting_id, user_id) DO NOTHING;
+    IF NOT FOUND THEN
+        SELECT participant_count INTO v_count FROM meetings WHERE meeting_id = p_meeting_id;
+        RETURN jsonb_build_object('status', 'already_joined', 'participant_count', v_count);
+    END IF;
+
+    IF NOT p_enforce_capacity THEN
+        SELECT participant_count INTO v_count FROM meetings WHERE meeting_id = p_meeting_id;
+        RETURN jsonb_build_object('status', 'joined', 'participant_count', v_count);
+    END IF;
+
+    UPDATE meetings
+       SET participant_count = participant_count + 1
+     WHERE meeting_id = p_meeting_id
+       AND (max_participants IS NULL OR participant_count < max_participants)
+    RETURNING participant_count INTO v_count;
+
+    IF NOT FOUND THEN
+        DELETE FROM meeting_participants WHERE meeting_id = p_meeting_id AND user_id = p_user_id;
+        SELECT participant_count INTO v_count FROM meetings WHERE meeting_id = p_meeting_id;
+        RETURN jsonb_build_object('status', 'full', 'participant_count', v_count);
+    END IF;
+
+    RETURN jsonb_build_object('status', 'joined', 'participant_count', v_count);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recount without hosts and presenters (the roles join_meeting gives
+-- uncapped joins: the creator, and volunteers/admins at live meetings)
+UPDATE meetings m
+   SET participant_count = (
+       SELECT COUNT(*)::INT
+         FROM meeting_participants p
+         JOIN users u ON u.user_id = p.user_id
+        WHERE p.meeting_id = m.meeting_id
+          AND p.user_id IS DISTINCT FROM m.created_by
+          AND NOT (m.meeting_type = 'live' AND u.user_type IN ('volunteer', 'admin'))
+   );
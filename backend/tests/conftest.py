@@ -12,6 +12,11 @@ backend_dir = os.path.dirname(__file__).replace('/tests', '')
 src_dir = os.path.join(backend_dir, 'src')
 sys.path.insert(0, src_dir)
 
+# Background jobs bound to the module-level Supabase client must not run
+# against a real database during tests
+os.environ["AVAILABILITY_COMPACTION_ENABLED"] = "false"
+os.environ["MEETING_STATUS_SCHEDULER_ENABLED"] = "false"
+
 from app.main import app
 from app.core.database import Base, get_db
 
@@ -50,7 +55,15 @@ def client(test_db):
 from unittest.mock import Mock
 
 from app.main import app
+from src.app.core.auth import profile_cache, get_current_user
 from src.app.core.database import get_supabase
+from src.app.domain.availability import availability_index
+from src.app.domain.scoring import recent_load
+from src.app.core.zoom import signature_cache
+from src.app.api.v1.meetings import meeting_cache
+from src.app.domain.meeting_status import meeting_status_scheduler
+from src.app.core.pubsub import broker
+from src.app.domain.checkin import checkin_buffer
 
 
 @pytest.fixture
@@ -65,23 +78,48 @@ def mock_supabase():
 @pytest.fixture
 def client(mock_supabase):
     """Test client with mocked Supabase dependency"""
+    profile_cache.clear()
+    availability_index.clear()
+    recent_load.clear()
+    signature_cache.clear()
+    meeting_cache.clear()
+    meeting_status_scheduler.clear()
+    broker.clear()
+    checkin_buffer.clear()
     app.dependency_overrides[get_supabase] = lambda: mock_supabase
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def login(client):
+    """Authenticate requests as a user of the given type, bypassing token checks"""
+    def _login(user_type="student", user_id="user-1"):
+        user = {
+            "user_id": user_id,
+            "first_name": "Test",
+            "last_name": "User",
+            "email": f"{user_id}@example.com",
+            "user_type": user_type,
+            "experience_points": 0,
+        }
+        app.dependency_overrides[get_current_user] = lambda: user
+        return user
+    return _login
+
+
 @pytest.fixture
 def sample_availability_data():
     """Sample availability data for testing"""
     return [
         {
             "availability_id": 1,
-            "user_id": 2,
+            "user_id": "user-2",
             "time_start": "2024-01-15T10:00:00+00:00",
             "time_end": "2024-01-15T12:00:00+00:00",
             "users": {
-                "user_id": 2,
+                "user_id": "user-2",
                 "first_name": "Jane",
                 "last_name": "Doe",
                 "user_type": "mentor",
@@ -91,11 +129,11 @@ def sample_availability_data():
         },
         {
             "availability_id": 2,
-            "user_id": 3,
+            "user_id": "user-3",
             "time_start": "2024-01-15T14:00:00+00:00",
             "time_end": "2024-01-15T14:30:00+00:00",
             "users": {
-                "user_id": 3,
+                "user_id": "user-3",
                 "first_name": "John",
                 "last_name": "Smith",
                 "user_type": "mentee",
@@ -0,0 +1,126 @@
+import asyncio
+import time
+import pytest
+import jwt
+from unittest.mock import Mock, patch
+
+from src.app.core import auth
+from src.app.core.cache import TTLCache
+from src.app.core.jwt_verifier import TokenVerifier, UnknownSigningKey
+
+
+SECRET = "test-jwt-secret"
+
+
+def make_token(sub="user-1", audience="authenticated", expires_in=3600, secret=SECRET, headers=None):
+    payload = {"sub": sub, "aud": audience, "exp": int(time.time()) + expires_in}
+    return jwt.encode(payload, secret, algorithm="HS256", headers=headers)
+
+
+class TestTokenVerifier:
+    """Tests for local access token verification"""
+
+    def test_verify_valid_token(self):
+        verifier = TokenVerifier(jwks_url=None, secret=SECRET)
+        claims = verifier.verify(make_token())
+        assert claims["sub"] == "user-1"
+
+    def test_verify_expired_token(self):
+        verifier = TokenVerifier(jwks_url=None, secret=SECRET)
+        with pytest.raises(jwt.ExpiredSignatureError):
+            verifier.verify(make_token(expires_in=-10))
+
+    def test_verify_wrong_audience(self):
+        verifier = TokenVerifier(jwks_url=None, secret=SECRET)
+        with pytest.raises(jwt.InvalidAudienceError):
+            verifier.verify(make_token(audience="anon"))
+
+    def test_verify_bad_signature(self):
+        verifier = TokenVerifier(jwks_url=None, secret=SECRET)
+        with pytest.raises(jwt.InvalidSignatureError):
+            verifier.verify(make_token(secret="some-other-secret-value"))
+
+    def test_verify_without_secret_is_unknown_key(self):
+        verifier = TokenVerifier(jwks_url=None, secret="")
+        with pytest.raises(UnknownSigningKey):
+            verifier.verify(make_token())
+
+    def test_unsupported_algorithm_rejected(self):
+        verifier = TokenVerifier(jwks_url=None, secret=SECRET)
+        token = jwt.encode(
+            {"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + 60},
+            "x" * 48,
+            algorithm="HS384",
+        )
+        with pytest.raises(jwt.InvalidAlgorithmError):
+            verifier.verify(token)
+
+    def test_unknown_kid_requests_refresh(self):
+        verifier = TokenVerifier(jwks_url="http://auth.test/jwks.json")
+        with patch.object(verifier, "request_refresh") as request_refresh:
+            with patch("jwt.get_unverified_header", return_value={"alg": "ES256", "kid": "rotated"}):
+                with pytest.raises(UnknownSigningKey):
+                    verifier.verify("header.payload.signature")
+        request_refresh.assert_called_once()
+
+
+class TestResolveUserId:
+    """Tests for the auth dependency's token resolution"""
+
+    def test_local_verification_skips_supabase_auth(self):
+        db = Mock()
+        with patch.object(auth.token_verifier, "secret", SECRET):
+            assert asyncio.run(auth.resolve_user_id(make_token(sub="abc"), db)) == "abc"
+        db.auth.get_user.assert_not_called()
+
+    def test_invalid_local_token_returns_none(self):
+        db = Mock()
+        with patch.object(auth.token_verifier, "secret", SECRET):
+            assert asyncio.run(auth.resolve_user_id(make_token(expires_in=-10), db)) is None
+        db.auth.get_user.assert_not_called()
+
+    def test_unknown_key_falls_back_to_supabase_auth(self):
+        db = Mock()
+        db.auth.get_user.return_value.user.id = "remote-user"
+        with patch.object(auth.token_verifier, "secret", ""):
+            assert asyncio.run(auth.resolve_user_id(make_token(), db)) == "remote-user"
+        db.auth.get_user.assert_called_once()
+
+
+class TestProfileCache:
+    """Tests for the TTL + LRU profile cache"""
+
+    def test_entries_expire_after_ttl(self):
+        now = [0.0]
+        cache = TTLCache(maxsize=10, ttl=5, clock=lambda: now[0])
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        now[0] = 6
+        assert cache.get("a") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_least_recently_used_entry_evicted(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_profile_lookup_is_cached_until_invalidated(self):
+        db = Mock()
+        db.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
+            {"user_id": "abc", "user_type": "student"}
+        ]
+        auth.profile_cache.clear()
+
+        assert asyncio.run(auth.get_user_profile("abc", db))["user_type"] == "student"
+        assert asyncio.run(auth.get_user_profile("abc", db))["user_type"] == "student"
+        assert db.table.call_count == 1
+
+        auth.invalidate_user_profile("abc")
+        asyncio.run(auth.get_user_profile("abc", db))
+        assert db.table.call_count == 2
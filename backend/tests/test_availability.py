@@ -0,0 +1,233 @@
+import pytest
+from unittest.mock import Mock
+
+
+COMPACTION_REPORT = {
+    "expired": 4,
+    "trimmed": 1,
+    "merged": 3,
+    "dropped_short": 2,
+    "rows_reclaimed": 9,
+    "remaining": 12,
+}
+
+
+class TestCompactAvailability:
+    """Tests for the availability compaction endpoint"""
+
+    def test_compact_requires_admin(self, client, login):
+        """Test that non-admins can't trigger compaction"""
+        login(user_type="volunteer")
+
+        response = client.post("/api/v1/availability/compact")
+
+        assert response.status_code == 403
+
+    def test_compact_reports_and_reloads_index(self, client, login, mock_supabase, sample_availability_data):
+        """Test that compaction runs the RPC and reloads the availability index"""
+        login(user_type="admin")
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data=COMPACTION_REPORT)
+        mock_table = Mock()
+        mock_table.select.return_value.execute.return_value = Mock(data=sample_availability_data)
+        mock_table.select.return_value.or_.return_value.execute.return_value = Mock(data=[])
+        mock_supabase.table.return_value = mock_table
+
+        response = client.post("/api/v1/availability/compact?min_minutes=30")
+
+        assert response.status_code == 200
+        assert response.json() == COMPACTION_REPORT
+        mock_supabase.rpc.assert_called_once_with("compact_availabilities", {"p_min_minutes": 30})
+        mock_table.select.return_value.execute.assert_called_once()
+
+    def test_compact_defaults_to_min_bookable_minutes(self, client, login, mock_supabase):
+        """Test that the configured minimum is used when none is given"""
+        login(user_type="admin")
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data=COMPACTION_REPORT)
+        mock_supabase.table.return_value.select.return_value.execute.return_value = Mock(data=[])
+        mock_supabase.table.return_value.select.return_value.or_.return_value.execute.return_value = Mock(data=[])
+
+        response = client.post("/api/v1/availability/compact")
+
+        assert response.status_code == 200
+        mock_supabase.rpc.assert_called_once_with("compact_availabilities", {"p_min_minutes": 15})
+
+
+def setup_upload(mock_supabase, existing=(), inserted_ids=100):
+    """Mock the existing-rows query and echo inserted rows back with ids"""
+    mock_table = Mock()
+    (mock_table.select.return_value.eq.return_value.lt.return_value.gt.return_value
+        .execute.return_value) = Mock(data=list(existing))
+
+    def insert(rows):
+        data = [{**row, "availability_id": inserted_ids + i} for i, row in enumerate(rows)]
+        return Mock(execute=Mock(return_value=Mock(data=data)))
+
+    mock_table.insert.side_effect = insert
+    mock_supabase.table.return_value = mock_table
+    return mock_table
+
+
+def inserted_times(mock_table):
+    rows = mock_table.insert.call_args[0][0]
+    return [(row["time_start"], row["time_end"]) for row in rows]
+
+
+class TestUploadAvailability:
+    """Tests for bulk availability upload"""
+
+    def test_weekly_schedule_localised_across_dst(self, client, login, mock_supabase):
+        """Test that weekly rules keep local wall-clock times through a DST change"""
+        login(user_type="volunteer", user_id="vol-1")
+        mock_table = setup_upload(mock_supabase)
+
+        response = client.put("/api/v1/availability/users/vol-1", json={
+            "timezone": "America/New_York",
+            "range_start": "2024-03-04",
+            "range_end": "2024-03-17",
+            "weekly": [{"weekday": 0, "start_time": "16:00", "end_time": "18:00"}],
+        })
+
+        assert response.status_code == 200
+        assert response.json()["inserted"] == 2
+        assert inserted_times(mock_table) == [
+            ("2024-03-04T21:00:00", "2024-03-04T23:00:00"),
+            ("2024-03-11T20:00:00", "2024-03-11T22:00:00"),
+        ]
+        mock_table.delete.assert_not_called()
+
+    def test_overlapping_intervals_merged(self, client, login, mock_supabase):
+        """Test that overlapping and touching intervals become one slot"""
+        login(user_type="volunteer", user_id="vol-1")
+        mock_table = setup_upload(mock_supabase)
+
+        response = client.put("/api/v1/availability/users/vol-1", json={
+            "intervals": [
+                {"time_start": "2024-01-15T10:00:00Z", "time_end": "2024-01-15T11:00:00Z"},
+                {"time_start": "2024-01-15T10:30:00Z", "time_end": "2024-01-15T12:00:00Z"},
+                {"time_start": "2024-01-15T12:00:00Z", "time_end": "2024-01-15T12:30:00Z"},
+            ],
+        })
+
+        assert response.status_code == 200
+        assert inserted_times(mock_table) == [("2024-01-15T10:00:00", "2024-01-15T12:30:00")]
+
+    def test_diff_keeps_unchanged_and_bulk_deletes_rest(self, client, login, mock_supabase):
+        """Test that only changed rows are written, in one insert and one delete"""
+        login(user_type="volunteer", user_id="vol-1")
+        existing = [
+            {"availability_id": 1, "user_id": "vol-1", "time_start": "2024-01-15T10:00:00", "time_end": "2024-01-15T11:00:00"},
+            {"availability_id": 2, "user_id": "vol-1", "time_start": "2024-01-16T10:00:00", "time_end": "2024-01-16T11:00:00"},
+            {"availability_id": 3, "user_id": "vol-1", "time_start": "2024-01-17T10:00:00", "time_end": "2024-01-17T11:00:00"},
+        ]
+        mock_table = setup_upload(mock_supabase, existing)
+
+        response = client.put("/api/v1/availability/users/vol-1", json={
+            "range_start": "2024-01-15",
+            "range_end": "2024-01-21",
+            "weekly": [
+                {"weekday": 0, "start_time": "10:00", "end_time": "11:00"},
+                {"weekday": 3, "start_time": "10:00", "end_time": "11:00"},
+            ],
+        })
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["inserted"], data["deleted"], data["unchanged"]) == (1, 2, 1)
+        assert inserted_times(mock_table) == [("2024-01-18T10:00:00", "2024-01-18T11:00:00")]
+        mock_table.delete.return_value.in_.assert_called_once_with("availability_id", [2, 3])
+        assert [slot["availability_id"] for slot in data["slots"]] == [1, 100]
+
+    def test_slot_straddling_range_keeps_outside_part(self, client, login, mock_supabase):
+        """Test that replacing a range doesn't lose availability outside it"""
+        login(user_type="volunteer", user_id="vol-1")
+        existing = [
+            {"availability_id": 1, "user_id": "vol-1", "time_start": "2024-01-14T22:00:00", "time_end": "2024-01-15T02:00:00"},
+        ]
+        mock_table = setup_upload(mock_supabase, existing)
+
+        response = client.put("/api/v1/availability/users/vol-1", json={
+            "range_start": "2024-01-15",
+            "range_end": "2024-01-15",
+            "weekly": [],
+        })
+
+        assert response.status_code == 200
+        assert inserted_times(mock_table) == [("2024-01-14T22:00:00", "2024-01-15T00:00:00")]
+        mock_table.delete.return_value.in_.assert_called_once_with("availability_id", [1])
+
+    def test_cannot_set_other_users_availability(self, client, login):
+        """Test that volunteers can only upload their own schedule"""
+        login(user_type="volunteer", user_id="vol-1")
+
+        response = client.put("/api/v1/availability/users/vol-2", json={
+            "intervals": [{"time_start": "2024-01-15T10:00:00Z", "time_end": "2024-01-15T11:00:00Z"}],
+        })
+
+        assert response.status_code == 403
+
+    def test_unknown_timezone(self, client, login):
+        """Test that an invalid timezone is rejected"""
+        login(user_type="volunteer", user_id="vol-1")
+
+        response = client.put("/api/v1/availability/users/vol-1", json={
+            "timezone": "Mars/Olympus",
+            "intervals": [{"time_start": "2024-01-15T10:00:00", "time_end": "2024-01-15T11:00:00"}],
+        })
+
+        assert response.status_code == 400
+        assert "Unknown timezone" in response.json()["detail"]
+
+    def test_weekly_requires_range(self, client, login):
+        """Test that weekly rules need a date range"""
+        login(user_type="volunteer", user_id="vol-1")
+
+        response = client.put("/api/v1/availability/users/vol-1", json={
+            "weekly": [{"weekday": 0, "start_time": "10:00", "end_time": "11:00"}],
+        })
+
+        assert response.status_code == 400
+
+
+class TestAvailabilityRules:
+    """Tests for recurring availability rules"""
+
+    def test_create_rule_stores_local_times(self, client, login, mock_supabase):
+        """Test that the rule is stored once, in local time, with its UTC end"""
+        login(user_type="volunteer", user_id="vol-1")
+        mock_table = Mock()
+        mock_table.insert.return_value.execute.return_value = Mock(data=[{
+            "rule_id": 7,
+            "user_id": "vol-1",
+            "dtstart": "2024-03-04T16:00:00",
+            "timezone": "America/New_York",
+            "duration_minutes": 120,
+            "rrule": "FREQ=WEEKLY;BYDAY=MO;COUNT=3",
+            "exdates": [],
+            "until_utc": "2024-03-18T22:00:00",
+        }])
+        mock_supabase.table.return_value = mock_table
+
+        response = client.post("/api/v1/availability/users/vol-1/rules", json={
+            "dtstart": "2024-03-04T16:00:00",
+            "timezone": "America/New_York",
+            "duration_minutes": 120,
+            "rrule": "FREQ=WEEKLY;BYDAY=MO;COUNT=3",
+        })
+
+        assert response.status_code == 201
+        inserted = mock_table.insert.call_args[0][0]
+        assert inserted["dtstart"] == "2024-03-04T16:00:00"
+        # Last occurrence is after the DST change: 16:00-18:00 EDT
+        assert inserted["until_utc"] == "2024-03-18T22:00:00"
+
+    def test_invalid_rule_rejected(self, client, login):
+        """Test that unsupported rules are rejected"""
+        login(user_type="volunteer", user_id="vol-1")
+
+        response = client.post("/api/v1/availability/users/vol-1/rules", json={
+            "dtstart": "2024-03-04T16:00:00",
+            "duration_minutes": 60,
+            "rrule": "FREQ=HOURLY",
+        })
+
+        assert response.status_code == 400
@@ -0,0 +1,166 @@
+import pytest
+from unittest.mock import Mock
+
+from src.app.api.v1.calendar import feed_cache, feed_token
+from src.app.core.config import DEFAULT_SECRET_KEY, settings
+from src.app.core.pubsub import broker
+from src.app.domain.ical import escape_text, fold, write_calendar
+
+
+def setup_feed(mock_supabase, registrations=(), hosted=(), joined=()):
+    """Route each table's query to its own rows."""
+    tables = {}
+    for name, rows in (("event_registration", registrations), ("meetings", hosted), ("meeting_participants", joined)):
+        table = Mock()
+        table.select.return_value.eq.return_value.execute.return_value = Mock(data=list(rows))
+        tables[name] = table
+    mock_supabase.table.side_effect = lambda name: tables[name]
+    return tables
+
+
+EVENT = {
+    "event_id": 3, "name": "Coding club", "start_time": "2024-01-02T17:00:00", "end_time": "2024-01-02T18:00:00",
+    "recurrence_rule": "FREQ=WEEKLY;BYDAY=TU;COUNT=10", "recurrence_exdates": ["2024-01-09T17:00:00"],
+}
+MEETING = {
+    "meeting_id": 8, "title": "Tutoring, week 1", "description": "Bring questions", "start_time": "2024-01-03T15:00:00",
+    "end_time": "2024-01-03T16:00:00", "zoom_meeting_url": "https://zoom.us/j/1", "status": "scheduled",
+    "created_at": "2023-12-20T09:00:00",
+}
+
+
+class TestIcalWriter:
+    """Tests for the iCalendar writer"""
+
+    def test_escaping_and_folding(self):
+        """Test RFC 5545 text escaping and 75-octet folding"""
+        assert escape_text("a;b,c\\d\ne") == "a\\;b\\,c\\\\d\\ne"
+        folded = fold("DESCRIPTION:" + "é" * 60)
+        assert all(len(line.encode()) <= 75 for line in folded.split("\r\n"))
+        assert folded.replace("\r\n ", "") == "DESCRIPTION:" + "é" * 60 + "\r\n"
+
+    def test_recurring_event_kept_as_rule(self):
+        """Test that recurring events are written once with RRULE and EXDATE"""
+        text = "".join(write_calendar("Mine", [EVENT], [MEETING]))
+
+        assert text.startswith("BEGIN:VCALENDAR\r\n")
+        assert text.count("BEGIN:VEVENT") == 2
+        assert "RRULE:FREQ=WEEKLY;BYDAY=TU;COUNT=10\r\n" in text
+        assert "EXDATE:20240109T170000Z\r\n" in text
+        assert "SUMMARY:Tutoring\\, week 1\r\n" in text
+        assert "DTSTAMP:20231220T090000Z\r\n" in text
+
+
+class TestCalendarFeed:
+    """Tests for the per-user calendar feed"""
+
+    def url(self, user_id="user-1"):
+        return f"/api/v1/calendar/users/{user_id}.ics?token={feed_token(user_id)}"
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self, monkeypatch):
+        monkeypatch.setattr(settings, "SECRET_KEY", "calendar-secret-for-tests")
+        feed_cache.clear()
+
+    def test_feed_combines_events_and_meetings(self, client, mock_supabase):
+        """Test that registrations, hosted and joined meetings are all included"""
+        setup_feed(
+            mock_supabase,
+            registrations=[{"events": EVENT}],
+            hosted=[MEETING],
+            joined=[{"meetings": MEETING}, {"meetings": {**MEETING, "meeting_id": 9, "status": "cancelled"}}],
+        )
+
+        response = client.get(self.url())
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/calendar")
+        assert response.headers["etag"].startswith('"')
+        body = response.text
+        assert "UID:event-3" in body
+        assert body.count("UID:meeting-8") == 1
+        assert "UID:meeting-9" in body and "STATUS:CANCELLED" in body
+
+    def test_wrong_token_rejected(self, client, mock_supabase):
+        """Test that feeds need the user's token"""
+        response = client.get("/api/v1/calendar/users/user-1.ics?token=guess")
+
+        assert response.status_code == 404
+
+    def test_unchanged_poll_is_not_modified_from_cache(self, client, mock_supabase):
+        """Test that a poll with the current ETag gets 304 without querying"""
+        tables = setup_feed(mock_supabase, registrations=[{"events": EVENT}])
+        etag = client.get(self.url()).headers["etag"]
+
+        response = client.get(self.url(), headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert tables["event_registration"].select.call_count == 1
+
+    def test_registration_change_invalidates_user_feed(self, client, mock_supabase):
+        """Test that a registration change rebuilds that user's feed"""
+        tables = setup_feed(mock_supabase, registrations=[])
+        etag = client.get(self.url()).headers["etag"]
+
+        tables["event_registration"].select.return_value.eq.return_value.execute.return_value = Mock(
+            data=[{"events": EVENT}]
+        )
+        broker.publish("registrations", "created", event_id=3, user_id="user-1")
+        response = client.get(self.url(), headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert "UID:event-3" in response.text
+
+    def test_bulk_registration_invalidates_each_user(self, client, mock_supabase):
+        """Test that a bulk registration rebuilds every listed user's feed"""
+        setup_feed(mock_supabase)
+        client.get(self.url("user-1"))
+        client.get(self.url("user-2"))
+
+        broker.publish("registrations", "bulk_created", event_id=3, user_ids=["user-1", "user-2"])
+
+        assert feed_cache.get("user-1") is None
+        assert feed_cache.get("user-2") is None
+
+    def test_attendance_updates_keep_cached_feeds(self, client, mock_supabase):
+        """Test that check-in flushes don't throw away cached feeds"""
+        tables = setup_feed(mock_supabase, registrations=[{"events": EVENT}])
+        etag = client.get(self.url()).headers["etag"]
+
+        broker.publish("events", "attendance", event_id=3, attended=12)
+        response = client.get(self.url(), headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert tables["event_registration"].select.call_count == 1
+
+    def test_rebuilt_unchanged_feed_keeps_etag(self, client, mock_supabase):
+        """Test that regenerating identical content still answers 304"""
+        setup_feed(mock_supabase, hosted=[MEETING])
+        etag = client.get(self.url()).headers["etag"]
+
+        broker.publish("meetings", "created", meeting_id=99)
+        response = client.get(self.url(), headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+    def test_feed_url_requires_owner(self, client, login, mock_supabase):
+        """Test that users can only fetch their own feed URL"""
+        login(user_type="student", user_id="user-1")
+
+        own = client.get("/api/v1/calendar/users/user-1/feed-url")
+        other = client.get("/api/v1/calendar/users/user-2/feed-url")
+
+        assert own.status_code == 200
+        assert own.json()["url"].endswith(f"/api/v1/calendar/users/user-1.ics?token={feed_token('user-1')}")
+        assert other.status_code == 403
+
+    def test_feeds_disabled_with_default_secret(self, client, login, mock_supabase, monkeypatch):
+        """Test that feeds aren't served while SECRET_KEY is the public default"""
+        monkeypatch.setattr(settings, "SECRET_KEY", DEFAULT_SECRET_KEY)
+        setup_feed(mock_supabase)
+        login(user_type="student", user_id="user-1")
+
+        assert client.get(self.url()).status_code == 503
+        assert client.get("/api/v1/calendar/users/user-1/feed-url").status_code == 503
@@ -0,0 +1,243 @@
+import asyncio
+import pytest
+from unittest.mock import Mock
+from datetime import datetime, timezone
+
+from src.app.core.pubsub import broker
+from src.app.domain.checkin import CheckInBuffer, checkin_buffer
+
+NOW = datetime(2024, 1, 15, 9, 0, tzinfo=timezone.utc)
+STUDENTS = [f"00000000-0000-0000-0000-{i:012d}" for i in range(1, 6)]
+
+
+def fake_db(registered=STUDENTS, attended_before=0, fail=False):
+    """Stand-in for check_in_attendees(): marks registered users attended once."""
+    attended = set()
+    db = Mock()
+
+    def rpc(name, params):
+        assert name == "check_in_attendees"
+        if fail:
+            return Mock(execute=Mock(side_effect=ConnectionError("database unavailable")))
+        checked_in = []
+        for row in params["p_checkins"]:
+            key = (row["event_id"], row["user_id"])
+            if row["user_id"] in registered and key not in attended:
+                attended.add(key)
+                checked_in.append({"event_id": row["event_id"], "user_id": row["user_id"]})
+        counts = {
+            str(event_id): attended_before + sum(1 for e, _ in attended if e == event_id)
+            for event_id in {row["event_id"] for row in params["p_checkins"]}
+        }
+        return Mock(execute=Mock(return_value=Mock(data={"checked_in": checked_in, "attended": counts})))
+
+    db.rpc.side_effect = rpc
+    return db
+
+
+class TestCheckInBuffer:
+    """Tests for buffering check-ins and flushing them in batches"""
+
+    def test_flush_writes_pending_in_one_call(self):
+        """Test that a burst of scans becomes a single RPC"""
+        buffer = CheckInBuffer(clock=lambda: NOW)
+        db = fake_db()
+        buffer.add(1, STUDENTS[:3])
+        buffer.add(1, STUDENTS[3:])
+
+        assert asyncio.run(buffer.flush(db)) == 5
+        assert db.rpc.call_count == 1
+        checkins = db.rpc.call_args[0][1]["p_checkins"]
+        assert [row["user_id"] for row in checkins] == STUDENTS
+        assert checkins[0]["checked_in_at"] == "2024-01-15T09:00:00"
+        assert len(buffer) == 0
+        assert buffer.attended(1) == 5
+
+    def test_rescans_are_not_queued_again(self):
+        """Test that scanning a user twice is answered from memory"""
+        buffer = CheckInBuffer(clock=lambda: NOW)
+        db = fake_db()
+
+        assert buffer.add(1, [STUDENTS[0], STUDENTS[1]]) == ["queued", "queued"]
+        assert buffer.add(1, [STUDENTS[0]]) == ["already_checked_in"]
+        asyncio.run(buffer.flush(db))
+        assert buffer.add(1, [STUDENTS[1]]) == ["already_checked_in"]
+        # Same user at another event is a separate check-in
+        assert buffer.add(2, [STUDENTS[0]]) == ["queued"]
+        assert buffer.pending(1) == 0
+        assert buffer.pending(2) == 1
+
+    def test_empty_flush_skips_database(self):
+        """Test that an idle flush makes no calls"""
+        buffer = CheckInBuffer()
+        db = fake_db()
+
+        assert asyncio.run(buffer.flush(db)) == 0
+        db.rpc.assert_not_called()
+
+    def test_large_backlog_is_split_into_batches(self):
+        """Test that max_batch bounds each write"""
+        buffer = CheckInBuffer(max_batch=2, clock=lambda: NOW)
+        db = fake_db()
+        buffer.add(1, STUDENTS)
+
+        assert asyncio.run(buffer.flush(db)) == 5
+        assert [len(call[0][1]["p_checkins"]) for call in db.rpc.call_args_list] == [2, 2, 1]
+
+    def test_failed_flush_keeps_checkins(self):
+        """Test that a failed write is retried by the next flush"""
+        buffer = CheckInBuffer(clock=lambda: NOW)
+        buffer.add(1, STUDENTS[:2])
+
+        with pytest.raises(ConnectionError):
+            asyncio.run(buffer.flush(fake_db(fail=True)))
+        assert len(buffer) == 2
+        assert buffer.pending(1) == 2
+
+        db = fake_db()
+        assert asyncio.run(buffer.flush(db)) == 2
+
+    def test_unregistered_users_are_skipped(self):
+        """Test that attendance only counts registrations the database changed"""
+        buffer = CheckInBuffer(clock=lambda: NOW)
+        db = fake_db(registered=STUDENTS[:1], attended_before=10)
+        buffer.add(1, STUDENTS[:2])
+
+        assert asyncio.run(buffer.flush(db)) == 1
+        assert buffer.attended(1) == 11
+
+    def test_skipped_scans_can_be_rescanned(self):
+        """Test that users the database skipped aren't reported as checked in"""
+        registered = list(STUDENTS[:1])
+        buffer = CheckInBuffer(clock=lambda: NOW)
+        db = fake_db(registered=registered)
+        buffer.add(1, STUDENTS[:2])
+        asyncio.run(buffer.flush(db))
+
+        assert buffer.add(1, STUDENTS[:2]) == ["already_checked_in", "queued"]
+        # Registered at the door, then scanned again
+        registered.append(STUDENTS[1])
+        assert asyncio.run(buffer.flush(db)) == 1
+        assert buffer.attended(1) == 2
+
+
+class TestCheckInEndpoints:
+    """Tests for the check-in and attendance endpoints"""
+
+    @pytest.fixture(autouse=True)
+    def event(self, mock_supabase):
+        """Event 1 exists with nobody checked in yet"""
+        events = mock_supabase.table.return_value.select.return_value.eq.return_value
+        events.execute.return_value = Mock(data=[{"attended_count": 0}])
+        return events
+
+    def test_check_in_batch(self, client, login, mock_supabase):
+        """Test that scans are buffered with only the cached event lookup"""
+        login(user_type="volunteer")
+
+        response = client.post(
+            "/api/v1/users/events/1/check-in",
+            json={"user_ids": [STUDENTS[0], STUDENTS[1], "not-a-uuid", STUDENTS[0]]},
+        )
+
+        assert response.status_code == 202
+        data = response.json()
+        assert [(r["user_id"], r["status"]) for r in data["results"]] == [
+            (STUDENTS[0], "queued"),
+            (STUDENTS[1], "queued"),
+            ("not-a-uuid", "user_not_found"),
+        ]
+        assert (data["queued"], data["already_checked_in"], data["not_found"]) == (2, 0, 1)
+        mock_supabase.table.assert_called_once_with("events")
+        mock_supabase.rpc.assert_not_called()
+        assert checkin_buffer.pending(1) == 2
+
+    def test_check_in_unknown_event(self, client, login, event):
+        """Test that scans for an event that doesn't exist aren't buffered"""
+        login(user_type="volunteer")
+        event.execute.return_value = Mock(data=[])
+
+        response = client.post("/api/v1/users/events/999/check-in", json={"user_ids": [STUDENTS[0]]})
+
+        assert response.status_code == 404
+        assert len(checkin_buffer) == 0
+
+    def test_event_lookup_cached_between_scans(self, client, login, event):
+        """Test that a stream of scans reads the event once"""
+        login(user_type="volunteer")
+
+        for student in STUDENTS:
+            client.post("/api/v1/users/events/1/check-in", json={"user_ids": [student]})
+
+        assert event.execute.call_count == 1
+        assert checkin_buffer.pending(1) == len(STUDENTS)
+
+    def test_same_user_in_two_spellings_queued_once(self, client, login):
+        """Test that duplicates in a batch are detected on the canonical UUID"""
+        login(user_type="volunteer")
+
+        response = client.post(
+            "/api/v1/users/events/1/check-in",
+            json={"user_ids": [STUDENTS[0], STUDENTS[0].replace("-", "")]},
+        )
+
+        data = response.json()
+        assert [(r["user_id"], r["status"]) for r in data["results"]] == [(STUDENTS[0], "queued")]
+        assert data["queued"] == 1
+        assert checkin_buffer.pending(1) == 1
+
+    def test_rescan_is_idempotent(self, client, login):
+        """Test that scanning the same student again is harmless"""
+        login(user_type="volunteer")
+        client.post("/api/v1/users/events/1/check-in", json={"user_ids": [STUDENTS[0]]})
+
+        response = client.post("/api/v1/users/events/1/check-in", json={"user_ids": [STUDENTS[0]]})
+
+        assert response.status_code == 202
+        assert response.json()["results"][0]["status"] == "already_checked_in"
+        assert checkin_buffer.pending(1) == 1
+
+    def test_students_cannot_check_in(self, client, login):
+        """Test that check-in is for staff"""
+        login(user_type="student")
+
+        response = client.post("/api/v1/users/events/1/check-in", json={"user_ids": [STUDENTS[0]]})
+
+        assert response.status_code == 403
+        assert len(checkin_buffer) == 0
+
+    def test_attendance_includes_pending(self, client, login, mock_supabase):
+        """Test that the live count adds buffered check-ins to the stored count"""
+        login(user_type="volunteer")
+        mock_supabase.table.return_value.select.return_value.eq.return_value.execute.return_value = Mock(
+            data=[{"attended_count": 40}]
+        )
+        client.post("/api/v1/users/events/1/check-in", json={"user_ids": STUDENTS[:3]})
+
+        response = client.get("/api/v1/events/1/attendance")
+        client.get("/api/v1/events/1/attendance")
+
+        assert response.status_code == 200
+        assert response.json() == {"event_id": 1, "attended": 43, "pending": 3}
+        # The stored count is cached between reads
+        mock_supabase.table.assert_called_once_with("events")
+        mock_supabase.table.return_value.select.assert_called_once_with("attended_count")
+
+    def test_attendance_event_not_found(self, client, mock_supabase):
+        """Test that an unknown event is a 404"""
+        mock_supabase.table.return_value.select.return_value.eq.return_value.execute.return_value = Mock(data=[])
+
+        response = client.get("/api/v1/events/999/attendance")
+
+        assert response.status_code == 404
+
+    def test_flush_publishes_attendance(self, client):
+        """Test that stream subscribers see the new count after a flush"""
+        subscription = broker.subscribe(["events"])
+        buffer = CheckInBuffer(clock=lambda: NOW)
+        buffer.add(1, STUDENTS[:2])
+
+        asyncio.run(buffer.flush(fake_db(attended_before=3)))
+
+        notification = subscription.queue.get_nowait()
+        assert (notification.type, notification.data) == ("attendance", {"event_id": 1, "attended": 5})
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from src.app.core.diagnostics import LoopMonitor
+
+
+def blocking_handler():
+    time.sleep(0.25)
+
+
+class TestLoopMonitor:
+    """Tests for event-loop lag detection"""
+
+    def test_blocking_call_is_reported_with_stack(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+
+        async def scenario():
+            monitor.start()
+            await asyncio.sleep(0.05)
+            blocking_handler()
+            await asyncio.sleep(0.05)
+            await monitor.stop()
+
+        asyncio.run(scenario())
+
+        report = monitor.report()
+        assert report["samples"] > 0
+        assert report["max_ms"] >= 200
+        assert len(report["slow_callbacks"]) == 1
+        slow = report["slow_callbacks"][0]
+        assert slow["blocked_ms"] >= 200
+        assert "blocking_handler" in slow["stack"]
+
+    def test_blocking_route_is_named(self):
+        slow_app = FastAPI()
+
+        @slow_app.get("/slow")
+        async def slow_endpoint():
+            time.sleep(0.2)
+            return {}
+
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+
+        async def scenario():
+            monitor.start(slow_app)
+            transport = httpx.ASGITransport(app=slow_app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                await http.get("/slow")
+            await asyncio.sleep(0.05)
+            await monitor.stop()
+
+        asyncio.run(scenario())
+
+        slow = monitor.report()["slow_callbacks"][0]
+        assert slow["route"] == "GET /slow"
+
+    def test_idle_loop_has_no_slow_callbacks(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.1)
+
+        async def scenario():
+            monitor.start()
+            await asyncio.sleep(0.1)
+            await monitor.stop()
+
+        asyncio.run(scenario())
+
+        report = monitor.report()
+        assert report["slow_callbacks"] == []
+        assert report["p50_ms"] < 100
+
+
+class TestDiagnosticsEndpoint:
+    """Tests for the event-loop report endpoint"""
+
+    def test_requires_admin(self, client, login):
+        login("student")
+        response = client.get("/api/v1/diagnostics/event-loop")
+        assert response.status_code == 403
+
+    def test_admin_gets_report(self, client, login):
+        login("admin")
+        response = client.get("/api/v1/diagnostics/event-loop")
+        assert response.status_code == 200
+        data = response.json()
+        assert "p99_ms" in data
+        assert "slow_callbacks" in data
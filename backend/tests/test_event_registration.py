@@ -1,5 +1,8 @@
 import pytest
 from unittest.mock import Mock
+from postgrest.exceptions import APIError
+
+from src.app.core.pubsub import broker
 
 
 class TestEventRegistration:
@@ -35,150 +38,131 @@ class TestEventRegistration:
         assert len(data["events"]) == 1
         assert data["events"][0]["event_id"] == 1
 
-    def test_register_for_event_success(self, client, mock_supabase):
+    def test_register_for_event_success(self, client, login, mock_supabase):
         """Test successful event registration"""
-        event_data = [{
-            "event_id": 1,
-            "start_time": "2024-01-15T10:00:00+00:00",
-            "end_time": "2024-01-15T12:00:00+00:00"
-        }]
-
-        user_data = [{"user_id": 1}]
-
-        existing_reg_data = []
-
-        reg_response = [{
-            "registration_id": 1,
-            "user_id": 1,
-            "event_id": 1
-        }]
-
-        event_mock = Mock()
-        event_mock.data = event_data
-
-        user_mock = Mock()
-        user_mock.data = user_data
-
-        existing_mock = Mock()
-        existing_mock.data = existing_reg_data
-
-        insert_mock = Mock()
-        insert_mock.data = reg_response
-
-        def table_side_effect(table_name):
-            mock_table = Mock()
-            if table_name == "events":
-                mock_table.select.return_value.eq.return_value.execute.return_value = event_mock
-            elif table_name == "users":
-                mock_table.select.return_value.eq.return_value.execute.return_value = user_mock
-            elif table_name == "event_registration":
-                mock_table.select.return_value.eq.return_value.eq.return_value.execute.return_value = existing_mock
-                mock_table.insert.return_value.execute.return_value = insert_mock
-            return mock_table
-
-        mock_supabase.table.side_effect = table_side_effect
+        login(user_type="student", user_id="user-1")
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={
+            "status": "registered",
+            "registration": {"registration_id": 1, "user_id": "user-1", "event_id": 1, "status": "registered"},
+            "waitlist_position": None,
+        })
 
         response = client.post(
             "/api/v1/users/events/1/register",
-            json={"user_id": 1}
+            json={"user_id": "user-1"}
         )
 
         assert response.status_code == 201
         data = response.json()
-        assert data["user_id"] == 1
+        assert data["user_id"] == "user-1"
         assert data["event_id"] == 1
+        assert data["status"] == "registered"
+        # One round trip: no existence checks before the insert
+        mock_supabase.rpc.assert_called_once_with("register_for_event", {"p_event_id": 1, "p_user_id": "user-1"})
+        mock_supabase.table.assert_not_called()
+
+    def test_register_for_full_event_is_waitlisted(self, client, login, mock_supabase):
+        """Test that a registration past capacity joins the waitlist"""
+        login(user_type="student", user_id="user-1")
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={
+            "status": "waitlisted",
+            "registration": {"registration_id": 7, "user_id": "user-1", "event_id": 1, "status": "waitlisted"},
+            "waitlist_position": 3,
+        })
 
-    def test_register_for_event_already_registered(self, client, mock_supabase):
-        """Test registering when already registered"""
-        event_data = [{
-            "event_id": 1,
-            "start_time": "2024-01-15T10:00:00+00:00",
-            "end_time": "2024-01-15T12:00:00+00:00"
-        }]
-
-        user_data = [{"user_id": 1}]
-
-        existing_reg_data = [{
-            "registration_id": 1,
-            "user_id": 1,
-            "event_id": 1
-        }]
-
-        event_mock = Mock()
-        event_mock.data = event_data
-
-        user_mock = Mock()
-        user_mock.data = user_data
-
-        existing_mock = Mock()
-        existing_mock.data = existing_reg_data
+        response = client.post(
+            "/api/v1/users/events/1/register",
+            json={"user_id": "user-1"}
+        )
 
-        def table_side_effect(table_name):
-            mock_table = Mock()
-            if table_name == "events":
-                mock_table.select.return_value.eq.return_value.execute.return_value = event_mock
-            elif table_name == "users":
-                mock_table.select.return_value.eq.return_value.execute.return_value = user_mock
-            elif table_name == "event_registration":
-                mock_table.select.return_value.eq.return_value.eq.return_value.execute.return_value = existing_mock
-            return mock_table
+        assert response.status_code == 201
+        assert response.json()["status"] == "waitlisted"
+        assert response.json()["waitlist_position"] == 3
 
-        mock_supabase.table.side_effect = table_side_effect
+    def test_register_for_event_already_registered(self, client, login, mock_supabase):
+        """Test registering when already registered"""
+        login(user_type="student", user_id="user-1")
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={"status": "already_registered"})
 
         response = client.post(
             "/api/v1/users/events/1/register",
-            json={"user_id": 1}
+            json={"user_id": "user-1"}
         )
 
         assert response.status_code == 400
         assert "already registered" in response.json()["detail"]
 
-    def test_register_for_event_not_found(self, client, mock_supabase):
+    def test_register_for_event_not_found(self, client, login, mock_supabase):
         """Test registering for non-existent event"""
-        event_mock = Mock()
-        event_mock.data = []
-
-        mock_table = Mock()
-        mock_table.select.return_value.eq.return_value.execute.return_value = event_mock
-        mock_supabase.table.return_value = mock_table
+        login(user_type="student", user_id="user-1")
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={"status": "event_not_found"})
 
         response = client.post(
             "/api/v1/users/events/999/register",
-            json={"user_id": 1}
+            json={"user_id": "user-1"}
         )
 
         assert response.status_code == 404
         assert "Event not found" in response.json()["detail"]
 
-    def test_unregister_from_event(self, client, mock_supabase):
-        """Test unregistering from an event"""
-        reg_data = [{
-            "registration_id": 1,
-            "user_id": 1,
-            "event_id": 1
-        }]
+    def test_register_for_event_user_not_found(self, client, login, mock_supabase):
+        """Test registering a user that doesn't exist"""
+        login(user_type="admin")
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={"status": "user_not_found"})
+
+        response = client.post(
+            "/api/v1/users/events/1/register",
+            json={"user_id": "00000000-0000-0000-0000-000000000000"}
+        )
 
-        select_mock = Mock()
-        select_mock.data = reg_data
+        assert response.status_code == 404
+        assert "User not found" in response.json()["detail"]
 
-        mock_table = Mock()
-        mock_table.select.return_value.eq.return_value.eq.return_value.execute.return_value = select_mock
-        mock_table.delete.return_value.eq.return_value.eq.return_value.execute.return_value = Mock()
+    def test_register_with_malformed_user_id(self, client, login, mock_supabase):
+        """Test that a user_id that isn't a UUID is reported as not found"""
+        login(user_type="admin")
+        mock_supabase.rpc.return_value.execute.side_effect = APIError({
+            "code": "22P02",
+            "message": 'invalid input syntax for type uuid: "nope"',
+        })
 
-        mock_supabase.table.return_value = mock_table
+        response = client.post(
+            "/api/v1/users/events/1/register",
+            json={"user_id": "nope"}
+        )
+
+        assert response.status_code == 404
+        assert "User not found" in response.json()["detail"]
+
+    def test_unregister_from_event(self, client, login, mock_supabase):
+        """Test unregistering from an event"""
+        login(user_type="student", user_id="1")
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={"status": "ok", "promoted": []})
 
         response = client.delete("/api/v1/users/events/1/register/1")
 
         assert response.status_code == 204
+        mock_supabase.rpc.assert_called_once_with("unregister_from_event", {"p_event_id": 1, "p_user_id": "1"})
 
-    def test_unregister_from_event_not_registered(self, client, mock_supabase):
-        """Test unregistering when not registered"""
-        select_mock = Mock()
-        select_mock.data = []
+    def test_unregister_promotes_waitlisted_user(self, client, login, mock_supabase):
+        """Test that the user promoted into the freed seat is notified"""
+        login(user_type="student", user_id="user-1")
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={
+            "status": "ok",
+            "promoted": [{"registration_id": 9, "user_id": "user-2", "event_id": 1, "status": "registered"}],
+        })
+        subscription = broker.subscribe(["registrations"])
 
-        mock_table = Mock()
-        mock_table.select.return_value.eq.return_value.eq.return_value.execute.return_value = select_mock
-        mock_supabase.table.return_value = mock_table
+        response = client.delete("/api/v1/users/events/1/register/user-1")
+
+        assert response.status_code == 204
+        notifications = [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+        assert [(n.type, n.data["user_id"]) for n in notifications] == [("deleted", "user-1"), ("promoted", "user-2")]
+
+    def test_unregister_from_event_not_registered(self, client, login, mock_supabase):
+        """Test unregistering when not registered"""
+        login(user_type="student", user_id="1")
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={"status": "not_found"})
 
         response = client.delete("/api/v1/users/events/1/register/1")
 
@@ -231,3 +215,118 @@ class TestEventRegistration:
         assert len(data) == 2
         assert data[0]["user_id"] == 1
         assert data[1]["user_id"] == 2
+
+
+STUDENTS = [f"00000000-0000-0000-0000-{i:012d}" for i in range(1, 5)]
+
+
+def fake_register_users(existing=(), known=STUDENTS, event_found=True, seats=None):
+    """Stand-in for register_users_for_event(); `seats` left before the waitlist."""
+    def rpc(name, params):
+        assert name == "register_users_for_event"
+        if not event_found:
+            data = {"event_found": False}
+        else:
+            ids = params["p_user_ids"]
+            new = [user_id for user_id in ids if user_id in known and user_id not in existing]
+            data = {
+                "event_found": True,
+                "registered": [
+                    {
+                        "registration_id": 100 + i, "user_id": user_id, "event_id": params["p_event_id"],
+                        "status": "registered" if seats is None or i < seats else "waitlisted",
+                    }
+                    for i, user_id in enumerate(new)
+                ],
+                "missing": [user_id for user_id in ids if user_id not in known],
+            }
+        return Mock(execute=Mock(return_value=Mock(data=data)))
+    return rpc
+
+
+class TestBulkRegistration:
+    """Tests for registering a class for an event in one request"""
+
+    def test_per_user_outcomes(self, client, login, mock_supabase):
+        """Test that each user gets its own outcome from a single RPC"""
+        login(user_type="organizer")
+        mock_supabase.rpc.side_effect = fake_register_users(existing={STUDENTS[1]}, known=STUDENTS[:3])
+
+        response = client.post(
+            "/api/v1/users/events/1/register/bulk",
+            json={"user_ids": [STUDENTS[0], STUDENTS[1], STUDENTS[3], "not-a-uuid", STUDENTS[0]]},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [(r["user_id"], r["status"]) for r in data["results"]] == [
+            (STUDENTS[0], "registered"),
+            (STUDENTS[1], "already_registered"),
+            (STUDENTS[3], "user_not_found"),
+            ("not-a-uuid", "user_not_found"),
+        ]
+        assert (data["registered"], data["already_registered"], data["not_found"]) == (1, 1, 2)
+        assert mock_supabase.rpc.call_count == 1
+        # Malformed ids never reach the database
+        assert "not-a-uuid" not in mock_supabase.rpc.call_args[0][1]["p_user_ids"]
+
+    def test_same_user_in_two_spellings_counted_once(self, client, login, mock_supabase):
+        """Test that duplicates are detected on the canonical UUID"""
+        login(user_type="organizer")
+        mock_supabase.rpc.side_effect = fake_register_users()
+
+        response = client.post(
+            "/api/v1/users/events/1/register/bulk",
+            json={"user_ids": [STUDENTS[0], STUDENTS[0].replace("-", "")]},
+        )
+
+        data = response.json()
+        assert [(r["user_id"], r["status"]) for r in data["results"]] == [(STUDENTS[0], "registered")]
+        assert data["registered"] == 1
+        assert mock_supabase.rpc.call_args[0][1]["p_user_ids"] == [STUDENTS[0]]
+
+    def test_waitlists_past_capacity_in_request_order(self, client, login, mock_supabase):
+        """Test that seats go to the first users listed and the rest are waitlisted"""
+        login(user_type="organizer")
+        mock_supabase.rpc.side_effect = fake_register_users(seats=2)
+        user_ids = [STUDENTS[3], STUDENTS[0], STUDENTS[2], STUDENTS[1]]
+
+        response = client.post("/api/v1/users/events/1/register/bulk", json={"user_ids": user_ids})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["status"] for r in data["results"]] == ["registered", "registered", "waitlisted", "waitlisted"]
+        assert (data["registered"], data["waitlisted"]) == (2, 2)
+        assert mock_supabase.rpc.call_args[0][1]["p_user_ids"] == user_ids
+
+    def test_one_notification_per_call(self, client, login, mock_supabase):
+        """Test that a whole class is announced with a single notification"""
+        login(user_type="organizer")
+        mock_supabase.rpc.side_effect = fake_register_users(existing={STUDENTS[1]})
+        subscription = broker.subscribe(["registrations"])
+
+        client.post("/api/v1/users/events/1/register/bulk", json={"user_ids": STUDENTS})
+
+        assert subscription.queue.qsize() == 1
+        notification = subscription.queue.get_nowait()
+        assert notification.type == "bulk_created"
+        assert notification.data == {"event_id": 1, "user_ids": [STUDENTS[0], STUDENTS[2], STUDENTS[3]]}
+
+    def test_event_not_found(self, client, login, mock_supabase):
+        """Test that an unknown event is a 404"""
+        login(user_type="admin")
+        mock_supabase.rpc.side_effect = fake_register_users(event_found=False)
+
+        response = client.post("/api/v1/users/events/999/register/bulk", json={"user_ids": STUDENTS})
+
+        assert response.status_code == 404
+        assert "Event not found" in response.json()["detail"]
+
+    def test_students_cannot_bulk_register(self, client, login, mock_supabase):
+        """Test that bulk registration is for admins and organizers"""
+        login(user_type="student")
+
+        response = client.post("/api/v1/users/events/1/register/bulk", json={"user_ids": STUDENTS})
+
+        assert response.status_code == 403
+        mock_supabase.rpc.assert_not_called()
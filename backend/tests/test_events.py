@@ -203,3 +203,238 @@ class TestEvents:
 
         assert response.status_code == 404
         assert "Event not found" in response.json()["detail"]
+
+
+class TestRecurringEvents:
+    """Tests for recurring events expanded over a window"""
+
+    def setup_window(self, mock_supabase, one_off=(), recurring=()):
+        mock_table = Mock()
+        select = mock_table.select.return_value
+        select.is_.return_value.lt.return_value.gt.return_value.execute.return_value = Mock(data=list(one_off))
+        select.not_.is_.return_value.lt.return_value.or_.return_value.execute.return_value = Mock(data=list(recurring))
+        mock_supabase.table.return_value = mock_table
+        return mock_table
+
+    def test_window_expands_only_that_week(self, client, mock_supabase):
+        """Test that a year-long weekly series yields just the window's occurrences"""
+        self.setup_window(
+            mock_supabase,
+            one_off=[{"event_id": 1, "name": "Kickoff", "start_time": "2024-03-05T12:00:00", "end_time": "2024-03-05T13:00:00"}],
+            recurring=[{
+                "event_id": 2,
+                "name": "Coding club",
+                "start_time": "2024-01-02T17:00:00",
+                "end_time": "2024-01-02T18:00:00",
+                "recurrence_rule": "FREQ=WEEKLY;BYDAY=TU,TH;UNTIL=20241231",
+                "recurrence_exdates": ["2024-03-07T17:00:00"],
+                "recurrence_until": "2024-12-31T18:00:00",
+            }],
+        )
+
+        response = client.get("/api/v1/events?from=2024-03-04T00:00:00Z&to=2024-03-11T00:00:00Z")
+
+        assert response.status_code == 200
+        data = response.json()
+        # Thursday's club meeting is cancelled
+        assert [(e["event_id"], e["start_time"][:16]) for e in data] == [
+            (1, "2024-03-05T12:00"),
+            (2, "2024-03-05T17:00"),
+        ]
+        assert data[1]["recurrence_rule"] == "FREQ=WEEKLY;BYDAY=TU,TH;UNTIL=20241231"
+
+    def test_window_requires_both_bounds(self, client, mock_supabase):
+        """Test that a half-open window is rejected"""
+        response = client.get("/api/v1/events?from=2024-03-04T00:00:00Z")
+
+        assert response.status_code == 400
+
+    def test_create_recurring_event(self, client, login, mock_supabase):
+        """Test that the rule is stored once with its end for window pruning"""
+        login(user_type="admin")
+        mock_table = Mock()
+        mock_table.insert.return_value.execute.return_value = Mock(data=[{
+            "event_id": 3,
+            "name": "Office hours",
+            "start_time": "2024-01-01T15:00:00",
+            "end_time": "2024-01-01T16:00:00",
+            "recurrence_rule": "FREQ=DAILY;COUNT=5",
+        }])
+        mock_supabase.table.return_value = mock_table
+
+        response = client.post("/api/v1/events", json={
+            "name": "Office hours",
+            "start_time": "2024-01-01T15:00:00Z",
+            "end_time": "2024-01-01T16:00:00Z",
+            "recurrence_rule": "FREQ=DAILY;COUNT=5",
+        })
+
+        assert response.status_code == 201
+        inserted = mock_table.insert.call_args[0][0]
+        assert inserted["recurrence_rule"] == "FREQ=DAILY;COUNT=5"
+        assert inserted["recurrence_until"] == "2024-01-05T16:00:00"
+
+    def test_create_event_stores_utc(self, client, login, mock_supabase):
+        """Test that start/end are stored on the same UTC basis as exdates"""
+        login(user_type="admin")
+        mock_table = Mock()
+        mock_table.insert.return_value.execute.return_value = Mock(data=[{
+            "event_id": 4, "start_time": "2024-01-01T15:00:00", "end_time": "2024-01-01T16:00:00",
+        }])
+        mock_supabase.table.return_value = mock_table
+
+        client.post("/api/v1/events", json={
+            "start_time": "2024-01-01T10:00:00-05:00",
+            "end_time": "2024-01-01T11:00:00-05:00",
+            "recurrence_rule": "FREQ=DAILY;COUNT=3",
+            "recurrence_exdates": ["2024-01-02T10:00:00-05:00"],
+        })
+
+        inserted = mock_table.insert.call_args[0][0]
+        assert (inserted["start_time"], inserted["end_time"]) == ("2024-01-01T15:00:00", "2024-01-01T16:00:00")
+        assert inserted["recurrence_exdates"] == ["2024-01-02T15:00:00"]
+
+    def test_moving_series_recomputes_until(self, client, login, mock_supabase):
+        """Test that rescheduling a recurring event moves its recurrence_until"""
+        login(user_type="admin")
+        mock_table = Mock()
+        mock_table.select.return_value.eq.return_value.execute.return_value = Mock(data=[{
+            "event_id": 3, "start_time": "2024-01-01T15:00:00", "end_time": "2024-01-01T16:00:00",
+            "recurrence_rule": "FREQ=DAILY;COUNT=5", "recurrence_until": "2024-01-05T16:00:00",
+        }])
+        mock_table.update.return_value.eq.return_value.execute.return_value = Mock(data=[{
+            "event_id": 3, "start_time": "2024-01-08T15:00:00", "end_time": "2024-01-08T17:00:00",
+        }])
+        mock_supabase.table.return_value = mock_table
+
+        response = client.put("/api/v1/events/3", json={
+            "start_time": "2024-01-08T15:00:00Z", "end_time": "2024-01-08T17:00:00Z",
+        })
+
+        assert response.status_code == 200
+        assert mock_table.update.call_args[0][0]["recurrence_until"] == "2024-01-12T17:00:00"
+
+    def test_create_event_invalid_rule(self, client, login, mock_supabase):
+        """Test that unsupported recurrence rules are rejected"""
+        login(user_type="admin")
+
+        response = client.post("/api/v1/events", json={
+            "start_time": "2024-01-01T15:00:00Z",
+            "end_time": "2024-01-01T16:00:00Z",
+            "recurrence_rule": "FREQ=YEARLY",
+        })
+
+        assert response.status_code == 400
+
+    def test_cancel_occurrence(self, client, login, mock_supabase):
+        """Test that cancelling adds the occurrence to the exdates"""
+        login(user_type="admin")
+        mock_table = Mock()
+        mock_table.select.return_value.eq.return_value.execute.return_value = Mock(data=[{
+            "event_id": 2, "recurrence_rule": "FREQ=DAILY",
+        }])
+        mock_supabase.table.return_value = mock_table
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={"status": "ok"})
+
+        response = client.post("/api/v1/events/2/cancel", json={"occurrence_start": "2024-01-03T17:00:00Z"})
+
+        assert response.status_code == 204
+        mock_supabase.rpc.assert_called_once_with(
+            "add_event_exdate", {"p_event_id": 2, "p_occurrence": "2024-01-03T17:00:00"}
+        )
+        mock_table.update.assert_not_called()
+
+
+class TestGetEventRegistrations:
+    """Tests for the registration projections of get_event"""
+
+    def setup_event(self, mock_supabase, registrations=()):
+        tables = {"events": Mock(), "event_registration": Mock()}
+        tables["events"].select.return_value.eq.return_value.execute.return_value = Mock(data=[{
+            "event_id": 1, "name": "Hackathon", "start_time": "2024-01-15T10:00:00",
+            "end_time": "2024-01-15T12:00:00", "registration_count": 250,
+        }])
+        tables["event_registration"].select.return_value.eq.return_value.execute.return_value = Mock(
+            data=list(registrations)
+        )
+        mock_supabase.table.side_effect = lambda name: tables[name]
+        return tables
+
+    def test_count_only_reads_counter(self, client, mock_supabase):
+        """Test that count_only skips the registration query"""
+        tables = self.setup_event(mock_supabase)
+
+        response = client.get("/api/v1/events/1?count_only=true")
+
+        assert response.status_code == 200
+        assert response.json()["total_registrations"] == 250
+        assert response.json()["registrations"] == []
+        tables["event_registration"].select.assert_not_called()
+
+    def test_default_projects_ids_only(self, client, mock_supabase):
+        """Test that registrations are fetched without embedding users"""
+        tables = self.setup_event(mock_supabase, [{"registration_id": 5, "user_id": "user-1", "event_id": 1}])
+
+        response = client.get("/api/v1/events/1")
+
+        assert response.status_code == 200
+        tables["event_registration"].select.assert_called_once_with("registration_id, user_id, event_id, status")
+        assert response.json()["registrations"][0]["user"] is None
+
+    def test_include_users_projects_profile_fields(self, client, mock_supabase):
+        """Test that include=users embeds only the public profile columns"""
+        tables = self.setup_event(mock_supabase, [{
+            "registration_id": 5, "user_id": "user-1", "event_id": 1,
+            "users": {"user_id": "user-1", "first_name": "Ada", "last_name": "L", "user_type": "student"},
+        }])
+
+        response = client.get("/api/v1/events/1?include=users")
+
+        columns = tables["event_registration"].select.call_args[0][0]
+        assert "users(user_id, first_name, last_name" in columns
+        assert "*" not in columns
+        assert response.json()["registrations"][0]["user"]["first_name"] == "Ada"
+
+    def test_unknown_include_rejected(self, client, mock_supabase):
+        """Test that only include=users is accepted"""
+        self.setup_event(mock_supabase)
+
+        assert client.get("/api/v1/events/1?include=passwords").status_code == 422
+
+
+class TestRegistrationCounts:
+    """Tests for registration counts on the events list"""
+
+    def test_list_includes_counts(self, client, mock_supabase):
+        """Test that the list carries each event's maintained count"""
+        mock_table = Mock()
+        mock_table.select.return_value.execute.return_value = Mock(data=[
+            {"event_id": 1, "name": "A", "start_time": "2024-01-15T10:00:00",
+             "end_time": "2024-01-15T12:00:00", "registration_count": 12},
+            {"event_id": 2, "name": "B", "start_time": "2024-01-16T10:00:00", "end_time": "2024-01-16T12:00:00"},
+        ])
+        mock_supabase.table.return_value = mock_table
+
+        response = client.get("/api/v1/events")
+
+        assert response.status_code == 200
+        assert [e["registration_count"] for e in response.json()] == [12, 0]
+        # One query for the whole list
+        assert mock_supabase.table.call_count == 1
+
+    def test_recount(self, client, login, mock_supabase):
+        """Test that admins can reconcile the counters"""
+        login(user_type="admin")
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={"corrected": 3})
+
+        response = client.post("/api/v1/events/registration-counts/recount")
+
+        assert response.status_code == 200
+        assert response.json() == {"corrected": 3}
+        mock_supabase.rpc.assert_called_once_with("recount_event_registrations", {})
+
+    def test_recount_admin_only(self, client, login, mock_supabase):
+        """Test that other roles can't trigger a recount"""
+        login(user_type="student")
+
+        assert client.post("/api/v1/events/registration-counts/recount").status_code == 403
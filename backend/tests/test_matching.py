@@ -0,0 +1,101 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from src.app.domain.availability import Slot
+from src.app.domain.matching import MatchRequest, MinCostFlow, assign
+
+DAY = datetime(2024, 1, 15, tzinfo=timezone.utc)
+
+
+def at(hour):
+    return DAY + timedelta(hours=hour)
+
+
+def slot(availability_id, user_id, start_hour, end_hour):
+    return Slot(availability_id=availability_id, user_id=user_id, time_start=at(start_hour), time_end=at(end_hour))
+
+
+def request(student, minutes=30, window=None):
+    return MatchRequest(
+        requester_id=student,
+        duration=timedelta(minutes=minutes),
+        window_start=at(window[0]) if window else None,
+        window_end=at(window[1]) if window else None,
+    )
+
+
+class TestMinCostFlow:
+    """Tests for the min-cost flow solver"""
+
+    def test_prefers_cheaper_paths_at_max_flow(self):
+        """Test that flow is maximal first and cheapest among maximal flows"""
+        flow = MinCostFlow(4)
+        a = flow.add_edge(0, 1, 1, 0)
+        b = flow.add_edge(0, 2, 1, 0)
+        cheap = flow.add_edge(1, 3, 1, 1)
+        flow.add_edge(2, 3, 1, 5)
+        flow.add_edge(1, 2, 1, 0)
+
+        assert flow.solve(0, 3) == (2, 6)
+        assert flow.flow(a) == flow.flow(b) == flow.flow(cheap) == 1
+
+
+class TestAssign:
+    """Tests for batch assignment of requests to availability"""
+
+    def test_maximizes_matches_over_first_come(self):
+        """Test that a flexible request yields to one with a single option"""
+        slots = [slot(1, "vol-a", 9, 9.5), slot(2, "vol-b", 13, 13.5)]
+        requests = {
+            # First in line and could take either slot; greedy would give it 9:00
+            0: request("stu-1", window=(8, 14)),
+            1: request("stu-2", window=(8, 10)),
+        }
+
+        result = assign(requests, slots)
+
+        assert result[1].slot.availability_id == 1
+        assert result[0].slot.availability_id == 2
+
+    def test_slot_hosts_back_to_back_meetings(self):
+        """Test that a long slot is carved into non-overlapping meetings"""
+        result = assign({i: request(f"stu-{i}") for i in range(3)}, [slot(1, "vol-a", 9, 10)])
+
+        assert len(result) == 2
+        starts = sorted(a.start for a in result.values())
+        assert starts == [at(9), at(9.5)]
+
+    def test_longer_requests_matched_first(self):
+        """Test that short requests fill what the long ones leave"""
+        requests = {0: request("stu-1", minutes=20), 1: request("stu-2", minutes=60)}
+
+        result = assign(requests, [slot(1, "vol-a", 9, 10.5)])
+
+        assert result[1].start == at(9)
+        assert result[0].start == at(10)
+
+    def test_respects_windows_and_requester(self):
+        """Test that meetings stay in the window and never pair a user with themselves"""
+        slots = [slot(1, "stu-1", 9, 12), slot(2, "vol-a", 9, 12)]
+
+        result = assign({0: request("stu-1", window=(10, 11))}, slots)
+
+        assert result[0].slot.availability_id == 2
+        assert at(10) <= result[0].start and result[0].end <= at(11)
+
+    def test_balance_load_spreads_volunteers(self):
+        """Test that balancing trades earliest start for fewer meetings per volunteer"""
+        slots = [slot(1, "vol-a", 9, 11), slot(2, "vol-b", 12, 14)]
+        requests = {i: request(f"stu-{i}") for i in range(4)}
+
+        packed = assign(requests, slots)
+        balanced = assign(requests, slots, balance_load=True)
+
+        assert sorted(a.slot.user_id for a in packed.values()) == ["vol-a"] * 4
+        assert sorted(a.slot.user_id for a in balanced.values()) == ["vol-a", "vol-a", "vol-b", "vol-b"]
+
+    def test_unmatched_requests_left_out(self):
+        """Test that requests with no fitting slot are not assigned"""
+        result = assign({0: request("stu-1", minutes=90)}, [slot(1, "vol-a", 9, 10)])
+
+        assert result == {}
@@ -0,0 +1,117 @@
+import asyncio
+import pytest
+from unittest.mock import Mock
+from datetime import datetime, timedelta, timezone
+
+from src.app.domain.meeting_status import MeetingStatusScheduler
+
+NOW = datetime(2024, 1, 15, 10, 0, tzinfo=timezone.utc)
+
+
+def meeting(meeting_id, start_minutes, end_minutes, status="scheduled"):
+    return {
+        "meeting_id": meeting_id,
+        "start_time": (NOW + timedelta(minutes=start_minutes)).replace(tzinfo=None).isoformat(),
+        "end_time": (NOW + timedelta(minutes=end_minutes)).replace(tzinfo=None).isoformat(),
+        "status": status,
+    }
+
+
+def fake_db(rows=()):
+    """Supabase stand-in: open meetings for load(), and an RPC that applies everything."""
+    db = Mock()
+    db.table.return_value.select.return_value.in_.return_value.execute.return_value = Mock(data=list(rows))
+
+    def rpc(name, params):
+        assert name == "apply_meeting_status_transitions"
+        return Mock(execute=Mock(return_value=Mock(data={"live": params["p_live"], "ended": params["p_ended"]})))
+
+    db.rpc.side_effect = rpc
+    return db
+
+
+class TestMeetingStatusScheduler:
+    """Tests for the time-driven meeting status scheduler"""
+
+    def make(self, now):
+        return MeetingStatusScheduler(clock=lambda: now[0])
+
+    def test_transitions_applied_at_start_and_end(self):
+        """Test that meetings go live at start_time and end at end_time"""
+        now = [NOW]
+        db = fake_db([meeting(1, 5, 65), meeting(2, 5, 35), meeting(3, -10, 20, status="live")])
+        scheduler = self.make(now)
+        asyncio.run(scheduler.load(db))
+
+        assert asyncio.run(scheduler.tick(db)) == {"live": [], "ended": []}
+        db.rpc.assert_not_called()
+
+        now[0] = NOW + timedelta(minutes=5)
+        assert asyncio.run(scheduler.tick(db)) == {"live": [1, 2], "ended": []}
+
+        now[0] = NOW + timedelta(minutes=40)
+        assert asyncio.run(scheduler.tick(db)) == {"live": [], "ended": [2, 3]}
+        # One write per tick, however many meetings it covers
+        assert db.rpc.call_count == 2
+        assert len(scheduler) == 1
+
+    def test_missed_transitions_collapse_to_ended(self):
+        """Test that a meeting whose whole slot passed while down is only ended"""
+        now = [NOW + timedelta(hours=2)]
+        db = fake_db([meeting(1, 5, 65)])
+        scheduler = self.make(now)
+        asyncio.run(scheduler.load(db))
+
+        assert asyncio.run(scheduler.tick(db)) == {"live": [], "ended": [1]}
+
+    def test_listeners_notified(self):
+        """Test that subscribers see the meetings that changed"""
+        now = [NOW + timedelta(minutes=5)]
+        db = fake_db()
+        scheduler = self.make(now)
+        seen = []
+        scheduler.subscribe(seen.append)
+        scheduler.schedule(meeting(7, 0, 30))
+
+        asyncio.run(scheduler.tick(db))
+
+        assert seen == [{"live": [7], "ended": []}]
+
+    def test_failed_write_is_retried(self):
+        """Test that a failed batch goes back on the heap"""
+        now = [NOW + timedelta(minutes=5)]
+        db = fake_db()
+        scheduler = self.make(now)
+        scheduler.schedule(meeting(1, 0, 30))
+        db.rpc.side_effect = RuntimeError("connection reset")
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(scheduler.tick(db))
+
+        db.rpc.side_effect = fake_db().rpc.side_effect
+        now[0] += scheduler.retry_delay
+        assert asyncio.run(scheduler.tick(db)) == {"live": [1], "ended": []}
+
+    def test_run_sleeps_until_next_transition(self):
+        """Test that the background task wakes for a newly scheduled earlier meeting"""
+        db = fake_db()
+        scheduler = MeetingStatusScheduler(max_sleep=30)
+        applied = []
+        scheduler.subscribe(applied.append)
+
+        async def scenario():
+            scheduler.start(db)
+            await asyncio.sleep(0.05)
+            start = datetime.now(timezone.utc) + timedelta(seconds=0.1)
+            scheduler.schedule({
+                "meeting_id": 9,
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=1)).isoformat(),
+                "status": "scheduled",
+            })
+            await asyncio.sleep(0.3)
+            await scheduler.stop()
+
+        asyncio.run(scenario())
+
+        assert applied == [{"live": [9], "ended": []}]
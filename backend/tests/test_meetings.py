@@ -1,28 +1,74 @@
 import pytest
 from unittest.mock import Mock, MagicMock
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+
+from src.app.domain.availability import AvailabilityIndex, Slot
+
+
+def fake_reserve(rows, conflicts=None):
+    """
+    Stand-in for the reserve_availability() RPC over `rows`: reserved slots
+    are removed and their fragments added. `conflicts` maps availability_id
+    to the status to report instead ("gone"/"changed").
+    """
+    by_id = {row["availability_id"]: row for row in rows}
+    conflicts = conflicts or {}
+
+    def rpc(name, params):
+        assert name == "reserve_availability"
+        slot = by_id.get(params["p_availability_id"])
+        status = conflicts.get(params["p_availability_id"], "ok" if slot else "gone")
+        if status == "gone":
+            result = {"status": "gone"}
+        elif status == "changed":
+            result = {"status": "changed", "slot": {**slot, "time_end": slot["time_start"]}}
+        else:
+            remaining = [
+                {"availability_id": 100 + i, "user_id": slot["user_id"], "time_start": start, "time_end": end}
+                for i, (start, end) in enumerate([
+                    (params["p_expected_start"], params["p_booking_start"]),
+                    (params["p_booking_end"], params["p_expected_end"]),
+                ])
+                if start < end
+            ]
+            del by_id[slot["availability_id"]]
+            by_id.update({row["availability_id"]: {**row, "users": slot["users"]} for row in remaining})
+            slot_row = {key: value for key, value in slot.items() if key != "users"}
+            result = {"status": "ok", "slot": slot_row, "user": slot["users"], "remaining": remaining}
+        return Mock(execute=Mock(return_value=Mock(data=result)))
+
+    return rpc
+
+
+def setup_availabilities(mock_supabase, rows, conflicts=None, rules=()):
+    """
+    Mock the availabilities table (the index load returns `rows`), the
+    availability_rules query and the reserve_availability() RPC.
+    """
+    mock_table = Mock()
+    mock_table.select.return_value.execute.return_value = Mock(data=rows)
+    mock_table.select.return_value.or_.return_value.execute.return_value = Mock(data=list(rules))
+    mock_supabase.table.return_value = mock_table
+    mock_supabase.rpc.side_effect = fake_reserve(rows, conflicts)
+    return mock_table
+
+
+def reserve_calls(mock_supabase):
+    return [call.args[1] for call in mock_supabase.rpc.call_args_list]
 
 
 class TestScheduleMeeting:
     """Tests for schedule_meeting endpoint"""
 
-    def test_schedule_meeting_success(self, client, mock_supabase, sample_availability_data):
+    def test_schedule_meeting_success(self, client, login, mock_supabase, sample_availability_data):
         """Test successful meeting scheduling"""
-        # Setup mock responses
-        mock_select = Mock()
-        mock_select.data = sample_availability_data
-
-        mock_table = Mock()
-        mock_table.select.return_value.neq.return_value.execute.return_value = mock_select
-        mock_table.delete.return_value.eq.return_value.execute.return_value = Mock()
-        mock_table.insert.return_value.execute.return_value = Mock()
-
-        mock_supabase.table.return_value = mock_table
+        login()
+        setup_availabilities(mock_supabase, sample_availability_data)
 
         # Make request
         response = client.post(
             "/api/v1/meetings/schedule",
-            json={"user_id": 1, "duration_minutes": 30}
+            json={"user_id": "user-1", "duration_minutes": 30}
         )
 
         # Assertions
@@ -30,118 +76,779 @@ class TestScheduleMeeting:
         data = response.json()
         assert "matched_user" in data
         assert "scheduled_slot" in data
-        assert data["matched_user"]["user_id"] == 2
+        assert data["matched_user"]["user_id"] == "user-2"
         assert data["matched_user"]["first_name"] == "Jane"
         assert data["message"] == "Meeting scheduled successfully for 30 minutes"
 
-    def test_schedule_meeting_no_available_users(self, client, mock_supabase):
+    def test_schedule_meeting_no_available_users(self, client, login, mock_supabase):
         """Test when no users have availability"""
-        # Setup empty mock response
-        mock_select = Mock()
-        mock_select.data = []
-
-        mock_table = Mock()
-        mock_table.select.return_value.neq.return_value.execute.return_value = mock_select
-        mock_supabase.table.return_value = mock_table
+        login()
+        setup_availabilities(mock_supabase, [])
 
         # Make request
         response = client.post(
             "/api/v1/meetings/schedule",
-            json={"user_id": 1, "duration_minutes": 30}
+            json={"user_id": "user-1", "duration_minutes": 30}
         )
 
         # Assertions
         assert response.status_code == 404
         assert "No available users found" in response.json()["detail"]
 
-    def test_schedule_meeting_slot_too_short(self, client, mock_supabase, sample_availability_data):
-        """Test when available slots are too short for requested duration"""
-        # Setup mock with only short slots
-        short_slot_data = [sample_availability_data[1]]  # 30-minute slot
+    def test_schedule_meeting_skips_own_availability(self, client, login, mock_supabase, sample_availability_data):
+        """Test that the requesting user is never matched with themselves"""
+        login(user_id="user-2")
+        setup_availabilities(mock_supabase, [sample_availability_data[0]])
 
-        mock_select = Mock()
-        mock_select.data = short_slot_data
+        response = client.post(
+            "/api/v1/meetings/schedule",
+            json={"user_id": "user-2", "duration_minutes": 30}
+        )
 
-        mock_table = Mock()
-        mock_table.select.return_value.neq.return_value.execute.return_value = mock_select
-        mock_supabase.table.return_value = mock_table
+        assert response.status_code == 404
+        assert "No available users found" in response.json()["detail"]
+
+    def test_schedule_meeting_slot_too_short(self, client, login, mock_supabase, sample_availability_data):
+        """Test when available slots are too short for requested duration"""
+        login()
+        # Only the 30-minute slot
+        setup_availabilities(mock_supabase, [sample_availability_data[1]])
 
         # Request 60 minutes (more than available)
         response = client.post(
             "/api/v1/meetings/schedule",
-            json={"user_id": 1, "duration_minutes": 60}
+            json={"user_id": "user-1", "duration_minutes": 60}
         )
 
         # Assertions
         assert response.status_code == 404
         assert "can accommodate 60 minutes" in response.json()["detail"]
 
-    def test_schedule_meeting_splits_availability(self, client, mock_supabase, sample_availability_data):
+    def test_schedule_meeting_splits_availability(self, client, login, mock_supabase, sample_availability_data):
         """Test that availability is split when meeting doesn't use entire slot"""
-        # Setup mocks
-        mock_select = Mock()
-        mock_select.data = sample_availability_data
+        login()
+        setup_availabilities(mock_supabase, sample_availability_data)
 
-        mock_delete = Mock()
-        mock_insert = Mock()
+        # Request 30 minutes from 2-hour slot
+        response = client.post(
+            "/api/v1/meetings/schedule",
+            json={"user_id": "user-1", "duration_minutes": 30}
+        )
+        assert response.status_code == 200
 
-        mock_table = Mock()
-        mock_table.select.return_value.neq.return_value.execute.return_value = mock_select
-        mock_table.delete.return_value.eq.return_value.execute.return_value = mock_delete
-        mock_table.insert.return_value.execute.return_value = mock_insert
+        # The slot is claimed and split in one RPC, checked against the matched times
+        assert reserve_calls(mock_supabase) == [{
+            "p_availability_id": 1,
+            "p_expected_start": "2024-01-15T10:00:00",
+            "p_expected_end": "2024-01-15T12:00:00",
+            "p_booking_start": "2024-01-15T10:00:00",
+            "p_booking_end": "2024-01-15T10:30:00",
+        }]
 
-        mock_supabase.table.return_value = mock_table
+        # The remaining fragment is bookable without reloading the index
+        response = client.post(
+            "/api/v1/meetings/schedule",
+            json={"user_id": "user-1", "duration_minutes": 90}
+        )
+        assert response.status_code == 200
+        assert response.json()["scheduled_slot"]["availability_id"] == 101
+
+    def test_schedule_meeting_not_before_splits_both_sides(self, client, login, mock_supabase, sample_availability_data):
+        """Test booking inside a slot leaves fragments before and after the meeting"""
+        login()
+        setup_availabilities(mock_supabase, sample_availability_data)
 
-        # Request 30 minutes from 2-hour slot
         response = client.post(
             "/api/v1/meetings/schedule",
-            json={"user_id": 1, "duration_minutes": 30}
+            json={
+                "user_id": "user-1",
+                "duration_minutes": 30,
+                "not_before": "2024-01-15T11:00:00+00:00",
+            }
         )
 
-        # Verify delete was called on original slot
-        mock_table.delete.assert_called_once()
-        mock_table.delete.return_value.eq.assert_called_once_with("availability_id", 1)
+        assert response.status_code == 200
+        slot = response.json()["scheduled_slot"]
+        assert slot["time_start"].startswith("2024-01-15T11:00:00")
+        assert slot["time_end"].startswith("2024-01-15T11:30:00")
 
-        # Verify insert was called to create remaining slot
-        mock_table.insert.assert_called_once()
-        insert_args = mock_table.insert.call_args[0][0]
-        assert insert_args["user_id"] == 2
-        assert "time_start" in insert_args
-        assert "time_end" in insert_args
+        params = reserve_calls(mock_supabase)[0]
+        assert params["p_booking_start"] == "2024-01-15T11:00:00"
+        assert params["p_booking_end"] == "2024-01-15T11:30:00"
 
-    def test_schedule_meeting_exact_slot_match(self, client, mock_supabase, sample_availability_data):
+    def test_schedule_meeting_exact_slot_match(self, client, login, mock_supabase, sample_availability_data):
         """Test when meeting duration exactly matches availability slot"""
-        # Setup mock with exact match
-        exact_slot_data = [sample_availability_data[1]]  # 30-minute slot
+        login()
+        # Only the 30-minute slot
+        setup_availabilities(mock_supabase, [sample_availability_data[1]])
 
-        mock_select = Mock()
-        mock_select.data = exact_slot_data
+        # Request exactly 30 minutes
+        response = client.post(
+            "/api/v1/meetings/schedule",
+            json={"user_id": "user-1", "duration_minutes": 30}
+        )
 
-        mock_delete = Mock()
-        mock_table = Mock()
-        mock_table.select.return_value.neq.return_value.execute.return_value = mock_select
-        mock_table.delete.return_value.eq.return_value.execute.return_value = mock_delete
-        mock_table.insert.return_value.execute.return_value = Mock()
+        # Whole slot used: nothing left to book
+        assert response.status_code == 200
+        response = client.post(
+            "/api/v1/meetings/schedule",
+            json={"user_id": "user-1", "duration_minutes": 30}
+        )
+        assert response.status_code == 404
 
-        mock_supabase.table.return_value = mock_table
+    def test_schedule_meeting_retries_after_conflict(self, client, login, mock_supabase, sample_availability_data):
+        """Test that a slot taken by a concurrent booking falls through to the next candidate"""
+        login()
+        setup_availabilities(mock_supabase, sample_availability_data, conflicts={1: "gone"})
+
+        response = client.post(
+            "/api/v1/meetings/schedule",
+            json={"user_id": "user-1", "duration_minutes": 30}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["matched_user"]["user_id"] == "user-3"
+        assert [params["p_availability_id"] for params in reserve_calls(mock_supabase)] == [1, 2]
+
+    def test_schedule_meeting_changed_slot_is_refiled(self, client, login, mock_supabase, sample_availability_data):
+        """Test that a slot edited since the index loaded is not booked on stale times"""
+        login()
+        setup_availabilities(mock_supabase, sample_availability_data, conflicts={1: "changed", 2: "gone"})
 
-        # Request exactly 30 minutes
         response = client.post(
             "/api/v1/meetings/schedule",
-            json={"user_id": 1, "duration_minutes": 30}
+            json={"user_id": "user-1", "duration_minutes": 30}
+        )
+
+        assert response.status_code == 404
+        assert "can accommodate 30 minutes" in response.json()["detail"]
+
+    def test_schedule_meeting_ranks_by_preferences(self, client, login, mock_supabase, sample_availability_data):
+        """Test that preferences can pick a later slot over the earliest fit"""
+        login()
+        setup_availabilities(mock_supabase, sample_availability_data)
+
+        response = client.post(
+            "/api/v1/meetings/schedule",
+            json={
+                "user_id": "user-1",
+                "duration_minutes": 30,
+                "preferences": {"preferred_gender": "male"},
+            }
         )
 
-        # Should delete slot but NOT insert new one
         assert response.status_code == 200
-        mock_table.delete.assert_called_once()
-        # Insert should not be called since no remaining time
-        mock_table.insert.assert_not_called()
+        assert response.json()["matched_user"]["user_id"] == "user-3"
 
-    def test_schedule_meeting_invalid_request(self, client, mock_supabase):
+    def test_schedule_meeting_invalid_request(self, client, login, mock_supabase):
         """Test with invalid request data"""
+        login()
         response = client.post(
             "/api/v1/meetings/schedule",
             json={"user_id": "invalid", "duration_minutes": -10}
         )
 
         assert response.status_code == 422  # Validation error
+
+
+def make_slot(availability_id, start_hour, end_hour, user_id="user-2"):
+    day = datetime(2024, 1, 15, tzinfo=timezone.utc)
+    return Slot(
+        availability_id=availability_id,
+        user_id=user_id,
+        time_start=day + timedelta(hours=start_hour),
+        time_end=day + timedelta(hours=end_hour),
+    )
+
+
+class TestAvailabilityIndex:
+    """Tests for the in-memory availability index"""
+
+    def test_candidates_earliest_fit_first(self):
+        """Test that slots too short are skipped and fits come back in start order"""
+        index = AvailabilityIndex()
+        index.rebuild([
+            make_slot(1, 14, 16),
+            make_slot(2, 9, 9.25),
+            make_slot(3, 10, 12),
+        ])
+
+        found = [slot.availability_id for slot, _ in index.candidates(timedelta(minutes=60))]
+
+        assert found == [3, 1]
+
+    def test_candidates_not_before_books_inside_running_slot(self):
+        """Test that a slot already open at not_before is booked from not_before"""
+        index = AvailabilityIndex()
+        index.rebuild([make_slot(1, 10, 12), make_slot(2, 11, 11.25), make_slot(3, 13, 14)])
+        not_before = datetime(2024, 1, 15, 11, tzinfo=timezone.utc)
+
+        found = list(index.candidates(timedelta(minutes=30), not_before))
+
+        assert [(slot.availability_id, start.hour) for slot, start in found] == [(1, 11), (3, 13)]
+
+    def test_add_and_remove_keep_index_in_sync(self):
+        """Test that removed slots stop matching and added fragments start matching"""
+        index = AvailabilityIndex()
+        index.rebuild([make_slot(1, 10, 12), make_slot(2, 14, 15)])
+
+        index.remove(1)
+        index.add(make_slot(3, 10.5, 12))
+
+        assert 1 not in index
+        assert len(index) == 2
+        found = [slot.availability_id for slot, _ in index.candidates(timedelta(minutes=60))]
+        assert found == [3, 2]
+
+    def test_large_index_matches_linear_scan(self):
+        """Test the treap search against a brute-force scan"""
+        index = AvailabilityIndex()
+        slots = [make_slot(i, (i * 7) % 200 / 4, (i * 7) % 200 / 4 + (i % 9) / 4) for i in range(1, 500)]
+        index.rebuild(slots)
+        need = timedelta(minutes=90)
+
+        expected = sorted((s for s in slots if s.duration >= need), key=lambda s: s.key)
+        found = [slot for slot, _ in index.candidates(need)]
+
+        assert found == expected
+
+
+def fake_reserve_batch(rows, conflicts_once=()):
+    """
+    Stand-in for reserve_availability_batch(). Slots in `conflicts_once` are
+    reported as conflicts on the first call only.
+    """
+    users = {row["availability_id"]: row["users"] for row in rows}
+    pending_conflicts = set(conflicts_once)
+
+    def rpc(name, params):
+        assert name == "reserve_availability_batch"
+        reserved, conflicts = [], []
+        for entry in params["p_reservations"]:
+            if entry["availability_id"] in pending_conflicts:
+                pending_conflicts.discard(entry["availability_id"])
+                conflicts.append(entry["availability_id"])
+                continue
+            reserved.append({"availability_id": entry["availability_id"], "user": users[entry["availability_id"]], "remaining": []})
+        return Mock(execute=Mock(return_value=Mock(data={"reserved": reserved, "conflicts": conflicts})))
+
+    return rpc
+
+
+class TestScheduleMeetingsBatch:
+    """Tests for the batch schedule endpoint"""
+
+    def test_batch_requires_admin_or_organizer(self, client, login):
+        """Test that students can't run batch matching"""
+        login(user_type="student")
+
+        response = client.post(
+            "/api/v1/meetings/schedule/batch",
+            json={"requests": [{"user_id": "stu-1", "duration_minutes": 30}]}
+        )
+
+        assert response.status_code == 403
+
+    def test_batch_commits_assignment_in_one_call(self, client, login, mock_supabase, sample_availability_data):
+        """Test that all reservations go out in a single bulk RPC"""
+        login(user_type="organizer")
+        mock_table = Mock()
+        mock_table.select.return_value.execute.return_value = Mock(data=sample_availability_data)
+        mock_table.select.return_value.or_.return_value.execute.return_value = Mock(data=[])
+        mock_supabase.table.return_value = mock_table
+        mock_supabase.rpc.side_effect = fake_reserve_batch(sample_availability_data)
+
+        response = client.post(
+            "/api/v1/meetings/schedule/batch",
+            json={"requests": [
+                {"user_id": "stu-1", "duration_minutes": 30},
+                {"user_id": "stu-2", "duration_minutes": 60},
+                {"user_id": "stu-3", "duration_minutes": 120},
+            ]}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["scheduled"] == 2
+        assert data["unmatched"] == 1
+        # Longest first: the 2-hour request takes slot 1, the 30-minute one slot 2
+        assert [r["status"] for r in data["results"]] == ["scheduled", "unmatched", "scheduled"]
+        assert data["results"][2]["matched_user"]["user_id"] == "user-2"
+        assert data["results"][0]["scheduled_slot"]["availability_id"] == 2
+        assert mock_supabase.rpc.call_count == 1
+        reservations = mock_supabase.rpc.call_args[0][1]["p_reservations"]
+        assert sorted(reservations, key=lambda entry: entry["availability_id"]) == [
+            {
+                "availability_id": 1,
+                "expected_start": "2024-01-15T10:00:00",
+                "expected_end": "2024-01-15T12:00:00",
+                "bookings": [{"start": "2024-01-15T10:00:00", "end": "2024-01-15T12:00:00"}],
+            },
+            {
+                "availability_id": 2,
+                "expected_start": "2024-01-15T14:00:00",
+                "expected_end": "2024-01-15T14:30:00",
+                "bookings": [{"start": "2024-01-15T14:00:00", "end": "2024-01-15T14:30:00"}],
+            },
+        ]
+
+    def test_batch_rematches_after_conflict(self, client, login, mock_supabase, sample_availability_data):
+        """Test that students whose slot was taken concurrently get another round"""
+        login(user_type="admin")
+        mock_table = Mock()
+        mock_table.select.return_value.execute.return_value = Mock(data=sample_availability_data)
+        mock_table.select.return_value.or_.return_value.execute.return_value = Mock(data=[])
+        mock_supabase.table.return_value = mock_table
+        mock_supabase.rpc.side_effect = fake_reserve_batch(sample_availability_data, conflicts_once={2})
+
+        response = client.post(
+            "/api/v1/meetings/schedule/batch",
+            json={"requests": [
+                {"user_id": "stu-1", "duration_minutes": 30, "window_start": "2024-01-15T14:00:00+00:00"},
+            ]}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["scheduled"] == 1
+        assert mock_supabase.rpc.call_count == 2
+        # The index was reloaded before the second round
+        assert mock_table.select.return_value.execute.call_count == 2
+
+
+def meeting_row(meeting_id, start, status="scheduled", meeting_type="normal"):
+    start = datetime.fromisoformat(start)
+    return {
+        "meeting_id": meeting_id,
+        "title": f"Meeting {meeting_id}",
+        "description": None,
+        "meeting_type": meeting_type,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "max_participants": None,
+        "meeting_password": None,
+        "zoom_meeting_id": None,
+        "zoom_meeting_url": None,
+        "created_by": "user-2",
+        "created_at": "2024-01-01T00:00:00",
+        "status": status,
+    }
+
+
+def setup_meetings_query(mock_supabase, rows):
+    """A query builder whose filter/order calls all chain back to itself."""
+    query = Mock()
+    for name in ("select", "gte", "lt", "eq", "or_", "order", "limit"):
+        getattr(query, name).return_value = query
+    query.execute.return_value = Mock(data=rows)
+    mock_supabase.table.return_value = query
+    return query
+
+
+class TestGetMeetings:
+    """Tests for paginated meeting listing"""
+
+    def test_filters_pushed_into_query(self, client, mock_supabase):
+        """Test that window and status filters become query filters"""
+        query = setup_meetings_query(mock_supabase, [meeting_row(1, "2024-01-15T10:00:00")])
+
+        response = client.get(
+            "/api/v1/meetings/",
+            params={
+                "user_id": "user-1", "user_type": "student",
+                "from": "2024-01-15T00:00:00Z", "to": "2024-01-22T00:00:00Z",
+                "status": "scheduled", "meeting_type": "normal", "limit": 10,
+            },
+        )
+
+        assert response.status_code == 200
+        assert [m["meeting_id"] for m in response.json()] == [1]
+        assert "X-Next-Cursor" not in response.headers
+        query.gte.assert_called_once_with("start_time", "2024-01-15T00:00:00")
+        query.lt.assert_called_once_with("start_time", "2024-01-22T00:00:00")
+        query.eq.assert_any_call("status", "scheduled")
+        query.eq.assert_any_call("meeting_type", "normal")
+        query.limit.assert_called_once_with(11)
+        query.or_.assert_not_called()
+
+    def test_next_cursor_continues_after_last_row(self, client, mock_supabase):
+        """Test that a full page returns a cursor that resumes after its last row"""
+        rows = [meeting_row(i, f"2024-01-15T{9 + i:02d}:00:00") for i in range(1, 4)]
+        query = setup_meetings_query(mock_supabase, rows)
+
+        response = client.get("/api/v1/meetings/?user_id=user-1&user_type=student&limit=2")
+
+        assert response.status_code == 200
+        assert [m["meeting_id"] for m in response.json()] == [1, 2]
+        cursor = response.headers["X-Next-Cursor"]
+
+        query.execute.return_value = Mock(data=rows[2:])
+        response = client.get(f"/api/v1/meetings/?user_id=user-1&user_type=student&limit=2&cursor={cursor}")
+
+        assert [m["meeting_id"] for m in response.json()] == [3]
+        assert "X-Next-Cursor" not in response.headers
+        query.or_.assert_called_once_with(
+            "start_time.gt.2024-01-15T11:00:00,"
+            "and(start_time.eq.2024-01-15T11:00:00,meeting_id.gt.2)"
+        )
+
+    def test_roles_and_can_join(self, client, mock_supabase):
+        """Test that permissions are still derived per meeting"""
+        setup_meetings_query(mock_supabase, [
+            meeting_row(1, "2024-01-15T10:00:00", meeting_type="live"),
+            meeting_row(2, "2024-01-15T11:00:00", status="ended"),
+        ])
+
+        response = client.get("/api/v1/meetings/?user_id=user-9&user_type=volunteer")
+
+        data = response.json()
+        assert (data[0]["user_role"], data[0]["can_join"]) == ("presenter", True)
+        assert (data[1]["user_role"], data[1]["can_join"]) == ("participant", False)
+
+    def test_invalid_cursor(self, client, mock_supabase):
+        """Test that a garbled cursor is rejected"""
+        setup_meetings_query(mock_supabase, [])
+
+        response = client.get("/api/v1/meetings/?user_id=user-1&user_type=student&cursor=bm9wZQ==")
+
+        assert response.status_code == 400
+
+
+class TestZoomSignatures:
+    """Tests for cached Zoom signatures on join"""
+
+    @pytest.fixture(autouse=True)
+    def sdk_credentials(self, monkeypatch):
+        from src.app.core.config import settings
+        monkeypatch.setattr(settings, "ZOOM_SDK_KEY", "sdk-key")
+        monkeypatch.setattr(settings, "ZOOM_SDK_SECRET", "sdk-secret-for-tests-0123456789abcdef")
+
+    def setup_meeting(self, mock_supabase, **overrides):
+        row = {**meeting_row(1, "2024-01-15T10:00:00", meeting_type="live"), "zoom_meeting_id": "123456", **overrides}
+        mock_table = Mock()
+        mock_table.select.return_value.eq.return_value.execute.return_value = Mock(data=[row])
+        mock_supabase.table.return_value = mock_table
+        mock_supabase.rpc.return_value.execute.return_value = Mock(
+            data={"status": "joined", "participant_count": 1}
+        )
+        return mock_table
+
+    def join(self, client, user_id, user_type="student"):
+        return client.post(
+            f"/api/v1/meetings/1/join?user_id={user_id}&user_type={user_type}",
+            json={"meeting_id": 1, "user_name": user_id},
+        )
+
+    def test_joins_served_from_cache(self, client, mock_supabase, monkeypatch):
+        """Test that a burst of joins reads the meeting once and signs once per role"""
+        from src.app.core import zoom
+        mock_table = self.setup_meeting(mock_supabase)
+        signings = []
+        real_sign = zoom.sign
+        monkeypatch.setattr(zoom, "sign", lambda mn, role: signings.append(role) or real_sign(mn, role))
+
+        students = [self.join(client, f"stu-{i}").json() for i in range(5)]
+        presenter = self.join(client, "vol-1", "volunteer").json()
+
+        assert len({s["signature"] for s in students}) == 1
+        assert presenter["user_role"] == "presenter"
+        assert presenter["signature"] != students[0]["signature"]
+        assert signings == [0, 1]
+        assert mock_table.select.return_value.eq.return_value.execute.call_count == 1
+
+    def test_signature_refreshed_before_expiry(self, monkeypatch):
+        """Test that cached signatures are replaced once inside the safety margin"""
+        from src.app.core import zoom
+        now = [0.0]
+        monkeypatch.setattr(zoom.signature_cache, "_clock", lambda: now[0])
+        zoom.signature_cache.clear()
+
+        first = zoom.get_signature("123456", 0)
+        now[0] = zoom.signature_cache.ttl - 1
+        assert zoom.get_signature("123456", 0) == first
+
+        monkeypatch.setattr(zoom.time, "time", lambda: 10_000_000)
+        now[0] = zoom.signature_cache.ttl
+        assert zoom.get_signature("123456", 0) != first
+        zoom.signature_cache.clear()
+
+    def test_status_change_invalidates_meeting(self, client, mock_supabase):
+        """Test that ending a meeting stops joins served from the cached row"""
+        mock_table = self.setup_meeting(mock_supabase)
+        assert self.join(client, "stu-1").status_code == 200
+
+        client.put("/api/v1/meetings/1/status?status=ended&user_id=user-2")
+        mock_table.select.return_value.eq.return_value.execute.return_value = Mock(
+            data=[{**meeting_row(1, "2024-01-15T10:00:00"), "zoom_meeting_id": "123456", "status": "ended"}]
+        )
+
+        assert self.join(client, "stu-1").status_code == 400
+
+    def test_roster_signatures(self, client, mock_supabase, login):
+        """Test that the creator can pre-issue signatures for the roster"""
+        mock_table = self.setup_meeting(mock_supabase)
+        mock_table.select.return_value.in_.return_value.execute.return_value = Mock(data=[
+            {"user_id": "stu-1", "user_type": "student"},
+            {"user_id": "vol-1", "user_type": "volunteer"},
+            {"user_id": "user-2", "user_type": "volunteer"},
+        ])
+        login("volunteer", "user-2")
+
+        response = client.post(
+            "/api/v1/meetings/1/signatures",
+            json={"users": [
+                {"user_id": "stu-1"},
+                {"user_id": "vol-1"},
+                {"user_id": "user-2"},
+                {"user_id": "ghost"},
+            ]},
+        )
+
+        assert response.status_code == 200
+        roles = [(s["user_id"], s["user_role"]) for s in response.json()["signatures"]]
+        assert roles == [("stu-1", "participant"), ("vol-1", "presenter"), ("user-2", "host")]
+        mock_table.select.return_value.in_.assert_called_once_with("user_id", ["stu-1", "vol-1", "user-2", "ghost"])
+        # Joins afterwards reuse the pre-issued signature
+        joined = self.join(client, "stu-9").json()
+        assert joined["signature"] == response.json()["signatures"][0]["signature"]
+
+    def test_roster_ignores_client_user_type(self, client, mock_supabase, login):
+        """Test that a user_type in the body can't raise a member's role"""
+        mock_table = self.setup_meeting(mock_supabase)
+        mock_table.select.return_value.in_.return_value.execute.return_value = Mock(data=[
+            {"user_id": "stu-1", "user_type": "student"},
+        ])
+        login("volunteer", "user-2")
+
+        response = client.post(
+            "/api/v1/meetings/1/signatures",
+            json={"users": [{"user_id": "stu-1", "user_type": "admin"}]},
+        )
+
+        assert response.json()["signatures"][0]["user_role"] == "participant"
+
+    def test_roster_requires_creator(self, client, mock_supabase, login):
+        """Test that only the meeting creator can issue roster signatures"""
+        self.setup_meeting(mock_supabase)
+        login("student", "stu-1")
+
+        response = client.post("/api/v1/meetings/1/signatures?user_id=user-2", json={"users": []})
+
+        assert response.status_code == 403
+
+    def test_zoom_signature_endpoint(self, client, mock_supabase, login):
+        """Test the signer derives the role server-side and shares the cache"""
+        self.setup_meeting(mock_supabase)
+        login("student", "stu-1")
+        first = client.get("/api/v1/zoom/get_signature?meeting_number=123456&role=1")
+        second = client.get("/api/v1/zoom/get_signature?meeting_number=123456")
+        participant = self.join(client, "stu-2").json()
+
+        assert first.status_code == 200
+        assert first.json() == second.json()
+        assert first.json()["signature"] == participant["signature"]
+
+        login("student", "user-2")
+        host = client.get("/api/v1/zoom/get_signature?meeting_number=123456").json()
+        assert host["signature"] != first.json()["signature"]
+
+    def test_zoom_signature_requires_auth(self, client):
+        """Test the signer rejects anonymous callers"""
+        response = client.get("/api/v1/zoom/get_signature?meeting_number=123456&role=1")
+
+        assert response.status_code in (401, 403)
+
+    def test_zoom_signature_unknown_meeting(self, client, mock_supabase, login):
+        """Test the signer refuses meetings it has no row for"""
+        mock_supabase.table.return_value.select.return_value.eq.return_value.execute.return_value = Mock(data=[])
+        login()
+
+        assert client.get("/api/v1/zoom/get_signature?meeting_number=999").status_code == 404
+
+
+class TestMeetingCapacity:
+    """Tests for max_participants enforcement on join"""
+
+    def setup_meeting(self, mock_supabase, max_participants):
+        row = {**meeting_row(1, "2024-01-15T10:00:00"), "zoom_meeting_id": "123456",
+               "max_participants": max_participants}
+        mock_table = Mock()
+        mock_table.select.return_value.eq.return_value.execute.return_value = Mock(data=[row])
+        mock_supabase.table.return_value = mock_table
+
+        # Stand-in for join_meeting_participant(); only capped joins take a seat
+        joined, seated = set(), set()
+
+        def rpc(name, params):
+            assert name == "join_meeting_participant"
+            user_id = params["p_user_id"]
+            if user_id in joined:
+                status = "already_joined"
+            elif not params["p_enforce_capacity"]:
+                joined.add(user_id)
+                status = "joined"
+            elif max_participants is not None and len(seated) >= max_participants:
+                status = "full"
+            else:
+                joined.add(user_id)
+                seated.add(user_id)
+                status = "joined"
+            return Mock(execute=Mock(return_value=Mock(data={"status": status, "participant_count": len(seated)})))
+
+        mock_supabase.rpc.side_effect = rpc
+
+    @pytest.fixture(autouse=True)
+    def sdk_credentials(self, monkeypatch):
+        from src.app.core.config import settings
+        monkeypatch.setattr(settings, "ZOOM_SDK_SECRET", "sdk-secret-for-tests-0123456789abcdef")
+
+    def join(self, client, user_id, user_type="student"):
+        return client.post(
+            f"/api/v1/meetings/1/join?user_id={user_id}&user_type={user_type}",
+            json={"meeting_id": 1, "user_name": user_id},
+        )
+
+    def test_joins_beyond_capacity_rejected(self, client, mock_supabase):
+        """Test that joins past max_participants get 409"""
+        self.setup_meeting(mock_supabase, max_participants=2)
+
+        statuses = [self.join(client, f"stu-{i}").status_code for i in range(4)]
+
+        assert statuses == [200, 200, 409, 409]
+
+    def test_rejoin_does_not_take_a_place(self, client, mock_supabase):
+        """Test that a participant who already joined can rejoin a full meeting"""
+        self.setup_meeting(mock_supabase, max_participants=1)
+        assert self.join(client, "stu-1").json()["participant_count"] == 1
+
+        assert self.join(client, "stu-2").status_code == 409
+        assert self.join(client, "stu-1").status_code == 200
+
+    def test_host_bypasses_capacity(self, client, mock_supabase):
+        """Test that the meeting creator can always join"""
+        self.setup_meeting(mock_supabase, max_participants=1)
+        self.join(client, "stu-1")
+
+        response = self.join(client, "user-2", "volunteer")
+
+        assert response.status_code == 200
+        assert response.json()["user_role"] == "host"
+        assert mock_supabase.rpc.call_args[0][1]["p_enforce_capacity"] is False
+
+    def test_host_does_not_take_a_seat(self, client, mock_supabase):
+        """Test that a host joining a full-size meeting leaves every seat to participants"""
+        self.setup_meeting(mock_supabase, max_participants=1)
+        assert self.join(client, "user-2", "volunteer").json()["participant_count"] == 0
+
+        response = self.join(client, "stu-1")
+
+        assert response.status_code == 200
+        assert response.json()["participant_count"] == 1
+        assert self.join(client, "stu-2").status_code == 409
+
+
+class TestMeetingSeries:
+    """Tests for recurring meeting series"""
+
+    def echo_insert(self, mock_supabase):
+        """Insert mock that returns the inserted rows with ids."""
+        mock_table = Mock()
+
+        def insert(rows):
+            saved = [{**row, "meeting_id": i + 1, "created_at": "2024-01-01T00:00:00"} for i, row in enumerate(rows)]
+            return Mock(execute=Mock(return_value=Mock(data=saved)))
+
+        mock_table.insert.side_effect = insert
+        mock_supabase.table.return_value = mock_table
+        return mock_table
+
+    def test_series_created_in_one_insert(self, client, mock_supabase):
+        """Test that every occurrence is written with one bulk insert"""
+        mock_table = self.echo_insert(mock_supabase)
+
+        response = client.post(
+            "/api/v1/meetings/series?user_id=user-2&user_type=volunteer",
+            json={
+                "title": "Weekly tutoring",
+                "meeting_type": "normal",
+                "start_time": "2024-03-05T17:00:00",
+                "duration_minutes": 60,
+                "recurrence_rule": "FREQ=WEEKLY;BYDAY=TU;COUNT=3",
+                "timezone": "America/New_York",
+            },
+        )
+
+        assert response.status_code == 201
+        assert mock_table.insert.call_count == 1
+        rows = mock_table.insert.call_args[0][0]
+        # 17:00 local on both sides of the DST change (March 10)
+        assert [row["start_time"] for row in rows] == [
+            "2024-03-05T22:00:00", "2024-03-12T21:00:00", "2024-03-19T21:00:00",
+        ]
+        assert len({row["zoom_meeting_id"] for row in rows}) == 1
+        data = response.json()
+        assert len({row["series_id"] for row in rows} | {data["series_id"]}) == 1
+        assert [m["meeting_id"] for m in data["meetings"]] == [1, 2, 3]
+
+    def test_series_must_be_bounded(self, client, mock_supabase):
+        """Test that open-ended and oversized series are rejected"""
+        base = {"title": "t", "meeting_type": "normal", "start_time": "2024-03-05T17:00:00", "duration_minutes": 30}
+
+        open_ended = client.post(
+            "/api/v1/meetings/series?user_id=user-2&user_type=volunteer",
+            json={**base, "recurrence_rule": "FREQ=DAILY"},
+        )
+        too_many = client.post(
+            "/api/v1/meetings/series?user_id=user-2&user_type=volunteer",
+            json={**base, "recurrence_rule": "FREQ=DAILY;COUNT=1000"},
+        )
+
+        assert open_ended.status_code == 400
+        assert too_many.status_code == 400
+
+    def test_students_cannot_create_series(self, client, mock_supabase):
+        """Test that series creation is limited like single meetings"""
+        response = client.post(
+            "/api/v1/meetings/series?user_id=stu-1&user_type=student",
+            json={"title": "t", "meeting_type": "normal", "start_time": "2024-03-05T17:00:00",
+                  "duration_minutes": 30, "recurrence_rule": "FREQ=DAILY;COUNT=2"},
+        )
+
+        assert response.status_code == 403
+
+    def test_cancel_series_single_update(self, client, mock_supabase):
+        """Test that cancelling updates every upcoming occurrence in one statement"""
+        series_id = "6f1c1a5e-8d8f-4a53-9b71-3f0e3c8e2a10"
+        mock_table = Mock()
+        mock_table.select.return_value.eq.return_value.limit.return_value.execute.return_value = Mock(
+            data=[{"created_by": "user-2"}]
+        )
+        cancelled = [
+            {**meeting_row(i, f"2024-03-{10 + i}T17:00:00", status="cancelled"), "series_id": series_id}
+            for i in (2, 1)
+        ]
+        mock_table.update.return_value.eq.return_value.eq.return_value.execute.return_value = Mock(data=cancelled)
+        mock_supabase.table.return_value = mock_table
+
+        response = client.post(f"/api/v1/meetings/series/{series_id}/cancel?user_id=user-2")
+
+        assert response.status_code == 200
+        mock_table.update.assert_called_once_with({"status": "cancelled"})
+        mock_table.update.return_value.eq.assert_called_once_with("series_id", series_id)
+        mock_table.update.return_value.eq.return_value.eq.assert_called_once_with("status", "scheduled")
+        assert [m["meeting_id"] for m in response.json()["meetings"]] == [1, 2]
+
+    def test_update_series_requires_owner(self, client, mock_supabase):
+        """Test that only the creator can edit a series"""
+        mock_table = Mock()
+        mock_table.select.return_value.eq.return_value.limit.return_value.execute.return_value = Mock(
+            data=[{"created_by": "user-2"}]
+        )
+        mock_supabase.table.return_value = mock_table
+
+        response = client.put(
+            "/api/v1/meetings/series/6f1c1a5e-8d8f-4a53-9b71-3f0e3c8e2a10?user_id=stu-1",
+            json={"title": "Hijacked"},
+        )
+
+        assert response.status_code == 403
+        mock_table.update.assert_not_called()
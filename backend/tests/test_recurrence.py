@@ -0,0 +1,72 @@
+import pytest
+from datetime import datetime, timedelta
+
+from src.app.domain.recurrence import RecurrenceRule, last_occurrence, occurrences
+
+
+def starts(dtstart, rule, window_start, window_end, **kwargs):
+    return [
+        value.strftime("%Y-%m-%d %H:%M")
+        for value in occurrences(dtstart, RecurrenceRule.parse(rule), window_start, window_end, **kwargs)
+    ]
+
+
+class TestRecurrenceRule:
+    """Tests for RRULE parsing"""
+
+    def test_round_trip(self):
+        """Test that parsed rules serialise back to a canonical RRULE"""
+        rule = RecurrenceRule.parse("RRULE:freq=weekly;byday=we,mo;interval=2;UNTIL=20240601T000000Z")
+
+        assert str(rule) == "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;UNTIL=20240601T000000"
+
+    @pytest.mark.parametrize("text", [
+        "FREQ=MONTHLY",
+        "FREQ=DAILY;BYDAY=MO",
+        "FREQ=WEEKLY;COUNT=3;UNTIL=20240101",
+        "FREQ=WEEKLY;BYSETPOS=1",
+        "FREQ=WEEKLY;BYDAY=XX",
+    ])
+    def test_unsupported_rules_rejected(self, text):
+        """Test that rules outside the supported subset raise ValueError"""
+        with pytest.raises(ValueError):
+            RecurrenceRule.parse(text)
+
+
+class TestOccurrences:
+    """Tests for lazy occurrence expansion"""
+
+    def test_weekly_byday_with_count(self):
+        """Test that COUNT includes the first week's remaining days"""
+        result = starts(datetime(2024, 1, 3, 9), "FREQ=WEEKLY;BYDAY=MO,WE;COUNT=4",
+                        datetime(2024, 1, 1), datetime(2024, 3, 1))
+
+        assert result == ["2024-01-03 09:00", "2024-01-08 09:00", "2024-01-10 09:00", "2024-01-15 09:00"]
+
+    def test_window_far_from_dtstart_only_expands_window(self):
+        """Test that a window years after DTSTART jumps straight to it"""
+        result = starts(datetime(2020, 1, 6, 9), "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO",
+                        datetime(2030, 1, 1), datetime(2030, 1, 15))
+
+        # 2030-01-07 is an even number of weeks after 2020-01-06
+        assert result == ["2030-01-07 09:00"]
+
+    def test_occurrence_overlapping_window_start_included(self):
+        """Test that an occurrence already running at the window start is returned"""
+        result = starts(datetime(2024, 1, 1, 23), "FREQ=DAILY",
+                        datetime(2024, 1, 3), datetime(2024, 1, 3, 12), duration=timedelta(hours=2))
+
+        assert result == ["2024-01-02 23:00"]
+
+    def test_exdates_and_until(self):
+        """Test that cancelled occurrences are skipped and UNTIL is inclusive"""
+        result = starts(datetime(2024, 1, 1, 9), "FREQ=DAILY;UNTIL=20240104",
+                        datetime(2024, 1, 1), datetime(2024, 2, 1),
+                        exdates=[datetime(2024, 1, 2, 9)])
+
+        assert result == ["2024-01-01 09:00", "2024-01-03 09:00", "2024-01-04 09:00"]
+
+    def test_last_occurrence(self):
+        """Test the final occurrence of bounded rules"""
+        assert last_occurrence(datetime(2024, 1, 3, 9), RecurrenceRule.parse("FREQ=WEEKLY;BYDAY=MO,WE;COUNT=4")) == datetime(2024, 1, 15, 9)
+        assert last_occurrence(datetime(2024, 1, 1, 9), RecurrenceRule.parse("FREQ=DAILY")) is None
@@ -0,0 +1,93 @@
+import pytest
+import numpy as np
+from datetime import datetime, timedelta, timezone
+
+from src.app.domain.availability import Slot
+from src.app.domain.schemas import MatchPreferences
+from src.app.domain.scoring import RecentLoad, rank_candidates, score_candidates
+
+DAY = datetime(2024, 1, 15, tzinfo=timezone.utc)
+
+PROFILES = {
+    "vol-a": {"gender": "Female", "user_type": "volunteer", "experience_points": 10},
+    "vol-b": {"gender": "male", "user_type": "volunteer", "experience_points": 200},
+    "vol-c": {"gender": "female", "user_type": "organizer", "experience_points": 50},
+}
+
+
+def candidate(availability_id, user_id, start_hour, hours):
+    start = DAY + timedelta(hours=start_hour)
+    slot = Slot(availability_id=availability_id, user_id=user_id, time_start=start, time_end=start + timedelta(hours=hours))
+    return slot, start
+
+
+def preferences(**weights):
+    """Preferences with every weight off unless given"""
+    base = {"gender_weight": 0, "user_type_weight": 0, "experience_weight": 0, "fit_weight": 0, "load_weight": 0}
+    return MatchPreferences(**{**base, **weights})
+
+
+class TestScoring:
+    """Tests for preference scoring of schedule_meeting candidates"""
+
+    def test_preferred_gender_case_insensitive(self):
+        """Test that gender matching ignores case and whitespace"""
+        candidates = [candidate(1, "vol-b", 9, 1), candidate(2, "vol-a", 10, 1)]
+
+        ranked = rank_candidates(
+            candidates, timedelta(minutes=30), PROFILES,
+            preferences(preferred_gender=" female", gender_weight=1),
+        )
+
+        assert [slot.user_id for slot, _ in ranked] == ["vol-a", "vol-b"]
+
+    def test_fit_prefers_less_waste(self):
+        """Test that the slot the meeting fills best scores highest"""
+        candidates = [candidate(1, "vol-a", 9, 4), candidate(2, "vol-a", 14, 1)]
+
+        scores = score_candidates(candidates, timedelta(hours=1), PROFILES, preferences(fit_weight=1))
+
+        assert scores.tolist() == [0.25, 1.0]
+
+    def test_experience_and_load_combine(self):
+        """Test that a busy experienced volunteer can lose to an idle one"""
+        load = RecentLoad(window=3600)
+        for _ in range(3):
+            load.record("vol-b")
+        candidates = [candidate(1, "vol-b", 9, 1), candidate(2, "vol-c", 9, 1)]
+
+        ranked = rank_candidates(
+            candidates, timedelta(minutes=30), PROFILES,
+            preferences(experience_weight=1, load_weight=1), load,
+        )
+
+        assert ranked[0][0].user_id == "vol-c"
+
+    def test_ties_keep_earliest_first(self):
+        """Test that equal scores keep the earliest-first input order"""
+        candidates = [candidate(i, "vol-a", 9 + i, 1) for i in range(5)]
+
+        ranked = rank_candidates(candidates, timedelta(minutes=30), PROFILES, preferences(fit_weight=1))
+
+        assert ranked == candidates
+
+    def test_recent_load_expires(self):
+        """Test that bookings older than the window stop counting"""
+        now = [0.0]
+        load = RecentLoad(window=60, clock=lambda: now[0])
+        load.record("vol-a")
+        now[0] = 30.0
+        load.record("vol-a")
+
+        now[0] = 70.0
+
+        assert load.counts(["vol-a", "vol-b"]).tolist() == [1.0, 0.0]
+
+    def test_thousands_of_candidates(self):
+        """Test scoring a large candidate set returns one finite score per candidate"""
+        candidates = [candidate(i, f"vol-{'abc'[i % 3]}", i % 48, 1 + i % 4) for i in range(5000)]
+
+        scores = score_candidates(candidates, timedelta(minutes=30), PROFILES, MatchPreferences(preferred_gender="male"))
+
+        assert scores.shape == (5000,)
+        assert np.isfinite(scores).all()
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import Mock
+
+from src.app.api.v1.stream import _event_stream, format_sse
+from src.app.core.pubsub import RESYNC, Broker, broker
+
+
+class TestBroker:
+    """Tests for the in-process change notification broker"""
+
+    def test_topic_filtering(self):
+        """Test that subscribers only receive their topics"""
+        local = Broker()
+        meetings = local.subscribe(["meetings"])
+        everything = local.subscribe()
+
+        local.publish("meetings", "status", meeting_id=1, status="live")
+        local.publish("events", "created", event_id=2)
+
+        assert meetings.queue.qsize() == 1
+        assert [everything.queue.get_nowait().topic for _ in range(2)] == ["meetings", "events"]
+
+    def test_slow_subscriber_gets_resync(self):
+        """Test that a full queue is replaced by one resync notification"""
+        local = Broker(queue_size=3)
+        slow = local.subscribe(["events"])
+
+        for event_id in range(5):
+            local.publish("events", "updated", event_id=event_id)
+
+        received = [slow.queue.get_nowait() for _ in range(slow.queue.qsize())]
+        assert [n.type for n in received] == [RESYNC, "updated", "updated"]
+        assert received[-1].data == {"event_id": 4}
+        assert slow.dropped == 3
+
+    def test_unsubscribe(self):
+        """Test that closed streams stop receiving notifications"""
+        local = Broker()
+        subscription = local.subscribe()
+        local.unsubscribe(subscription)
+
+        local.publish("meetings", "created", meeting_id=1)
+
+        assert len(local) == 0
+        assert subscription.queue.empty()
+
+
+class TestStreamEndpoint:
+    """Tests for the server-sent events stream"""
+
+    def test_format(self):
+        """Test the SSE wire format"""
+        notification = Broker().publish("meetings", "status", meeting_id=3, status="live")
+
+        text = format_sse(notification)
+
+        assert text.startswith(f"id: {notification.id}\nevent: meetings\ndata: ")
+        assert json.loads(text.split("data: ")[1]) == {"type": "status", "meeting_id": 3, "status": "live"}
+        assert text.endswith("\n\n")
+
+    def test_stream_forwards_and_unsubscribes(self):
+        """Test that the stream yields published notifications and cleans up on close"""
+        local_broker = broker
+        request = Mock()
+
+        async def scenario():
+            subscription = local_broker.subscribe(["events"])
+            stream = _event_stream(request, subscription)
+            assert await stream.__anext__() == "retry: 3000\n\n"
+            local_broker.publish("events", "created", event_id=5)
+            message = await stream.__anext__()
+            await stream.aclose()
+            return message
+
+        message = asyncio.run(scenario())
+
+        assert "event: events" in message
+        assert '"event_id": 5' in message
+        assert len(local_broker) == 0
+
+    def test_unknown_topic_rejected(self, client):
+        """Test that unknown topics are a 400"""
+        response = client.get("/api/v1/stream?topics=meetings,gossip")
+
+        assert response.status_code == 400
+
+
+class TestRouterNotifications:
+    """Tests that routers publish after successful writes"""
+
+    def test_meeting_status_update_published(self, client, mock_supabase):
+        """Test that a manual status change is pushed to meeting subscribers"""
+        subscription = broker.subscribe(["meetings"])
+        mock_table = Mock()
+        mock_table.select.return_value.eq.return_value.execute.return_value = Mock(data=[{
+            "created_by": "user-2", "start_time": "2024-01-15T10:00:00", "end_time": "2024-01-15T11:00:00",
+        }])
+        mock_supabase.table.return_value = mock_table
+
+        response = client.put("/api/v1/meetings/1/status?status=cancelled&user_id=user-2")
+
+        assert response.status_code == 200
+        notification = subscription.queue.get_nowait()
+        assert (notification.type, notification.data) == ("status", {"meeting_id": 1, "status": "cancelled"})
+
+    def test_failed_write_not_published(self, client, mock_supabase):
+        """Test that rejected requests publish nothing"""
+        subscription = broker.subscribe()
+        mock_table = Mock()
+        mock_table.select.return_value.eq.return_value.execute.return_value = Mock(data=[{"created_by": "someone"}])
+        mock_supabase.table.return_value = mock_table
+
+        response = client.put("/api/v1/meetings/1/status?status=cancelled&user_id=user-2")
+
+        assert response.status_code == 403
+        assert subscription.queue.empty()
@@ -35,34 +35,14 @@ class TestUserItems:
 
     def test_purchase_item_success(self, client, mock_supabase):
         """Test successful item purchase"""
-        # Mock item lookup
-        item_data = [{"item_id": 1, "name": "Sword", "cost": 100}]
-        item_mock = Mock()
-        item_mock.data = item_data
-
-        # Mock user lookup
-        user_data = [{"experience_points": 500}]
-        user_mock = Mock()
-        user_mock.data = user_data
-
-        # Mock existing items check (user doesn't have it yet)
-        existing_mock = Mock()
-        existing_mock.data = []
-
-        # Setup table mock to return different results based on table name
-        def table_side_effect(table_name):
-            mock_table = Mock()
-            if table_name == "items":
-                mock_table.select.return_value.eq.return_value.execute.return_value = item_mock
-            elif table_name == "users":
-                mock_table.select.return_value.eq.return_value.execute.return_value = user_mock
-                mock_table.update.return_value.eq.return_value.execute.return_value = Mock()
-            elif table_name == "user_items":
-                mock_table.select.return_value.eq.return_value.eq.return_value.execute.return_value = existing_mock
-                mock_table.insert.return_value.execute.return_value = Mock()
-            return mock_table
-
-        mock_supabase.table.side_effect = table_side_effect
+        rpc_mock = Mock()
+        rpc_mock.data = {
+            "status": "ok",
+            "item": {"item_id": 1, "name": "Sword", "cost": 100},
+            "total_cost": 200,
+            "balance": 300
+        }
+        mock_supabase.rpc.return_value.execute.return_value = rpc_mock
 
         response = client.post(
             "/api/v1/users/1/items/purchase",
@@ -75,27 +55,22 @@ class TestUserItems:
         assert data["total_cost"] == 200
         assert data["remaining_experience_points"] == 300
 
+        # Whole purchase is a single round trip
+        mock_supabase.rpc.assert_called_once_with(
+            "purchase_item", {"p_user_id": 1, "p_item_id": 1, "p_quantity": 2}
+        )
+        mock_supabase.table.assert_not_called()
+
     def test_purchase_item_insufficient_points(self, client, mock_supabase):
         """Test purchase with insufficient experience points"""
-        # Mock item lookup
-        item_data = [{"item_id": 1, "name": "Sword", "cost": 100}]
-        item_mock = Mock()
-        item_mock.data = item_data
-
-        # Mock user with insufficient points
-        user_data = [{"experience_points": 50}]
-        user_mock = Mock()
-        user_mock.data = user_data
-
-        def table_side_effect(table_name):
-            mock_table = Mock()
-            if table_name == "items":
-                mock_table.select.return_value.eq.return_value.execute.return_value = item_mock
-            elif table_name == "users":
-                mock_table.select.return_value.eq.return_value.execute.return_value = user_mock
-            return mock_table
-
-        mock_supabase.table.side_effect = table_side_effect
+        rpc_mock = Mock()
+        rpc_mock.data = {
+            "status": "insufficient_points",
+            "item": {"item_id": 1, "name": "Sword", "cost": 100},
+            "total_cost": 200,
+            "balance": 50
+        }
+        mock_supabase.rpc.return_value.execute.return_value = rpc_mock
 
         response = client.post(
             "/api/v1/users/1/items/purchase",
@@ -105,6 +80,20 @@ class TestUserItems:
         assert response.status_code == 400
         assert "Insufficient experience points" in response.json()["detail"]
 
+    def test_purchase_item_not_found(self, client, mock_supabase):
+        """Test purchasing an item that doesn't exist"""
+        rpc_mock = Mock()
+        rpc_mock.data = {"status": "item_not_found"}
+        mock_supabase.rpc.return_value.execute.return_value = rpc_mock
+
+        response = client.post(
+            "/api/v1/users/1/items/purchase",
+            json={"item_id": 99, "quantity": 1}
+        )
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Item not found"
+
     def test_equip_item(self, client, mock_supabase):
         """Test equipping an item"""
         # Mock user has the item